@@ -151,10 +151,8 @@ def run(
     model_id = _resolve_model(model_alias)
 
     # --- dashboard ---------------------------------------------------------
+    # Served on the agent's event loop by run_autonomous_agent
     if not no_dashboard:
-        from axon_agent.dashboard import start_dashboard
-
-        start_dashboard(port=dashboard_port)
         click.echo(f"Dashboard: http://localhost:{dashboard_port}")
 
     # --- run ---------------------------------------------------------------
@@ -169,6 +167,7 @@ def run(
                 model=model_id,
                 team=team,
                 max_iterations=max_iterations,
+                dashboard_port=None if no_dashboard else dashboard_port,
             )
         )
     except KeyboardInterrupt:
@@ -237,9 +236,9 @@ def team(
     )
 
     if not no_dashboard:
-        from axon_agent.dashboard import start_dashboard
+        from axon_agent.dashboard import start_dashboard_thread
 
-        start_dashboard(port=dashboard_port)
+        start_dashboard_thread(port=dashboard_port)
         click.echo(f"Dashboard: http://localhost:{dashboard_port}")
 
     team_config = TeamConfig(
@@ -383,12 +382,12 @@ def _mask(secret: str) -> str:
 )
 def dashboard(port: int) -> None:
     """Start the dashboard only (no agent)."""
-    from axon_agent.dashboard import start_dashboard
+    from axon_agent.dashboard import start_dashboard_thread
 
     click.echo(f"Starting dashboard on http://localhost:{port}")
     click.echo("Press Ctrl+C to stop.")
 
-    thread = start_dashboard(port=port)
+    thread = start_dashboard_thread(port=port)
 
     try:
         # Block the main thread so the daemon thread stays alive
@@ -9,26 +9,49 @@
 """
 
 import asyncio
+import contextlib
+import functools
 import importlib.resources
+import importlib.util
 import json
 import logging
+import operator
 import os
 import random
+import re
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from enum import Enum
 from pathlib import Path
-from typing import Any, Callable, Coroutine, Final, Literal, TypedDict, TypeVar, cast
+from typing import Any, Callable, Coroutine, Final, Literal, Mapping, TypedDict, TypeVar, cast
 
+import httpx
 from dotenv import load_dotenv
 
 load_dotenv()
 
 from claude_agent_sdk import ClaudeAgentOptions, ClaudeSDKClient, McpServerConfig
-from claude_agent_sdk.types import HookCallback, HookMatcher
+from claude_agent_sdk.types import (
+    HookCallback,
+    HookContext,
+    HookEvent,
+    HookInput,
+    HookJSONOutput,
+    HookMatcher,
+)
 
 from axon_agent.core.context import (
     get_context_manager,
+    truncate_head_tail,
     truncate_tool_output,
     truncate_git_diff,
     TOOL_OUTPUT_MAX_CHARS,
+    WARNING_THRESHOLD,
+    CRITICAL_THRESHOLD,
 )
 from axon_agent.mcp.config import (
     ALL_MCP_TOOLS,
@@ -57,6 +80,43 @@ MAX_BACKOFF_SECONDS: Final[float] = 30.0
 BACKOFF_MULTIPLIER: Final[float] = 2.0
 RATE_LIMIT_INITIAL_BACKOFF_SECONDS: Final[float] = 5.0
 
+# ---------------------------------------------------------------------------
+# Конфигурация circuit breaker для MCP серверов
+# ---------------------------------------------------------------------------
+CIRCUIT_FAILURE_THRESHOLD: Final[int] = 5
+CIRCUIT_RESET_TIMEOUT_SECONDS: Final[float] = 30.0
+CIRCUIT_SUCCESS_THRESHOLD: Final[int] = 2
+
+# ---------------------------------------------------------------------------
+# Token bucket перед MCP серверами: (запросов в секунду, ёмкость burst)
+# ---------------------------------------------------------------------------
+MCP_RATE_LIMITS: Final[dict[str, tuple[float, float]]] = {
+    "task": (120 / 60, 30.0),
+    "telegram": (30 / 60, 10.0),
+}
+# Нижняя граница скорости после штрафов за 429 (доля от базовой)
+TOKEN_BUCKET_MIN_RATE_FRACTION: Final[float] = 0.125
+# Аддитивное восстановление скорости после успешного вызова (доля от базовой)
+TOKEN_BUCKET_RECOVERY_FRACTION: Final[float] = 0.1
+
+# ---------------------------------------------------------------------------
+# Кэш ответов read-only MCP инструментов (fallback при деградации)
+# ---------------------------------------------------------------------------
+RESPONSE_CACHE_MAXSIZE: Final[int] = 1024
+# Свежий ответ возвращается без обращения к серверу
+RESPONSE_CACHE_FRESH_TTL_SECONDS: Final[float] = 5.0
+# Устаревший ответ отдаётся только вместо ошибки, когда сервер недоступен
+RESPONSE_CACHE_STALE_TTL_SECONDS: Final[float] = 300.0
+
+# ---------------------------------------------------------------------------
+# Пул HTTP соединений для обращений к MCP серверам из процесса агента
+# ---------------------------------------------------------------------------
+MCP_HTTP_MAX_KEEPALIVE_CONNECTIONS: Final[int] = 100
+MCP_HTTP_MAX_CONNECTIONS: Final[int] = 200
+MCP_HTTP_KEEPALIVE_EXPIRY_SECONDS: Final[float] = 30.0
+# HTTP/2 (мультиплексирование запросов в одном соединении) - только с пакетом h2
+MCP_HTTP2_ENABLED: Final[bool] = importlib.util.find_spec("h2") is not None
+
 
 class MCPTimeoutError(Exception):
     """Возникает, когда вызов MCP инструмента превышает таймаут после всех повторов.
@@ -66,10 +126,497 @@ class MCPTimeoutError(Exception):
         timeout: Длительность таймаута в секундах, которая была превышена
     """
 
-    def __init__(self, tool_name: str, timeout: float) -> None:
+    def __init__(self, tool_name: str, timeout: float, message: str | None = None) -> None:
         self.tool_name = tool_name
         self.timeout = timeout
-        super().__init__(f"MCP tool '{tool_name}' timed out after {timeout}s")
+        super().__init__(message or f"MCP tool '{tool_name}' timed out after {timeout}s")
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return type(self), (self.tool_name, self.timeout, *self.args)
+
+
+class MCPCircuitOpenError(MCPTimeoutError):
+    """Возникает, когда circuit breaker MCP сервера разомкнут и вызов отклонён сразу.
+
+    Наследуется от ``MCPTimeoutError``, поэтому существующие обработчики таймаутов
+    продолжают работать без изменений.
+
+    Attributes:
+        server: Префикс MCP сервера, чей circuit breaker разомкнут
+        retry_in: Секунд до перехода breaker в HALF_OPEN
+    """
+
+    def __init__(self, tool_name: str, timeout: float, server: str, retry_in: float) -> None:
+        self.server = server
+        self.retry_in = retry_in
+        super().__init__(
+            tool_name,
+            timeout,
+            (
+                f"MCP circuit for '{server}' is open, '{tool_name}' rejected "
+                f"(retry in {retry_in:.1f}s)"
+            ),
+        )
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return type(self), (self.tool_name, self.timeout, self.server, self.retry_in)
+
+
+class CircuitState(Enum):
+    """Состояния circuit breaker."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+@dataclass
+class CircuitBreaker:
+    """Circuit breaker для одного MCP сервера (Closed/Open/Half-Open).
+
+    После ``failure_threshold`` подряд идущих сбоев breaker размыкается и все
+    вызовы отклоняются сразу. По истечении ``reset_timeout`` breaker переходит
+    в HALF_OPEN и пропускает по одной пробе; ``success_threshold`` успешных проб
+    замыкают его, любой сбой пробы снова размыкает.
+
+    Attributes:
+        failure_threshold: Количество сбоев подряд до размыкания
+        reset_timeout: Время в секундах в состоянии OPEN до первой пробы
+        success_threshold: Количество успешных проб для замыкания
+        state: Текущее состояние
+        failure_count: Сбои подряд в состоянии CLOSED
+        success_count: Успешные пробы в состоянии HALF_OPEN
+        opened_at: Момент размыкания по ``time.monotonic()``
+        half_open_probes: Пробы, выполняющиеся прямо сейчас
+    """
+
+    failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD
+    reset_timeout: float = CIRCUIT_RESET_TIMEOUT_SECONDS
+    success_threshold: int = CIRCUIT_SUCCESS_THRESHOLD
+    state: CircuitState = CircuitState.CLOSED
+    failure_count: int = 0
+    success_count: int = 0
+    opened_at: float = 0.0
+    half_open_probes: int = 0
+
+    def retry_in(self) -> float:
+        """Возвращает секунды до окончания cooldown (0, если breaker не в OPEN)."""
+        if self.state is not CircuitState.OPEN:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def can_attempt(self) -> bool:
+        """Проверяет, пропустил бы breaker вызов сейчас, не занимая слот пробы.
+
+        Returns:
+            False если вызов будет отклонён (OPEN до конца cooldown или проба уже идёт)
+        """
+        if self.state is CircuitState.CLOSED:
+            return True
+        if self.state is CircuitState.OPEN:
+            return time.monotonic() - self.opened_at >= self.reset_timeout
+        return self.half_open_probes < 1
+
+    def allow_request(self) -> bool:
+        """Проверяет, можно ли выполнить вызов, и занимает слот пробы в HALF_OPEN.
+
+        Занятый слот освобождают ``record_success()``/``record_failure()``, а если
+        у пробы нет исхода (отмена) -- ``release_probe()``.
+
+        Returns:
+            True если вызов разрешён, False если его нужно отклонить сразу
+        """
+        if self.state is CircuitState.CLOSED:
+            return True
+        if self.state is CircuitState.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self.state = CircuitState.HALF_OPEN
+            self.success_count = 0
+            self.half_open_probes = 0
+        # HALF_OPEN: only one probe in flight at a time
+        if self.half_open_probes >= 1:
+            return False
+        self.half_open_probes += 1
+        return True
+
+    def release_probe(self) -> None:
+        """Освобождает слот пробы в HALF_OPEN без записи успеха или сбоя."""
+        if self.state is CircuitState.HALF_OPEN and self.half_open_probes > 0:
+            self.half_open_probes -= 1
+
+    def record_success(self) -> None:
+        """Фиксирует успешный вызов (или ответ сервера, не являющийся сбоем)."""
+        if self.state is CircuitState.HALF_OPEN:
+            self.half_open_probes = 0
+            self.success_count += 1
+            if self.success_count >= self.success_threshold:
+                logger.info("Circuit breaker closed after %d successful probes", self.success_count)
+                self.state = CircuitState.CLOSED
+                self.success_count = 0
+        self.failure_count = 0
+
+    def record_failure(self) -> None:
+        """Фиксирует сбой (таймаут или 5xx) и размыкает breaker при превышении порога."""
+        if self.state is CircuitState.HALF_OPEN:
+            self._trip()
+            return
+        self.failure_count += 1
+        if self.failure_count >= self.failure_threshold:
+            self._trip()
+
+    def _trip(self) -> None:
+        """Переводит breaker в OPEN и сбрасывает счётчики."""
+        self.state = CircuitState.OPEN
+        self.opened_at = time.monotonic()
+        self.failure_count = 0
+        self.success_count = 0
+        self.half_open_probes = 0
+
+
+# Общий обработчик деградации для всех MCP вызовов (живёт дольше отдельного вызова)
+_DEGRADATION: Final[GracefulDegradation] = GracefulDegradation()
+
+# Circuit breakers по префиксу MCP сервера ("task", "telegram", "playwright")
+_CIRCUIT_BREAKERS: dict[str, CircuitBreaker] = {}
+
+
+def _mcp_server_of(tool_name: str) -> str:
+    """Извлекает префикс MCP сервера из имени инструмента (``mcp__task__GetIssue`` -> ``task``)."""
+    parts = tool_name.split("__")
+    if len(parts) >= 3 and parts[0] == "mcp":
+        return parts[1]
+    return tool_name
+
+
+def get_circuit_breaker(tool_name: str) -> CircuitBreaker:
+    """Возвращает (создавая при необходимости) circuit breaker для сервера инструмента.
+
+    Args:
+        tool_name: Полное имя MCP инструмента
+
+    Returns:
+        Общий для всех инструментов этого сервера CircuitBreaker
+    """
+    server = _mcp_server_of(tool_name)
+    breaker = _CIRCUIT_BREAKERS.get(server)
+    if breaker is None:
+        breaker = _CIRCUIT_BREAKERS[server] = CircuitBreaker()
+    return breaker
+
+
+def reset_circuit_breakers() -> None:
+    """Сбрасывает все circuit breakers (для тестов и ручного восстановления)."""
+    _CIRCUIT_BREAKERS.clear()
+
+
+@dataclass
+class TokenBucket:
+    """Token bucket, ограничивающий исходящую частоту вызовов одного MCP сервера.
+
+    Токены пополняются со скоростью ``rate`` в секунду до ``capacity``. Вызов
+    резервирует токен сразу, уводя баланс в минус, и ждёт, пока долг не будет
+    покрыт -- так параллельные вызовы выстраиваются в очередь без блокировки.
+
+    Скорость адаптируется по AIMD: ``penalize()`` на 429 уменьшает её вдвое
+    (не ниже ``TOKEN_BUCKET_MIN_RATE_FRACTION`` от базовой), ``reward()`` на успех
+    возвращает по ``TOKEN_BUCKET_RECOVERY_FRACTION`` до базовой.
+
+    Attributes:
+        base_rate: Настроенная скорость в токенах в секунду
+        capacity: Максимальный запас токенов (размер burst)
+        rate: Текущая (возможно сниженная) скорость
+        tokens: Текущий баланс, отрицательный при очереди ожидающих
+        last_refill: Момент последнего пополнения по ``time.monotonic()``
+    """
+
+    base_rate: float
+    capacity: float
+    rate: float = 0.0
+    tokens: float = -1.0
+    last_refill: float = -1.0
+
+    def __post_init__(self) -> None:
+        if self.rate <= 0:
+            self.rate = self.base_rate
+        if self.tokens < 0:
+            self.tokens = self.capacity
+        if self.last_refill < 0:
+            self.last_refill = time.monotonic()
+
+    def _refill(self) -> None:
+        """Начисляет токены за время с последнего пополнения."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    async def acquire(self) -> float:
+        """Забирает один токен, ожидая его появления при необходимости.
+
+        Returns:
+            Время ожидания в секундах (0, если токен был доступен сразу)
+        """
+        self._refill()
+        self.tokens -= 1.0
+        if self.tokens >= 0:
+            return 0.0
+        wait = -self.tokens / self.rate
+        await asyncio.sleep(wait)
+        return wait
+
+    def penalize(self) -> None:
+        """Уменьшает скорость вдвое после ответа 429 (multiplicative decrease)."""
+        self._refill()
+        self.rate = max(self.base_rate * TOKEN_BUCKET_MIN_RATE_FRACTION, self.rate / 2)
+
+    def reward(self) -> None:
+        """Постепенно возвращает скорость к базовой (additive increase)."""
+        if self.rate < self.base_rate:
+            self._refill()
+            self.rate = min(
+                self.base_rate, self.rate + self.base_rate * TOKEN_BUCKET_RECOVERY_FRACTION,
+            )
+
+
+# Token buckets по префиксу MCP сервера; серверы без лимита в MCP_RATE_LIMITS не ограничиваются
+_TOKEN_BUCKETS: dict[str, TokenBucket] = {}
+
+
+def get_token_bucket(tool_name: str) -> TokenBucket | None:
+    """Возвращает token bucket сервера инструмента или None, если лимит не задан.
+
+    Args:
+        tool_name: Полное имя MCP инструмента
+
+    Returns:
+        Общий для всех инструментов сервера TokenBucket или None
+    """
+    server = _mcp_server_of(tool_name)
+    bucket = _TOKEN_BUCKETS.get(server)
+    if bucket is None:
+        limits = MCP_RATE_LIMITS.get(server)
+        if limits is None:
+            return None
+        rate, capacity = limits
+        bucket = _TOKEN_BUCKETS[server] = TokenBucket(base_rate=rate, capacity=capacity)
+    return bucket
+
+
+def reset_token_buckets() -> None:
+    """Сбрасывает все token buckets (для тестов и ручного восстановления)."""
+    _TOKEN_BUCKETS.clear()
+
+
+# Идемпотентные read-only инструменты, ответы которых можно кэшировать.
+# Telegram_PollCommands исключён: он потребляет очередь команд.
+_READ_ONLY_TOOL_RE: Final[re.Pattern[str]] = re.compile(
+    r"^mcp__(?:task|telegram)__(?:[A-Za-z]+_)?(?:List|Get|WhoAmI)"
+)
+
+# Маркер промаха кэша (None -- допустимый ответ инструмента)
+_CACHE_MISS: Final[object] = object()
+
+
+class _ResponseCache:
+    """LRU кэш ответов MCP инструментов с меткой времени записи."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._entries: OrderedDict[tuple[str, str], tuple[Any, float]] = OrderedDict()
+
+    def get(self, key: tuple[str, str], max_age: float) -> Any:
+        """Возвращает значение не старше ``max_age`` секунд или ``_CACHE_MISS``."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return _CACHE_MISS
+        value, stored_at = entry
+        if time.monotonic() - stored_at > max_age:
+            return _CACHE_MISS
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: tuple[str, str], value: Any) -> None:
+        """Сохраняет значение, вытесняя самую старую запись при переполнении."""
+        self._entries[key] = (value, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate_server(self, server: str) -> None:
+        """Удаляет все записи инструментов сервера (после записи данных)."""
+        prefix = f"mcp__{server}__"
+        for key in [k for k in self._entries if k[0].startswith(prefix)]:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        """Очищает кэш."""
+        self._entries.clear()
+
+
+_RESPONSE_CACHE = _ResponseCache(RESPONSE_CACHE_MAXSIZE)
+
+
+def _response_cache_key(
+    tool_name: str, args: tuple[Any, ...], kwargs: dict[str, Any],
+) -> tuple[str, str] | None:
+    """Строит ключ кэша для read-only инструмента или None, если кэшировать нельзя."""
+    if not _READ_ONLY_TOOL_RE.match(tool_name):
+        return None
+    try:
+        return tool_name, json.dumps([args, kwargs], sort_keys=True, default=repr)
+    except (TypeError, ValueError):
+        return None
+
+
+def reset_response_cache() -> None:
+    """Очищает кэш ответов MCP инструментов (для тестов и ручного восстановления)."""
+    _RESPONSE_CACHE.clear()
+
+
+@functools.lru_cache(maxsize=1)
+def get_mcp_http_client() -> httpx.AsyncClient:
+    """Возвращает общий для процесса httpx.AsyncClient с пулом keep-alive соединений.
+
+    Повторные запросы к одному хосту переиспользуют TCP/TLS соединение вместо
+    нового рукопожатия на каждый вызов, а при установленном h2 HTTPS-запросы
+    (например, к api.telegram.org) идут по HTTP/2. Клиент живёт до конца
+    процесса и не должен закрываться вызывающим кодом (не используйте
+    ``async with``); при завершении используйте close_mcp_http_client().
+    """
+    return httpx.AsyncClient(
+        http2=MCP_HTTP2_ENABLED,
+        limits=httpx.Limits(
+            max_keepalive_connections=MCP_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            max_connections=MCP_HTTP_MAX_CONNECTIONS,
+            keepalive_expiry=MCP_HTTP_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+        timeout=MCP_TIMEOUT_SECONDS,
+    )
+
+
+async def close_mcp_http_client() -> None:
+    """Закрывает общий HTTP клиент, если он был создан.
+
+    Следующий вызов get_mcp_http_client() создаст новый клиент.
+    """
+    if get_mcp_http_client.cache_info().currsize == 0:
+        return
+    http_client = get_mcp_http_client()
+    get_mcp_http_client.cache_clear()
+    await http_client.aclose()
+
+
+def _status_code_of(exc: Exception) -> int | None:
+    """Возвращает HTTP статус из исключения (``status_code`` или ``response.status_code``)."""
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+# Retry-After в тексте ошибки, когда заголовки недоступны ("Retry-After: 8")
+_RETRY_AFTER_TEXT_RE: Final[re.Pattern[str]] = re.compile(
+    r"retry[-_ ]after[\s:=]+(\d+(?:\.\d+)?)", re.IGNORECASE,
+)
+
+# Значения X-RateLimit-Reset больше этого порога -- unix timestamp, меньше -- секунды
+_EPOCH_THRESHOLD_SECONDS: Final[float] = 1e9
+
+
+def _header_value(headers: Any, name: str) -> str | None:
+    """Читает заголовок без учёта регистра из httpx.Headers или обычного dict."""
+    if headers is None or not hasattr(headers, "get"):
+        return None
+    value = headers.get(name)
+    if value is None:
+        value = headers.get(name.lower())
+    return str(value) if value is not None else None
+
+
+def _parse_retry_after(value: str) -> float | None:
+    """Преобразует Retry-After (секунды или HTTP-date) в задержку в секундах."""
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def _extract_retry_after(exc: Exception) -> float | None:
+    """Извлекает рекомендованную сервером задержку из ошибки rate limit.
+
+    Проверяет ``Retry-After`` и ``X-RateLimit-Reset`` в ``exc.response.headers``
+    (или ``exc.headers``), затем ищет ``Retry-After: N`` в тексте ошибки.
+
+    Args:
+        exc: Исключение, полученное от MCP вызова
+
+    Returns:
+        Задержка в секундах или None, если сервер её не указал
+    """
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if headers is None:
+        headers = getattr(exc, "headers", None)
+
+    retry_after = _header_value(headers, "Retry-After")
+    if retry_after is not None:
+        parsed = _parse_retry_after(retry_after)
+        if parsed is not None:
+            return parsed
+
+    reset = _header_value(headers, "X-RateLimit-Reset")
+    if reset is not None:
+        try:
+            reset_value = float(reset)
+        except ValueError:
+            reset_value = None
+        if reset_value is not None:
+            if reset_value > _EPOCH_THRESHOLD_SECONDS:
+                return max(0.0, reset_value - time.time())
+            return max(0.0, reset_value)
+
+    match = _RETRY_AFTER_TEXT_RE.search(str(exc))
+    if match:
+        return float(match.group(1))
+    return None
+
+
+def _server_backoff(retry_after: float, max_backoff: float = MAX_BACKOFF_SECONDS) -> float:
+    """Задержка по указанию сервера с jitter 0..+20%.
+
+    Jitter только в большую сторону: повтор раньше Retry-After гарантированно
+    получит ещё один 429, а разброс всё равно разводит параллельных клиентов.
+    """
+    base = min(retry_after, max_backoff)
+    return base * (1.0 + 0.2 * random.random())
+
+
+def _is_server_failure(exc: Exception) -> bool:
+    """Проверяет, указывает ли ошибка на недоступность сервера (5xx или сбой соединения)."""
+    if isinstance(exc, OSError):
+        return True
+    status = _status_code_of(exc)
+    return status is not None and status >= 500
+
+
+def _backoff_schedule(initial: float) -> tuple[float, ...]:
+    """Базовые задержки (без jitter) для попыток ``0..MAX_RETRIES-1`` при константах модуля."""
+    return tuple(
+        min(initial * BACKOFF_MULTIPLIER ** attempt, MAX_BACKOFF_SECONDS)
+        for attempt in range(MAX_RETRIES)
+    )
+
+
+# Расписания задержек для стандартных начальных значений, вычисленные один раз
+_BACKOFF_SCHEDULES: Final[dict[float, tuple[float, ...]]] = {
+    INITIAL_BACKOFF_SECONDS: _backoff_schedule(INITIAL_BACKOFF_SECONDS),
+    RATE_LIMIT_INITIAL_BACKOFF_SECONDS: _backoff_schedule(RATE_LIMIT_INITIAL_BACKOFF_SECONDS),
+}
 
 
 def calculate_backoff(
@@ -84,6 +631,9 @@ def calculate_backoff(
     (ограничена ``max_backoff``), затем применяется случайный jitter +/-20% для
     предотвращения эффекта "thundering-herd".
 
+    Для параметров по умолчанию базовая задержка берётся из заранее вычисленного
+    расписания, так что на горячем пути остаётся одно умножение с jitter.
+
     Args:
         attempt: Индекс попытки с нуля (0 = первый повтор)
         initial: Базовая задержка в секундах для первого повтора
@@ -93,12 +643,30 @@ def calculate_backoff(
     Returns:
         Длительность задержки в секундах, всегда >= 0
     """
-    backoff = min(initial * (multiplier ** attempt), max_backoff)
-    jitter = backoff * 0.2 * (random.random() * 2 - 1)
-    return max(0.0, backoff + jitter)
+    schedule = None
+    if max_backoff == MAX_BACKOFF_SECONDS and multiplier == BACKOFF_MULTIPLIER:
+        schedule = _BACKOFF_SCHEDULES.get(initial)
+    if schedule is not None and 0 <= attempt < len(schedule):
+        backoff = schedule[attempt]
+    else:
+        backoff = min(initial * (multiplier ** attempt), max_backoff)
+    return max(0.0, backoff * (0.8 + 0.4 * random.random()))
+
+
+# Общий пустой результат хука: SDK только читает его (копирует ключи при
+# конвертации для CLI), поэтому один экземпляр безопасно разделять между вызовами.
+_EMPTY_HOOK_RESULT: Final[HookJSONOutput] = {}
+
+# Поля событий субагентов, читаемые за один вызов (при нехватке -- поштучно с default)
+_SUBAGENT_START_FIELDS: Final = operator.itemgetter("agent_id", "agent_type")
+_SUBAGENT_STOP_FIELDS: Final = operator.itemgetter(
+    "agent_id", "agent_type", "agent_transcript_path",
+)
 
 
-async def subagent_start_hook(input: dict[str, Any], tool_use_id: str | None, context: dict[str, Any]) -> dict[str, Any]:
+async def subagent_start_hook(
+    input: HookInput, tool_use_id: str | None, context: HookContext
+) -> HookJSONOutput:
     """
     Логирует запуск субагента для аудита.
 
@@ -107,13 +675,19 @@ async def subagent_start_hook(input: dict[str, Any], tool_use_id: str | None, co
         tool_use_id: Не используется для этого события
         context: Контекст хука (резерв)
     """
-    agent_id = input.get("agent_id", "unknown")
-    agent_type = input.get("agent_type", "unknown")
-    logger.info("Subagent started: id=%s type=%s", agent_id, agent_type)
-    return {}  # Продолжить выполнение без изменений
+    if logger.isEnabledFor(logging.INFO):
+        try:
+            agent_id, agent_type = _SUBAGENT_START_FIELDS(input)
+        except KeyError:
+            agent_id = input.get("agent_id", "unknown")
+            agent_type = input.get("agent_type", "unknown")
+        logger.info("Subagent started: id=%s type=%s", agent_id, agent_type)
+    return _EMPTY_HOOK_RESULT  # Продолжить выполнение без изменений
 
 
-async def subagent_stop_hook(input: dict[str, Any], tool_use_id: str | None, context: dict[str, Any]) -> dict[str, Any]:
+async def subagent_stop_hook(
+    input: HookInput, tool_use_id: str | None, context: HookContext
+) -> HookJSONOutput:
     """
     Логирует завершение субагента и путь к транскрипту.
 
@@ -122,11 +696,54 @@ async def subagent_stop_hook(input: dict[str, Any], tool_use_id: str | None, con
         tool_use_id: Не используется для этого события
         context: Контекст хука (резерв)
     """
-    agent_id = input.get("agent_id", "unknown")
-    agent_type = input.get("agent_type", "unknown")
-    transcript = input.get("agent_transcript_path", "n/a")
-    logger.info("Subagent stopped: id=%s type=%s transcript=%s", agent_id, agent_type, transcript)
-    return {}  # Продолжить выполнение без изменений
+    if logger.isEnabledFor(logging.INFO):
+        try:
+            agent_id, agent_type, transcript = _SUBAGENT_STOP_FIELDS(input)
+        except KeyError:
+            agent_id = input.get("agent_id", "unknown")
+            agent_type = input.get("agent_type", "unknown")
+            transcript = input.get("agent_transcript_path", "n/a")
+        logger.info(
+            "Subagent stopped: id=%s type=%s transcript=%s", agent_id, agent_type, transcript,
+        )
+    return _EMPTY_HOOK_RESULT  # Продолжить выполнение без изменений
+
+
+def _serve_stale(tool_name: str, cache_key: tuple[str, str] | None) -> Any:
+    """Возвращает устаревший кэшированный ответ для деградации или ``_CACHE_MISS``."""
+    if cache_key is None:
+        return _CACHE_MISS
+    stale = _RESPONSE_CACHE.get(cache_key, RESPONSE_CACHE_STALE_TTL_SECONDS)
+    if stale is not _CACHE_MISS:
+        logger.warning("Serving stale response for %s", tool_name)
+    return stale
+
+
+async def _await_with_timeout(coro: Coroutine[Any, Any, T], timeout: float) -> T:
+    """Ожидает корутину с таймаутом в текущей задаче, без обёртки в Task как у ``wait_for``."""
+    async with asyncio.timeout(timeout):
+        return await coro
+
+
+def _reject_open_circuit(
+    tool_name: str,
+    timeout: float,
+    server: str,
+    breaker: CircuitBreaker,
+    cache_key: tuple[str, str] | None,
+) -> Any:
+    """Отклоняет вызов при разомкнутом breaker: отдаёт устаревший ответ или бросает ошибку.
+
+    Raises:
+        MCPCircuitOpenError: Если подходящего ответа в кэше нет
+    """
+    logger.warning(
+        "MCP circuit for '%s' is open, failing fast on '%s'", server, tool_name,
+    )
+    stale = _serve_stale(tool_name, cache_key)
+    if stale is not _CACHE_MISS:
+        return stale
+    raise MCPCircuitOpenError(tool_name, timeout, server, breaker.retry_in())
 
 
 async def call_mcp_tool_with_retry(
@@ -135,23 +752,43 @@ async def call_mcp_tool_with_retry(
     *args: Any,
     timeout: float = MCP_TIMEOUT_SECONDS,
     max_retries: int = MAX_RETRIES,
+    deadline: float | None = None,
     **kwargs: Any,
 ) -> T:
     """Вызывает MCP инструмент с таймаутом и повторами с экспоненциальной задержкой.
 
-    Оборачивает ``call_fn`` в ``asyncio.wait_for`` для применения таймаута на каждый вызов.
-    При ``asyncio.TimeoutError`` повторяет с экспоненциальной задержкой. При ошибках
-    rate limit (HTTP 429 / "rate limit" в сообщении) использует большую начальную задержку.
+    Ожидает ``call_fn`` внутри ``asyncio.timeout`` для применения таймаута на каждый вызов.
+    При ``TimeoutError`` повторяет с экспоненциальной задержкой. При ошибках
+    rate limit (HTTP 429 / "rate limit" в сообщении) ждёт столько, сколько указал сервер
+    в ``Retry-After`` / ``X-RateLimit-Reset``, а без заголовков использует большую
+    начальную задержку.
 
     Когда все повторы исчерпаны, запускает плавную деградацию, помечая MCP сервис
     как деградированный через ``GracefulDegradation.protected()``.
 
+    Перед каждой попыткой проверяется circuit breaker сервера (префикс
+    ``tool_name``): пока он разомкнут, вызов отклоняется сразу без ожидания
+    таймаута. Таймауты, 5xx и сбои соединения считаются сбоями, 4xx и rate
+    limit -- нет. Затем попытка получает токен из token bucket сервера
+    (``MCP_RATE_LIMITS``), что сглаживает исходящий поток и предотвращает 429 заранее.
+
+    Ответы read-only инструментов (``List*``/``Get*``/``WhoAmI``) кэшируются:
+    ответ моложе ``RESPONSE_CACHE_FRESH_TTL_SECONDS`` возвращается без вызова, а
+    при разомкнутом breaker или исчерпанных повторах вместо ошибки отдаётся ответ
+    не старше ``RESPONSE_CACHE_STALE_TTL_SECONDS``. Успешный вызов любого другого
+    инструмента сервера сбрасывает его кэш.
+
+    Если задан ``deadline``, все попытки и паузы между ними укладываются в общий
+    бюджет: таймаут попытки сокращается до оставшегося времени, а повтор, который
+    не успевает до ``deadline``, не выполняется -- сразу включается деградация.
+
     Args:
         tool_name: Идентификатор MCP инструмента (для сообщений об ошибках и отслеживания деградации)
         call_fn: Асинхронная функция, выполняющая фактический вызов MCP инструмента
         *args: Позиционные аргументы, переданные в ``call_fn``
         timeout: Таймаут на один вызов в секундах
         max_retries: Максимальное количество попыток (включая первый вызов)
+        deadline: Крайний срок всего вызова по ``time.monotonic()`` (None -- без ограничения)
         **kwargs: Ключевые аргументы, переданные в ``call_fn``
 
     Returns:
@@ -159,16 +796,55 @@ async def call_mcp_tool_with_retry(
 
     Raises:
         MCPTimeoutError: Если все повторы исчерпаны из-за таймаутов
+        MCPCircuitOpenError: Если circuit breaker сервера разомкнут
         Exception: Повторно вызывается rate-limit или другие ошибки после исчерпания повторов
     """
     last_exception: Exception | None = None
+    server = _mcp_server_of(tool_name)
+    breaker = get_circuit_breaker(tool_name)
+    bucket = get_token_bucket(tool_name)
+    cache_key = _response_cache_key(tool_name, args, kwargs)
+
+    if cache_key is not None:
+        cached = _RESPONSE_CACHE.get(cache_key, RESPONSE_CACHE_FRESH_TTL_SECONDS)
+        if cached is not _CACHE_MISS:
+            return cast(T, cached)
 
     for attempt in range(max_retries):
+        # Fail fast before waiting for a token; the probe slot is taken only
+        # right before the call, so a deadline exit or a cancelled wait holds none
+        if not breaker.can_attempt():
+            return cast(T, _reject_open_circuit(tool_name, timeout, server, breaker, cache_key))
+
+        if bucket is not None:
+            await bucket.acquire()
+
+        call_timeout = timeout
+        if deadline is not None:
+            call_timeout = min(timeout, deadline - time.monotonic())
+            if call_timeout <= 0:
+                logger.warning("Deadline for MCP tool '%s' exhausted", tool_name)
+                break
+
+        # Another caller may have taken the probe slot during the token wait
+        if not breaker.allow_request():
+            return cast(T, _reject_open_circuit(tool_name, timeout, server, breaker, cache_key))
+
+        outcome_recorded = False
         try:
-            result = await asyncio.wait_for(
+            result = await _await_with_timeout(
                 call_fn(*args, **kwargs),
-                timeout=timeout,
+                timeout=call_timeout,
             )
+            breaker.record_success()
+            outcome_recorded = True
+            if bucket is not None:
+                bucket.reward()
+            if cache_key is not None:
+                _RESPONSE_CACHE.put(cache_key, result)
+            else:
+                # A write may have changed what the read-only tools would return
+                _RESPONSE_CACHE.invalidate_server(server)
             if attempt > 0:
                 logger.info(
                     "MCP tool '%s' succeeded on attempt %d/%d",
@@ -176,9 +852,11 @@ async def call_mcp_tool_with_retry(
                 )
             return result
 
-        except asyncio.TimeoutError:
-            last_exception = asyncio.TimeoutError(
-                f"MCP tool '{tool_name}' timed out after {timeout}s"
+        except TimeoutError:
+            breaker.record_failure()
+            outcome_recorded = True
+            last_exception = TimeoutError(
+                f"MCP tool '{tool_name}' timed out after {call_timeout}s"
             )
             logger.warning(
                 "MCP tool '%s' timed out (attempt %d/%d)",
@@ -186,20 +864,36 @@ async def call_mcp_tool_with_retry(
             )
             if attempt < max_retries - 1:
                 backoff = calculate_backoff(attempt)
+                if deadline is not None and time.monotonic() + backoff > deadline:
+                    break
                 logger.info("Retrying '%s' in %.2fs...", tool_name, backoff)
                 await asyncio.sleep(backoff)
 
         except Exception as exc:
             last_exception = exc
+            # Only server-side failures trip the breaker; 4xx means the server is alive
+            if _is_server_failure(exc):
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            outcome_recorded = True
             if _is_rate_limit_error(exc):
+                if bucket is not None:
+                    bucket.penalize()
                 logger.warning(
                     "MCP tool '%s' rate limited (attempt %d/%d): %s",
                     tool_name, attempt + 1, max_retries, exc,
                 )
                 if attempt < max_retries - 1:
-                    backoff = calculate_backoff(
-                        attempt, initial=RATE_LIMIT_INITIAL_BACKOFF_SECONDS,
-                    )
+                    retry_after = _extract_retry_after(exc)
+                    if retry_after is not None:
+                        backoff = _server_backoff(retry_after)
+                    else:
+                        backoff = calculate_backoff(
+                            attempt, initial=RATE_LIMIT_INITIAL_BACKOFF_SECONDS,
+                        )
+                    if deadline is not None and time.monotonic() + backoff > deadline:
+                        break
                     logger.info(
                         "Rate limit backoff for '%s': %.2fs", tool_name, backoff,
                     )
@@ -208,10 +902,19 @@ async def call_mcp_tool_with_retry(
                 # Non-retryable error -- propagate immediately
                 raise
 
-    # All retries exhausted -- trigger graceful degradation
-    recovery = GracefulDegradation()
-    async with recovery.protected(FailureType.MCP_TIMEOUT):
-        if isinstance(last_exception, asyncio.TimeoutError):
+        finally:
+            # Cancelled before the call had an outcome: free the HALF_OPEN probe slot
+            if not outcome_recorded:
+                breaker.release_probe()
+
+    # All retries exhausted -- prefer a stale answer over an error for reads
+    stale = _serve_stale(tool_name, cache_key)
+    if stale is not _CACHE_MISS:
+        return cast(T, stale)
+
+    # Trigger graceful degradation
+    async with _DEGRADATION.protected(FailureType.MCP_TIMEOUT):
+        if isinstance(last_exception, TimeoutError):
             raise MCPTimeoutError(tool_name, timeout)
         if last_exception is not None:
             raise last_exception
@@ -268,13 +971,53 @@ BUILTIN_TOOLS: list[str] = [
     "Bash",
 ]
 
-# Директория промптов
-PROMPTS_DIR = Path(str(importlib.resources.files("axon_agent") / "prompts"))
+# Статические части ClaudeAgentOptions: одинаковы для всех клиентов, поэтому
+# собираются один раз при импорте (SDK их только читает).
+_ALLOWED_TOOLS: Final[list[str]] = [*BUILTIN_TOOLS, *ALL_MCP_TOOLS]
+_PLAYWRIGHT_MCP_CONFIG: Final[McpServerConfig] = {
+    "command": "npx",
+    "args": ["-y", "@playwright/mcp@latest"],
+}
+# bash_security_hook принимает только PreToolUseHookInput (matcher="Bash"
+# гарантирует это), поэтому для HookCallback ему нужен cast; субагентные хуки
+# уже объявлены с сигнатурой HookCallback.
+_PRE_TOOL_USE_MATCHERS: Final[tuple[HookMatcher, ...]] = (
+    HookMatcher(matcher="Bash", hooks=[cast(HookCallback, bash_security_hook)]),
+)
+_SUBAGENT_START_MATCHERS: Final[tuple[HookMatcher, ...]] = (
+    HookMatcher(hooks=[subagent_start_hook]),
+)
+_SUBAGENT_STOP_MATCHERS: Final[tuple[HookMatcher, ...]] = (
+    HookMatcher(hooks=[subagent_stop_hook]),
+)
+_HOOKS_CONFIG: Final[dict[HookEvent, list[HookMatcher]]] = {
+    "PreToolUse": list(_PRE_TOOL_USE_MATCHERS),
+    "SubagentStart": list(_SUBAGENT_START_MATCHERS),
+    "SubagentStop": list(_SUBAGENT_STOP_MATCHERS),
+}
+
+# Директория промптов (вычисляется один раз при импорте)
+PROMPTS_DIR: Final[Path] = Path(str(importlib.resources.files("axon_agent") / "prompts"))
 
 
+@functools.lru_cache(maxsize=1)
 def load_orchestrator_prompt() -> str:
-    """Загружает системный промпт оркестратора."""
-    return (PROMPTS_DIR / "orchestrator_prompt.md").read_text()
+    """Загружает системный промпт оркестратора (читается с диска один раз за процесс).
+
+    Файл читается как байты и декодируется как UTF-8 явно: без зависимости от
+    локали и без перевода концов строк текстовым слоем.
+    """
+    return (PROMPTS_DIR / "orchestrator_prompt.md").read_bytes().decode("utf-8")
+
+
+# Bash команды, вывод которых обрезается как git diff
+_BASH_DIFF_RE: Final[re.Pattern[str]] = re.compile(r"\bdiff\b", re.IGNORECASE)
+
+# Инструменты, вывод которых общий обрезчик режет по лимиту git diff
+_SHELL_TOOL_NAMES: Final[frozenset[str]] = frozenset({"git", "bash"})
+
+# Вывод, превышающий лимит не более чем на 10%, обрезается простым срезом
+TOOL_OUTPUT_NEAR_LIMIT_CHARS: Final[int] = int(TOOL_OUTPUT_MAX_CHARS * 1.1)
 
 
 def tool_output_truncation_hook(tool_name: str, tool_input: dict, tool_output: str) -> str:
@@ -284,6 +1027,12 @@ def tool_output_truncation_hook(tool_name: str, tool_input: dict, tool_output: s
     Этот middleware запускается после каждого выполнения инструмента и обрезает
     выводы, превышающие настроенный лимит, чтобы сохранить контекстный бюджет.
 
+    Вывод чуть длиннее лимита (до ``TOOL_OUTPUT_NEAR_LIMIT_CHARS``) обрезается
+    срезом без полного сканирования общим обрезчиком. Больший вывод без
+    скриншотов от не-shell инструментов сразу режется на начало и конец;
+    общему обрезчику с его поиском маркеров по всему тексту достаются только
+    скриншоты и вывод Bash/git.
+
     Args:
         tool_name: Имя выполненного инструмента
         tool_input: Входные параметры, переданные инструменту
@@ -296,14 +1045,24 @@ def tool_output_truncation_hook(tool_name: str, tool_input: dict, tool_output: s
         return tool_output
 
     # Special handling for git/bash commands
-    if tool_name.lower() == "bash":
+    if tool_name == "Bash":
         command = tool_input.get("command", "")
-        if "diff" in command.lower():
+        if _BASH_DIFF_RE.search(command) is not None:
             truncated, _ = truncate_git_diff(tool_output)
             return truncated
 
-    # General truncation
-    truncated, was_truncated = truncate_tool_output(tool_output, tool_name)
+    has_image = "data:image/" in tool_output
+    if len(tool_output) <= TOOL_OUTPUT_NEAR_LIMIT_CHARS and not has_image:
+        # Near-limit fast path: nothing worth a head/tail split or base64 scrub
+        truncated = tool_output[:TOOL_OUTPUT_MAX_CHARS] + "\n...[truncated]"
+        was_truncated = True
+    elif not has_image and tool_name.lower() not in _SHELL_TOOL_NAMES:
+        # Plain text: slice head and tail without the general truncator's full-text scans
+        truncated = truncate_head_tail(tool_output)
+        was_truncated = True
+    else:
+        # Screenshots and shell output (diff markers, shell limits)
+        truncated, was_truncated = truncate_tool_output(tool_output, tool_name)
 
     if was_truncated:
         # Track in context manager
@@ -313,10 +1072,14 @@ def tool_output_truncation_hook(tool_name: str, tool_input: dict, tool_output: s
     return truncated
 
 
+@functools.lru_cache(maxsize=1)
 def create_security_settings() -> SecuritySettings:
     """
     Создаёт структуру настроек безопасности.
 
+    Настройки зависят только от констант модуля, поэтому строятся один раз
+    за процесс; возвращаемый объект общий и не должен изменяться.
+
     Returns:
         SecuritySettings с настроенными sandbox и разрешениями
     """
@@ -345,10 +1108,30 @@ def create_security_settings() -> SecuritySettings:
     )
 
 
+# Настройки по умолчанию, сериализованные один раз при импорте
+_SETTINGS_JSON_BYTES: Final[bytes] = json.dumps(
+    create_security_settings(), indent=2,
+).encode("utf-8")
+
+
+def _serialize_settings(settings: SecuritySettings) -> bytes:
+    """Возвращает JSON настроек, используя заранее сериализованные байты по умолчанию."""
+    if settings is create_security_settings():
+        return _SETTINGS_JSON_BYTES
+    return json.dumps(settings, indent=2).encode("utf-8")
+
+
 def write_security_settings(project_dir: Path, settings: SecuritySettings) -> Path:
     """
     Write security settings to project directory.
 
+    The write is skipped when the file already holds identical content,
+    which is the common case for every client after the first one.
+    Otherwise the bytes go to a uniquely named sibling temp file (mode 0600)
+    that is fsynced and then atomically swapped in with ``os.replace``, so a
+    crash never leaves a torn or empty file and concurrent writers sharing
+    the project directory never clobber each other's temp file.
+
     Args:
         project_dir: Directory to write settings to
         settings: Security settings to write
@@ -362,10 +1145,29 @@ def write_security_settings(project_dir: Path, settings: SecuritySettings) -> Pa
     project_dir.mkdir(parents=True, exist_ok=True)
     settings_file: Path = project_dir / ".claude_settings.json"
 
+    payload = _serialize_settings(settings)
+    tmp_path: str | None = None
+
     try:
-        with open(settings_file, "w") as f:
-            json.dump(settings, f, indent=2)
+        if settings_file.is_file() and settings_file.read_bytes() == payload:
+            return settings_file
+        fd, tmp_path = tempfile.mkstemp(
+            suffix=".tmp",
+            prefix=".claude_settings_",
+            dir=str(project_dir),
+        )
+        try:
+            view = memoryview(payload)
+            while view:
+                view = view[os.write(fd, view):]
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, settings_file)
     except IOError as e:
+        if tmp_path is not None:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp_path)
         raise IOError(
             f"Failed to write security settings to {settings_file}: {e}\n"
             f"Check disk space and file permissions.\n"
@@ -375,13 +1177,16 @@ def write_security_settings(project_dir: Path, settings: SecuritySettings) -> Pa
     return settings_file
 
 
-def create_client(project_dir: Path, model: str) -> ClaudeSDKClient:
+def create_client(project_dir: Path, model: str, verbose: bool | None = None) -> ClaudeSDKClient:
     """
     Создаёт Claude Agent SDK клиент с многоуровневой безопасностью.
 
     Args:
         project_dir: Директория проекта
         model: Модель Claude для использования
+        verbose: Печатать сводку настроек в stdout. По умолчанию только в
+            интерактивном терминале или при заданном ``AXON_VERBOSE_STARTUP``;
+            иначе сводка уходит в лог на уровне INFO
 
     Returns:
         Настроенный ClaudeSDKClient
@@ -410,23 +1215,122 @@ def create_client(project_dir: Path, model: str) -> ClaudeSDKClient:
     security_settings: SecuritySettings = create_security_settings()
     settings_file: Path = write_security_settings(project_dir, security_settings)
 
-    # Get context budget info (ENG-29)
-    ctx_manager = get_context_manager()
-    max_tokens = ctx_manager.budget.max_tokens
-
-    print(f"Created security settings at {settings_file}")
-    print("   - Sandbox enabled (OS-level bash isolation)")
-    print(f"   - Filesystem restricted to: {project_dir.resolve()}")
-    print("   - Bash commands restricted to allowlist (see security.py)")
-    print(f"   - Context budget: {max_tokens:,} tokens (MAX_CONTEXT_TOKENS)")
-    print(f"   - Compact mode: 70% ({int(max_tokens * 0.7):,} tokens)")
-    print(f"   - Graceful shutdown: 85% ({int(max_tokens * 0.85):,} tokens)")
-    print(f"   - Tool output limit: {TOOL_OUTPUT_MAX_CHARS:,} chars")
-    print(f"   - MCP servers:")
-    print(f"       - playwright (browser automation)")
-    print(f"       - task ({task_config['url']})")
-    print(f"       - telegram ({telegram_config['url']})")
-    print()
+    return _build_client(
+        project_dir, model, task_config, telegram_config, settings_file, verbose=verbose
+    )
+
+
+# Команда прогрева npx кэша Playwright MCP (без запуска сервера)
+PLAYWRIGHT_WARMUP_COMMAND: Final[tuple[str, ...]] = ("npx", "-y", "@playwright/mcp@latest", "--version")
+PLAYWRIGHT_WARMUP_TIMEOUT_SECONDS: Final[float] = 120.0
+
+async def warmup_playwright() -> None:
+    """
+    Прогревает npx кэш Playwright MCP, чтобы первый вызов браузера не ждал загрузки.
+
+    Запускается фоновой задачей владельцем цикла агента, который отменяет её
+    на выходе. Процесс npx, не завершившийся сам (таймаут или отмена задачи),
+    убивается и дожидается, чтобы не пережить агента и не остаться зомби.
+    """
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *PLAYWRIGHT_WARMUP_COMMAND,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+    except OSError as exc:
+        logger.info("Playwright MCP warm-up skipped: %s", exc)
+        return
+    try:
+        await asyncio.wait_for(proc.wait(), timeout=PLAYWRIGHT_WARMUP_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        logger.warning("Playwright MCP warm-up timed out")
+    finally:
+        if proc.returncode is None:
+            with contextlib.suppress(ProcessLookupError):
+                proc.kill()
+            await proc.wait()
+
+
+async def create_client_async(
+    project_dir: Path, model: str, verbose: bool | None = None
+) -> ClaudeSDKClient:
+    """
+    Асинхронный вариант ``create_client`` для вызова из event loop.
+
+    Валидация MCP конфигурации, получение конфигов серверов и запись настроек
+    безопасности выполняются параллельно в пуле потоков, не блокируя loop.
+    Прогрев npx кэша Playwright MCP запускает владелец цикла (см.
+    ``warmup_playwright``).
+
+    Args:
+        project_dir: Директория проекта
+        model: Модель Claude для использования
+        verbose: Печатать сводку настроек в stdout. По умолчанию только в
+            интерактивном терминале или при заданном ``AXON_VERBOSE_STARTUP``;
+            иначе сводка уходит в лог на уровне INFO
+
+    Returns:
+        Настроенный ClaudeSDKClient
+
+    Raises:
+        ValueError: Если не установлены необходимые переменные окружения
+    """
+    _, task_config, telegram_config, settings_file = await asyncio.gather(
+        asyncio.to_thread(validate_mcp_config),
+        asyncio.to_thread(get_task_mcp_config),
+        asyncio.to_thread(get_telegram_mcp_config),
+        asyncio.to_thread(write_security_settings, project_dir, create_security_settings()),
+    )
+
+    return _build_client(
+        project_dir, model, task_config, telegram_config, settings_file, verbose=verbose
+    )
+
+
+def _format_startup_banner(
+    project_dir: Path, settings_file: Path, max_tokens: int, task_url: str, telegram_url: str
+) -> str:
+    """Форматирует сводку настроек клиента, выводимую при запуске, одной строкой."""
+    return f"""Created security settings at {settings_file}
+   - Sandbox enabled (OS-level bash isolation)
+   - Filesystem restricted to: {project_dir.resolve()}
+   - Bash commands restricted to allowlist (see security.py)
+   - Context budget: {max_tokens:,} tokens (MAX_CONTEXT_TOKENS)
+   - Compact mode: {WARNING_THRESHOLD:.0%} ({int(max_tokens * WARNING_THRESHOLD):,} tokens)
+   - Graceful shutdown: {CRITICAL_THRESHOLD:.0%} ({int(max_tokens * CRITICAL_THRESHOLD):,} tokens)
+   - Tool output limit: {TOOL_OUTPUT_MAX_CHARS:,} chars
+   - MCP servers:
+       - playwright (browser automation)
+       - task ({task_url})
+       - telegram ({telegram_url})
+"""
+
+
+def _build_client(
+    project_dir: Path,
+    model: str,
+    task_config: Mapping[str, Any],
+    telegram_config: Mapping[str, Any],
+    settings_file: Path,
+    verbose: bool | None = None,
+) -> ClaudeSDKClient:
+    """Собирает ClaudeSDKClient из уже подготовленных конфигов и файла настроек."""
+    if verbose is None:
+        verbose = sys.stdout.isatty() or bool(os.environ.get("AXON_VERBOSE_STARTUP"))
+    if verbose or logger.isEnabledFor(logging.INFO):
+        # Get context budget info (ENG-29)
+        banner = _format_startup_banner(
+            project_dir,
+            settings_file,
+            get_context_manager().budget.max_tokens,
+            task_config["url"],
+            telegram_config["url"],
+        )
+        if verbose:
+            print(banner)
+        else:
+            logger.info(banner)
 
     # Load orchestrator prompt as system prompt
     orchestrator_prompt = load_orchestrator_prompt()
@@ -435,36 +1339,16 @@ def create_client(project_dir: Path, model: str) -> ClaudeSDKClient:
         options=ClaudeAgentOptions(
             model=model,
             system_prompt=orchestrator_prompt,
-            allowed_tools=[
-                *BUILTIN_TOOLS,
-                *ALL_MCP_TOOLS,
-            ],
+            allowed_tools=_ALLOWED_TOOLS,
             mcp_servers=cast(
                 dict[str, McpServerConfig],
                 {
-                    "playwright": {"command": "npx", "args": ["-y", "@playwright/mcp@latest"]},
+                    "playwright": _PLAYWRIGHT_MCP_CONFIG,
                     "task": task_config,
                     "telegram": telegram_config,
                 },
             ),
-            hooks={
-                "PreToolUse": [
-                    HookMatcher(
-                        matcher="Bash",
-                        hooks=[cast(HookCallback, bash_security_hook)],
-                    ),
-                ],
-                "SubagentStart": [
-                    HookMatcher(
-                        hooks=[cast(HookCallback, subagent_start_hook)],
-                    ),
-                ],
-                "SubagentStop": [
-                    HookMatcher(
-                        hooks=[cast(HookCallback, subagent_stop_hook)],
-                    ),
-                ],
-            },
+            hooks=_HOOKS_CONFIG,
             agents=AGENT_DEFINITIONS,
             max_turns=1000,
             cwd=str(project_dir.resolve()),
@@ -14,17 +14,30 @@
 """
 
 import ast
+import contextlib
+import hashlib
+import inspect
+import logging
 import os
+import pickle
 import re
+import stat
+import sys
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 from typing import Callable
 
+logger = logging.getLogger("context")
 
 # Token estimation: ~4 chars per token for English/code
 CHARS_PER_TOKEN = 4
 
+# Memoized counts kept when a real tokenizer is enabled (AXON_TOKENIZER)
+TOKEN_CACHE_MAXSIZE = 4096
+
 # Default context budget - configurable via MAX_CONTEXT_TOKENS env var
 # Default: 180000 for claude-3-5-sonnet (leaves headroom from 200k limit)
 DEFAULT_MAX_TOKENS = int(os.environ.get("MAX_CONTEXT_TOKENS", "180000"))
@@ -41,6 +54,44 @@ TOOL_OUTPUT_TRUNCATE_FIRST = 2000
 TOOL_OUTPUT_TRUNCATE_LAST = 2000
 GIT_DIFF_MAX_CHARS = 3000
 
+# Case-insensitive dispatch markers, searched without lowercasing the output
+_DIFF_MARKER_RE = re.compile("diff", re.IGNORECASE)
+_IMAGE_MARKER_RE = re.compile("base64|data:image", re.IGNORECASE)
+
+# Key actions noted when summarizing old history, highest priority first.
+# The lookahead reports overlapping hits; ASCII folding matches str.lower()
+# for these words.
+_HISTORY_ACTIONS = ("commit", "test", "implement")
+_HISTORY_ACTION_RE = re.compile(
+    "(?=(" + "|".join(_HISTORY_ACTIONS) + "))", re.IGNORECASE | re.ASCII
+)
+
+# Base64 data URLs embedded in screenshot outputs
+_BASE64_IMAGE_RE = re.compile(r"data:image/[^;]+;base64,[A-Za-z0-9+/=]+")
+
+# In-memory FileCache bounds (LRU): number of files and total cached text
+FILE_CACHE_MAX_ENTRIES = 128
+FILE_CACHE_MAX_CONTENT_CHARS = 50_000_000
+
+# Persistent AST cache used by ContextManager: pickled trees keyed by sha256
+# of the source. Off unless AXON_AST_CACHE_DIR is set - loading a pickle is
+# only 20-35% faster than ast.parse, which does not justify a disk footprint
+# by default. Bump AST_CACHE_VERSION when the cached payload format changes;
+# the Python minor version is part of the directory name because AST node
+# layouts differ between interpreter versions. Entries are unpickled, so the
+# directory must be private to the user: it is created with mode 0700 and
+# ignored if it is owned by someone else or writable by group/others.
+# Least recently used entries are pruned down to AST_CACHE_MAX_BYTES.
+AST_CACHE_VERSION = 1
+AST_CACHE_MAX_BYTES = 64 * 1024 * 1024
+_ast_cache_root = os.environ.get("AXON_AST_CACHE_DIR")
+AST_CACHE_DIR: Path | None = (
+    Path(_ast_cache_root)
+    / f"source-ast-cache-py{sys.version_info[0]}{sys.version_info[1]}-v{AST_CACHE_VERSION}"
+    if _ast_cache_root
+    else None
+)
+
 # Categories for context breakdown
 CONTEXT_CATEGORIES = ["system_prompt", "files", "history", "memory", "issue", "tool_outputs"]
 
@@ -66,11 +117,35 @@ class ContextBudget:
         "issue": 0,
         "tool_outputs": 0,
     })
+    # Running sum of breakdown, kept in step by add() and set()
+    _total: int = field(init=False, repr=False, compare=False, default=0)
+    # Bumped by add()/set(); keys the memoised ratio and mode below
+    _version: int = field(init=False, repr=False, compare=False, default=0)
+    _derived: tuple[int, int, float, str] | None = field(
+        init=False, repr=False, compare=False, default=None
+    )
+
+    def __post_init__(self) -> None:
+        self._total = sum(self.breakdown.values())
+
+    def _derive(self) -> tuple[int, int, float, str]:
+        """Return (version, max_tokens, usage_ratio, mode), recomputing on change."""
+        derived = self._derived
+        if derived is None or derived[0] != self._version or derived[1] != self.max_tokens:
+            ratio = self._total / self.max_tokens
+            if ratio >= CRITICAL_THRESHOLD:
+                mode = ContextMode.CRITICAL
+            elif ratio >= WARNING_THRESHOLD:
+                mode = ContextMode.COMPACT
+            else:
+                mode = ContextMode.NORMAL
+            derived = self._derived = (self._version, self.max_tokens, ratio, mode)
+        return derived
 
     @property
     def total_used(self) -> int:
         """Total tokens used across all categories."""
-        return sum(self.breakdown.values())
+        return self._total
 
     @property
     def remaining(self) -> int:
@@ -80,41 +155,41 @@ class ContextBudget:
     @property
     def usage_percent(self) -> float:
         """Usage as percentage of max."""
-        return (self.total_used / self.max_tokens) * 100
+        return self._derive()[2] * 100
 
     @property
     def usage_ratio(self) -> float:
         """Usage as decimal ratio (0.0 to 1.0)."""
-        return self.total_used / self.max_tokens
+        return self._derive()[2]
 
     @property
     def is_warning(self) -> bool:
         """True if usage exceeds warning threshold (70%)."""
-        return self.usage_ratio >= WARNING_THRESHOLD
+        return self._derive()[2] >= WARNING_THRESHOLD
 
     @property
     def is_critical(self) -> bool:
         """True if usage exceeds critical threshold (85%)."""
-        return self.usage_ratio >= CRITICAL_THRESHOLD
+        return self._derive()[3] == ContextMode.CRITICAL
 
     @property
     def mode(self) -> str:
         """Get current context mode based on usage (ENG-29)."""
-        if self.is_critical:
-            return ContextMode.CRITICAL
-        elif self.is_warning:
-            return ContextMode.COMPACT
-        return ContextMode.NORMAL
+        return self._derive()[3]
 
     def add(self, category: str, tokens: int) -> None:
         """Add tokens to a category."""
         if category in self.breakdown:
             self.breakdown[category] += tokens
+            self._total += tokens
+            self._version += 1
 
     def set(self, category: str, tokens: int) -> None:
         """Set tokens for a category (replaces existing)."""
         if category in self.breakdown:
+            self._total += tokens - self.breakdown[category]
             self.breakdown[category] = tokens
+            self._version += 1
 
     def to_dict(self) -> dict:
         """Export as dictionary for API/UI."""
@@ -134,7 +209,7 @@ class ContextBudget:
         """Format for CLI display."""
         bar_width = 30
         filled = int((self.usage_percent / 100) * bar_width)
-        bar = "[" + "=" * filled + " " * (bar_width - filled) + "]"
+        bar = f"[{'=' * filled:<{bar_width}}]"
 
         if self.is_critical:
             status = " CRITICAL"
@@ -154,11 +229,73 @@ class ContextBudget:
         return "\n".join(lines)
 
 
+class _TokenEstimator:
+    """Token counter with an LRU memo in front of a real tokenizer.
+
+    The default ``len // CHARS_PER_TOKEN`` heuristic is O(1) and is never
+    cached - hashing the text would cost more than the estimate itself.
+    When ``AXON_TOKENIZER=tiktoken`` is set and tiktoken is installed, the
+    O(n) encoder runs behind a memo keyed by ``(hash(text), len(text))``;
+    repeated system prompts and tool outputs then cost one dict lookup.
+    The key keeps no reference to the text, so large outputs are not retained.
+    """
+
+    def __init__(
+        self, count: Callable[[str], int] | None = None, maxsize: int = TOKEN_CACHE_MAXSIZE
+    ):
+        self._count = count
+        self._maxsize = maxsize
+        self._memo: OrderedDict[tuple[int, int], int] = OrderedDict()
+
+    def __call__(self, text: str) -> int:
+        if self._count is None:
+            return len(text) // CHARS_PER_TOKEN
+
+        key = (hash(text), len(text))
+        tokens = self._memo.get(key)
+        if tokens is not None:
+            self._memo.move_to_end(key)
+            return tokens
+
+        tokens = self._count(text)
+        self._memo[key] = tokens
+        if len(self._memo) > self._maxsize:
+            self._memo.popitem(last=False)
+        return tokens
+
+    def cache_clear(self) -> None:
+        """Drop memoized counts."""
+        self._memo.clear()
+
+
+def _load_tokenizer() -> Callable[[str], int] | None:
+    """Return the tokenizer selected by ``AXON_TOKENIZER``, or None for the heuristic."""
+    if os.environ.get("AXON_TOKENIZER", "").lower() != "tiktoken":
+        return None
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    encoding = tiktoken.get_encoding("cl100k_base")
+    return lambda text: len(encoding.encode(text, disallowed_special=()))
+
+
+_token_estimator = _TokenEstimator(_load_tokenizer())
+
+
 def estimate_tokens(text: str) -> int:
     """Estimate token count from text."""
     if not text:
         return 0
-    return len(text) // CHARS_PER_TOKEN
+    return _token_estimator(text)
+
+
+def _estimate_dict_tokens(data: dict) -> int:
+    """Estimate tokens of a dict's values without building its full repr."""
+    return sum(
+        estimate_tokens(value if isinstance(value, str) else repr(value))
+        for value in data.values()
+    )
 
 
 def truncate_tool_output(output: str, tool_name: str = "") -> tuple[str, bool]:
@@ -175,30 +312,41 @@ def truncate_tool_output(output: str, tool_name: str = "") -> tuple[str, bool]:
     if not output:
         return output, False
 
+    is_shell = tool_name.lower() in ("git", "bash")
+
+    # Fast path: nothing to cut, so only embedded image data can change it
+    if len(output) <= (GIT_DIFF_MAX_CHARS if is_shell else TOOL_OUTPUT_MAX_CHARS):
+        if "data:image/" in output:
+            return truncate_screenshot_output(output)
+        return output, False
+
     # Special handling for git diff - show stat + first files
-    if tool_name.lower() in ("git", "bash") and "diff" in output.lower():
+    if is_shell and _DIFF_MARKER_RE.search(output):
         return truncate_git_diff(output)
 
     # Special handling for screenshots - only keep path, not base64
-    if "base64" in output.lower() or "data:image" in output.lower():
+    if _IMAGE_MARKER_RE.search(output):
         return truncate_screenshot_output(output)
 
     # General truncation for long outputs
     if len(output) <= TOOL_OUTPUT_MAX_CHARS:
         return output, False
 
+    return truncate_head_tail(output), True
+
+
+def truncate_head_tail(output: str) -> str:
+    """Keep the first and last TOOL_OUTPUT_TRUNCATE_* chars of an oversized output."""
     first_part = output[:TOOL_OUTPUT_TRUNCATE_FIRST]
     last_part = output[-TOOL_OUTPUT_TRUNCATE_LAST:]
     truncated_chars = len(output) - TOOL_OUTPUT_TRUNCATE_FIRST - TOOL_OUTPUT_TRUNCATE_LAST
 
-    truncated = (
+    return (
         f"{first_part}\n\n"
         f"[...truncated {truncated_chars:,} chars, showing first {TOOL_OUTPUT_TRUNCATE_FIRST} and last {TOOL_OUTPUT_TRUNCATE_LAST} chars]\n\n"
         f"{last_part}"
     )
 
-    return truncated, True
-
 
 def truncate_git_diff(diff_output: str) -> tuple[str, bool]:
     """
@@ -213,33 +361,39 @@ def truncate_git_diff(diff_output: str) -> tuple[str, bool]:
     if len(diff_output) <= GIT_DIFF_MAX_CHARS:
         return diff_output, False
 
-    lines = diff_output.split("\n")
-    result_lines = []
+    # Single forward scan that stops at the budget instead of splitting the
+    # whole diff into lines
+    limit = GIT_DIFF_MAX_CHARS - 200  # Leave room for summary
+    total_len = len(diff_output)
     char_count = 0
     file_count = 0
-    in_diff = False
+    idx = 0
+
+    while idx <= total_len:
+        newline = diff_output.find("\n", idx)
+        line_end = total_len if newline == -1 else newline
 
-    for line in lines:
         # Track diff file headers
-        if line.startswith("diff --git"):
+        if diff_output.startswith("diff --git", idx):
             file_count += 1
-            in_diff = True
 
         # Stop if we exceed limit
-        if char_count + len(line) > GIT_DIFF_MAX_CHARS - 200:  # Leave room for summary
+        if char_count + (line_end - idx) > limit:
             break
 
-        result_lines.append(line)
-        char_count += len(line) + 1
+        char_count += line_end - idx + 1
+        idx = line_end + 1
+
+    result = diff_output[:max(char_count - 1, 0)]
 
     total_files = diff_output.count("diff --git")
     remaining = total_files - file_count
 
     if remaining > 0:
-        result_lines.append("")
-        result_lines.append(f"[...truncated, showing {file_count}/{total_files} files, {len(diff_output) - char_count:,} more chars]")
+        result += "\n\n" if char_count else "\n"
+        result += f"[...truncated, showing {file_count}/{total_files} files, {total_len - char_count:,} more chars]"
 
-    return "\n".join(result_lines), True
+    return result, True
 
 
 def truncate_screenshot_output(output: str) -> tuple[str, bool]:
@@ -254,23 +408,11 @@ def truncate_screenshot_output(output: str) -> tuple[str, bool]:
     Returns:
         Tuple of (cleaned_output, was_truncated)
     """
-    import re
-
-    # Pattern to match base64 data URLs
-    base64_pattern = r'data:image/[^;]+;base64,[A-Za-z0-9+/=]+'
-
-    # Check if there's base64 data
-    if not re.search(base64_pattern, output):
-        return output, False
-
-    # Replace base64 data with placeholder
-    cleaned = re.sub(
-        base64_pattern,
+    cleaned, replaced = _BASE64_IMAGE_RE.subn(
         "[base64 image data removed - see screenshot path]",
-        output
+        output,
     )
-
-    return cleaned, True
+    return cleaned, replaced > 0
 
 
 def get_compact_issue_context(issue: dict) -> dict:
@@ -297,114 +439,388 @@ def get_compact_issue_context(issue: dict) -> dict:
     }
 
 
+@dataclass
+class FileIndex:
+    """Definitions of a Python module collected in a single AST pass.
+
+    Spans are ``(start, end)`` line slices (0-based start, exclusive end)
+    ready for ``lines[start:end]``. The first definition of a name wins.
+    """
+
+    functions: dict[str, tuple[int, int]] = field(default_factory=dict)
+    methods: dict[str, tuple[str, int, int]] = field(default_factory=dict)
+    qualified_methods: dict[tuple[str, str], tuple[int, int]] = field(default_factory=dict)
+    classes: dict[str, tuple[int, int]] = field(default_factory=dict)
+    structure: dict = field(default_factory=dict)
+
+
+def _is_private_dir(path: Path) -> bool:
+    """Check that a cache directory is safe to unpickle from (missing counts as safe).
+
+    On POSIX the directory must be owned by the current user and not be
+    writable by group or others.
+    """
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return True  # Created with mode 0700 on first write
+    except OSError:
+        return False
+    if not stat.S_ISDIR(st.st_mode):
+        return False
+    if os.name == "posix":
+        return st.st_uid == os.getuid() and not st.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+    return True
+
+
 class FileCache:
-    """Cache for parsed file contents and AST."""
+    """Cache for parsed file contents and AST.
+
+    Parsed trees are kept in memory and, when ``ast_cache_dir`` is set,
+    also pickled to disk keyed by the source hash, so unchanged files
+    skip ``ast.parse`` in later sessions. The disk cache is opt-in:
+    ``ContextManager`` enables it only when ``AST_CACHE_DIR`` is set, and a
+    directory that is not private to the current user is not used. Disk
+    hits refresh the entry's mtime so ``prune_disk_cache`` evicts the least
+    recently used trees first.
+
+    The cache is an LRU bounded by ``max_entries`` files and
+    ``max_content_chars`` of cached text; evicting a file drops its
+    content, AST and index together. Entries are fingerprinted by
+    mtime and size, so a file modified on disk is re-read (and
+    re-parsed) on the next access without an explicit ``invalidate``.
+    """
 
-    def __init__(self):
-        self._content_cache: dict[str, str] = {}
+    def __init__(
+        self,
+        ast_cache_dir: Path | None = None,
+        max_entries: int = FILE_CACHE_MAX_ENTRIES,
+        max_content_chars: int = FILE_CACHE_MAX_CONTENT_CHARS,
+    ):
+        # key -> (content, st_mtime_ns, st_size)
+        self._content_cache: OrderedDict[str, tuple[str, int, int]] = OrderedDict()
         self._ast_cache: dict[str, ast.Module] = {}
-        self._structure_cache: dict[str, dict] = {}
+        self._index_cache: dict[str, FileIndex] = {}
+        # Cached keys that are Python sources, classified once on insert
+        self._py_files: set[str] = set()
+        if ast_cache_dir is not None and not _is_private_dir(ast_cache_dir):
+            logger.warning("AST cache dir %s is not private to this user, not using it", ast_cache_dir)
+            ast_cache_dir = None
+        self._ast_cache_dir = ast_cache_dir
+        self._max_entries = max_entries
+        self._max_content_chars = max_content_chars
+        self._content_chars = 0
 
     def get_content(self, file_path: str | Path) -> str | None:
         """Get cached file content."""
         key = str(file_path)
-        if key not in self._content_cache:
-            path = Path(file_path)
-            if path.exists():
-                try:
-                    self._content_cache[key] = path.read_text()
-                except Exception:
-                    return None
-            else:
-                return None
-        return self._content_cache[key]
+        path = Path(file_path)
+        try:
+            st = path.stat()
+        except OSError:
+            self.invalidate(key)
+            return None
+
+        cached = self._content_cache.get(key)
+        if cached is not None:
+            if cached[1] == st.st_mtime_ns and cached[2] == st.st_size:
+                self._content_cache.move_to_end(key)
+                return cached[0]
+            # Modified on disk - drop stale content, AST and index
+            self.invalidate(key)
+
+        try:
+            # Explicit UTF-8 skips the per-open locale lookup of read_text()
+            content = path.read_bytes().decode("utf-8", errors="replace")
+        except Exception:
+            return None
+        self._put_content(key, content, st.st_mtime_ns, st.st_size)
+        return content
+
+    def _put_content(self, key: str, content: str, mtime_ns: int, size: int) -> None:
+        """Store content and evict least recently used files over the limits."""
+        self._content_cache[key] = (content, mtime_ns, size)
+        self._content_chars += len(content)
+        if key.endswith(".py"):
+            self._py_files.add(key)
+        while len(self._content_cache) > 1 and (
+            len(self._content_cache) > self._max_entries
+            or self._content_chars > self._max_content_chars
+        ):
+            self.invalidate(next(iter(self._content_cache)))
 
     def get_ast(self, file_path: str | Path) -> ast.Module | None:
         """Get cached AST for Python file."""
         key = str(file_path)
+        content = self.get_content(file_path)  # Also drops the AST if the file changed
         if key not in self._ast_cache:
-            content = self.get_content(file_path)
-            if content and str(file_path).endswith(".py"):
+            if content and key in self._py_files:
                 try:
-                    self._ast_cache[key] = ast.parse(content)
+                    self._ast_cache[key] = self._parse(content)
                 except SyntaxError:
                     return None
             else:
                 return None
         return self._ast_cache[key]
 
+    def _parse(self, content: str) -> ast.Module:
+        """Parse source, going through the on-disk AST cache when enabled."""
+        if self._ast_cache_dir is None:
+            return ast.parse(content)
+
+        digest = hashlib.sha256(content.encode("utf-8", "surrogatepass")).hexdigest()
+        cache_file = self._ast_cache_dir / f"{digest}.pkl"
+        try:
+            tree = pickle.loads(cache_file.read_bytes())
+            if isinstance(tree, ast.Module):
+                with contextlib.suppress(OSError):
+                    os.utime(cache_file)  # Recency for prune_disk_cache
+                return tree
+        except FileNotFoundError:
+            pass  # Not cached yet - parse below
+        except Exception:
+            logger.debug("Ignoring unreadable AST cache entry %s", cache_file, exc_info=True)
+
+        tree = ast.parse(content)
+        tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            self._ast_cache_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+            tmp_file.write_bytes(pickle.dumps(tree, protocol=pickle.HIGHEST_PROTOCOL))
+            os.replace(tmp_file, cache_file)
+        except OSError:
+            tmp_file.unlink(missing_ok=True)  # Cache is best-effort
+        return tree
+
+    def prune_disk_cache(self, max_bytes: int) -> int:
+        """Delete least recently used on-disk AST entries over ``max_bytes``.
+
+        Returns:
+            Number of entries removed
+        """
+        if self._ast_cache_dir is None:
+            return 0
+        entries: list[tuple[int, int, str]] = []
+        try:
+            with os.scandir(self._ast_cache_dir) as it:
+                for entry in it:
+                    if not entry.name.endswith(".pkl"):
+                        continue
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue  # Removed by another process
+                    entries.append((st.st_mtime_ns, st.st_size, entry.path))
+        except OSError:
+            return 0  # Not created yet
+
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
+
+    def get_index(self, file_path: str | Path) -> FileIndex | None:
+        """Get the definition index of a Python file (built once per AST)."""
+        key = str(file_path)
+        if key in self._index_cache:
+            self.get_content(file_path)  # Drops the index if the file changed
+            if key in self._index_cache:
+                return self._index_cache[key]
+        # Preloaded indexes may have no AST in memory; parse only when needed
+        tree = self.get_ast(file_path)
+        if not tree:
+            return None
+        index = self._index_cache[key] = build_file_index(tree)
+        return index
+
+    def preload(self, paths: list[Path], max_workers: int | None = None) -> int:
+        """Index uncached Python files in worker processes.
+
+        Parsing is CPU-bound, so a cold batch is spread over a process pool;
+        workers share the on-disk AST cache. Only content and the index come
+        back - ASTs are parsed lazily if ``get_ast`` is called later.
+
+        Returns:
+            Number of files indexed
+        """
+        todo = list(dict.fromkeys(
+            str(p) for p in paths if str(p).endswith(".py") and str(p) not in self._index_cache
+        ))
+        if max_workers is None:
+            max_workers = min(len(todo), os.cpu_count() or 1)
+        if len(todo) < 2 or max_workers < 2:
+            return sum(self.get_index(key) is not None for key in todo)
+
+        loaded = 0
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            results = pool.map(
+                _read_and_index, todo, [self._ast_cache_dir] * len(todo), chunksize=4
+            )
+            for key, result in zip(todo, results):
+                if result is None:
+                    continue
+                content, mtime_ns, size, index = result
+                self.invalidate(key)
+                self._put_content(key, content, mtime_ns, size)
+                if key in self._content_cache:  # Not evicted by the LRU limits
+                    self._index_cache[key] = index
+                    loaded += 1
+        return loaded
+
     def get_structure(self, file_path: str | Path) -> dict | None:
         """Get file structure (classes, functions, etc.)."""
-        key = str(file_path)
-        if key not in self._structure_cache:
-            tree = self.get_ast(file_path)
-            if tree:
-                self._structure_cache[key] = extract_structure(tree)
-            else:
-                return None
-        return self._structure_cache[key]
+        index = self.get_index(file_path)
+        return index.structure if index else None
 
     def invalidate(self, file_path: str | Path) -> None:
         """Remove file from all caches."""
         key = str(file_path)
-        self._content_cache.pop(key, None)
+        cached = self._content_cache.pop(key, None)
+        if cached is not None:
+            self._content_chars -= len(cached[0])
+        self._py_files.discard(key)
         self._ast_cache.pop(key, None)
-        self._structure_cache.pop(key, None)
+        self._index_cache.pop(key, None)
 
     def clear(self) -> None:
         """Clear all caches."""
         self._content_cache.clear()
         self._ast_cache.clear()
-        self._structure_cache.clear()
+        self._index_cache.clear()
+        self._py_files.clear()
+        self._content_chars = 0
+
+
+def _read_and_index(
+    file_path: str, ast_cache_dir: Path | None
+) -> tuple[str, int, int, FileIndex] | None:
+    """Worker for FileCache.preload: (content, mtime_ns, size, index) or None."""
+    cache = FileCache(ast_cache_dir=ast_cache_dir)
+    index = cache.get_index(file_path)
+    if index is None:
+        return None
+    return cache._content_cache[file_path] + (index,)
+
+
+# Statement-list fields that can contain nested definitions
+_BODY_FIELDS = ("body", "orelse", "finalbody", "handlers", "cases")
+
+
+def _quick_docstring(node: ast.ClassDef | ast.FunctionDef | ast.AsyncFunctionDef) -> str | None:
+    """Same result as ``ast.get_docstring(node)`` with a fast path for one-liners."""
+    if not node.body:
+        return None
+    first = node.body[0]
+    if not (
+        isinstance(first, ast.Expr)
+        and isinstance(first.value, ast.Constant)
+        and isinstance(first.value.value, str)
+    ):
+        return None
+    text = first.value.value
+    if "\n" not in text:
+        # inspect.cleandoc on a single line only expands tabs and strips the left
+        return text.expandtabs().lstrip()
+    return inspect.cleandoc(text)
+
+
+class _FileIndexBuilder(ast.NodeVisitor):
+    """Fills a FileIndex while visiting only statement bodies of the tree."""
+
+    def __init__(self) -> None:
+        self.index = FileIndex()
+        self._class_name: str | None = None
+
+    def build(self, tree: ast.Module) -> FileIndex:
+        structure: dict = {
+            "imports": [],
+            "classes": [],
+            "functions": [],
+            "constants": [],
+        }
+
+        for node in tree.body:
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    structure["imports"].append(alias.name)
+            elif isinstance(node, ast.ImportFrom):
+                module = node.module or ""
+                for alias in node.names:
+                    structure["imports"].append(f"{module}.{alias.name}")
+            elif isinstance(node, ast.ClassDef):
+                methods = []
+                for item in node.body:
+                    if isinstance(item, ast.FunctionDef | ast.AsyncFunctionDef):
+                        methods.append({
+                            "name": item.name,
+                            "lineno": item.lineno,
+                            "end_lineno": item.end_lineno,
+                            "docstring": _quick_docstring(item),
+                        })
+                structure["classes"].append({
+                    "name": node.name,
+                    "lineno": node.lineno,
+                    "end_lineno": node.end_lineno,
+                    "docstring": _quick_docstring(node),
+                    "methods": methods,
+                })
+            elif isinstance(node, ast.FunctionDef | ast.AsyncFunctionDef):
+                structure["functions"].append({
+                    "name": node.name,
+                    "lineno": node.lineno,
+                    "end_lineno": node.end_lineno,
+                    "docstring": _quick_docstring(node),
+                })
+            elif isinstance(node, ast.Assign):
+                for target in node.targets:
+                    if isinstance(target, ast.Name) and target.id.isupper():
+                        structure["constants"].append(target.id)
+            self.visit(node)
+
+        self.index.structure = structure
+        return self.index
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:
+        self.index.classes.setdefault(node.name, (node.lineno - 1, node.end_lineno or node.lineno))
+        outer, self._class_name = self._class_name, node.name
+        self.generic_visit(node)
+        self._class_name = outer
+
+    def visit_FunctionDef(self, node: ast.FunctionDef | ast.AsyncFunctionDef) -> None:
+        span = (node.lineno - 1, node.end_lineno or node.lineno)
+        if self._class_name is not None:
+            self.index.methods.setdefault(node.name, (self._class_name, *span))
+            self.index.qualified_methods.setdefault((self._class_name, node.name), span)
+        else:
+            self.index.functions.setdefault(node.name, span)
+        outer, self._class_name = self._class_name, None
+        self.generic_visit(node)
+        self._class_name = outer
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def generic_visit(self, node: ast.AST) -> None:
+        # Definitions only live in statement lists; skip expression subtrees
+        for name in _BODY_FIELDS:
+            for child in getattr(node, name, ()):
+                self.visit(child)
+
+
+def build_file_index(tree: ast.Module) -> FileIndex:
+    """Index classes, functions, methods and module structure in one pass."""
+    return _FileIndexBuilder().build(tree)
 
 
 def extract_structure(tree: ast.Module) -> dict:
     """Extract structure from AST (classes, functions, docstrings)."""
-    structure = {
-        "imports": [],
-        "classes": [],
-        "functions": [],
-        "constants": [],
-    }
-
-    for node in ast.iter_child_nodes(tree):
-        if isinstance(node, ast.Import):
-            for alias in node.names:
-                structure["imports"].append(alias.name)
-        elif isinstance(node, ast.ImportFrom):
-            module = node.module or ""
-            for alias in node.names:
-                structure["imports"].append(f"{module}.{alias.name}")
-        elif isinstance(node, ast.ClassDef):
-            methods = []
-            for item in node.body:
-                if isinstance(item, ast.FunctionDef | ast.AsyncFunctionDef):
-                    methods.append({
-                        "name": item.name,
-                        "lineno": item.lineno,
-                        "end_lineno": item.end_lineno,
-                        "docstring": ast.get_docstring(item),
-                    })
-            structure["classes"].append({
-                "name": node.name,
-                "lineno": node.lineno,
-                "end_lineno": node.end_lineno,
-                "docstring": ast.get_docstring(node),
-                "methods": methods,
-            })
-        elif isinstance(node, ast.FunctionDef | ast.AsyncFunctionDef):
-            structure["functions"].append({
-                "name": node.name,
-                "lineno": node.lineno,
-                "end_lineno": node.end_lineno,
-                "docstring": ast.get_docstring(node),
-            })
-        elif isinstance(node, ast.Assign):
-            for target in node.targets:
-                if isinstance(target, ast.Name) and target.id.isupper():
-                    structure["constants"].append(target.id)
-
-    return structure
+    return build_file_index(tree).structure
 
 
 def extract_function(file_path: str | Path, func_name: str, cache: FileCache | None = None) -> str | None:
@@ -412,7 +828,8 @@ def extract_function(file_path: str | Path, func_name: str, cache: FileCache | N
 
     Args:
         file_path: Path to Python file
-        func_name: Name of function to extract
+        func_name: Name of function to extract, or ``"ClassName.method"``
+            to pick a method of a specific class
         cache: Optional file cache
 
     Returns:
@@ -425,30 +842,27 @@ def extract_function(file_path: str | Path, func_name: str, cache: FileCache | N
     if not content:
         return None
 
-    tree = cache.get_ast(file_path)
-    if not tree:
+    index = cache.get_index(file_path)
+    if not index:
         return None
 
-    lines = content.splitlines()
-
-    for node in ast.walk(tree):
-        if isinstance(node, ast.FunctionDef | ast.AsyncFunctionDef):
-            if node.name == func_name:
-                start = node.lineno - 1
-                end = node.end_lineno
-                return "\n".join(lines[start:end])
-        elif isinstance(node, ast.ClassDef):
-            for item in node.body:
-                if isinstance(item, ast.FunctionDef | ast.AsyncFunctionDef):
-                    if item.name == func_name:
-                        start = item.lineno - 1
-                        end = item.end_lineno
-                        # Include class context
-                        class_header = f"class {node.name}:"
-                        func_lines = lines[start:end]
-                        return f"{class_header}\n    ...\n" + "\n".join(func_lines)
+    class_name, _, name = func_name.rpartition(".")
+    if class_name:
+        span = index.qualified_methods.get((class_name, name))
+        if span is None:
+            return None
+        start, end = span
+    elif func_name in index.functions:
+        start, end = index.functions[func_name]
+        return "\n".join(content.splitlines()[start:end])
+    elif func_name in index.methods:
+        class_name, start, end = index.methods[func_name]
+    else:
+        return None
 
-    return None
+    # Include class context
+    func_lines = content.splitlines()[start:end]
+    return f"class {class_name}:\n    ...\n" + "\n".join(func_lines)
 
 
 def extract_class(file_path: str | Path, class_name: str, cache: FileCache | None = None) -> str | None:
@@ -469,19 +883,12 @@ def extract_class(file_path: str | Path, class_name: str, cache: FileCache | Non
     if not content:
         return None
 
-    tree = cache.get_ast(file_path)
-    if not tree:
+    index = cache.get_index(file_path)
+    if not index or class_name not in index.classes:
         return None
 
-    lines = content.splitlines()
-
-    for node in ast.walk(tree):
-        if isinstance(node, ast.ClassDef) and node.name == class_name:
-            start = node.lineno - 1
-            end = node.end_lineno
-            return "\n".join(lines[start:end])
-
-    return None
+    start, end = index.classes[class_name]
+    return "\n".join(content.splitlines()[start:end])
 
 
 def get_file_summary(file_path: str | Path, cache: FileCache | None = None) -> str:
@@ -502,10 +909,10 @@ def get_file_summary(file_path: str | Path, cache: FileCache | None = None) -> s
     if not str(file_path).endswith(".py"):
         content = cache.get_content(file_path)
         if content:
-            lines = content.splitlines()[:10]
-            summary = "\n".join(lines)
-            if len(content.splitlines()) > 10:
-                summary += f"\n... ({len(content.splitlines()) - 10} more lines)"
+            all_lines = content.splitlines()
+            summary = "\n".join(all_lines[:10])
+            if len(all_lines) > 10:
+                summary += f"\n... ({len(all_lines) - 10} more lines)"
             return f"# {path.name}\n{summary}"
         return f"# {path.name} - Unable to read"
 
@@ -579,14 +986,34 @@ class ContextManager:
     """
 
     def __init__(self, max_tokens: int = DEFAULT_MAX_TOKENS):
-        self.budget = ContextBudget(max_tokens=max_tokens)
-        self.cache = FileCache()
+        self._budget = ContextBudget(max_tokens=max_tokens)
+        # Token deltas queued by hot paths, applied to the budget on next read
+        self._pending_tokens: defaultdict[str, int] = defaultdict(int)
+        self.cache = FileCache(ast_cache_dir=AST_CACHE_DIR)
+        self.cache.prune_disk_cache(AST_CACHE_MAX_BYTES)
         self._loaded_files: set[str] = set()
         self._history: list[dict] = []
         self._current_issue_id: str = ""
         self._current_step: str = ""
         self._interrupted_session: InterruptedSession | None = None
 
+    @property
+    def budget(self) -> ContextBudget:
+        """Context budget with all queued token deltas applied."""
+        if self._pending_tokens:
+            self._flush_tokens()
+        return self._budget
+
+    def _queue_tokens(self, category: str, tokens: int) -> None:
+        """Queue a token delta; it reaches the budget on the next ``budget`` read."""
+        self._pending_tokens[category] += tokens
+
+    def _flush_tokens(self) -> None:
+        """Apply queued token deltas, one budget update per category."""
+        for category, tokens in self._pending_tokens.items():
+            self._budget.add(category, tokens)
+        self._pending_tokens.clear()
+
     @property
     def is_compact_mode(self) -> bool:
         """Check if compact mode is active (70%+ usage)."""
@@ -623,7 +1050,7 @@ class ContextManager:
         """
         processed, was_truncated = truncate_tool_output(output, tool_name)
         tokens = estimate_tokens(processed)
-        self.budget.add("tool_outputs", tokens)
+        self._queue_tokens("tool_outputs", tokens)
 
         if was_truncated:
             print(f"   [Truncated: {len(output):,} -> {len(processed):,} chars]", flush=True)
@@ -703,14 +1130,22 @@ To preserve context budget:
         # For large files, use summary unless explicitly requested full
         if tokens > 500 and not full:
             summary = get_file_summary(path, self.cache)
-            self.budget.add("files", estimate_tokens(summary))
+            self._queue_tokens("files", estimate_tokens(summary))
             self._loaded_files.add(key)
             return summary
 
-        self.budget.add("files", tokens)
+        self._queue_tokens("files", tokens)
         self._loaded_files.add(key)
         return content
 
+    def preload_summaries(self, paths: list[Path]) -> int:
+        """Index many Python files up front so later summaries skip parsing.
+
+        Returns:
+            Number of files indexed
+        """
+        return self.cache.preload(paths)
+
     def load_function(self, file_path: str | Path, func_name: str) -> str:
         """Load a specific function from a file.
 
@@ -718,7 +1153,7 @@ To preserve context budget:
         """
         result = extract_function(file_path, func_name, self.cache)
         if result:
-            self.budget.add("files", estimate_tokens(result))
+            self._queue_tokens("files", estimate_tokens(result))
             return result
         return f"# Function {func_name} not found in {file_path}"
 
@@ -726,7 +1161,7 @@ To preserve context budget:
         """Load a specific class from a file."""
         result = extract_class(file_path, class_name, self.cache)
         if result:
-            self.budget.add("files", estimate_tokens(result))
+            self._queue_tokens("files", estimate_tokens(result))
             return result
         return f"# Class {class_name} not found in {file_path}"
 
@@ -737,15 +1172,15 @@ To preserve context budget:
     def set_issue_context(self, issue: dict | str) -> None:
         """Register issue context tokens."""
         if isinstance(issue, dict):
-            text = str(issue)
+            tokens = _estimate_dict_tokens(issue)
         else:
-            text = issue
-        self.budget.set("issue", estimate_tokens(text))
+            tokens = estimate_tokens(issue)
+        self.budget.set("issue", tokens)
 
     def add_to_history(self, role: str, content: str) -> None:
         """Add message to history and update budget."""
         self._history.append({"role": role, "content": content})
-        self.budget.add("history", estimate_tokens(content))
+        self._queue_tokens("history", estimate_tokens(content))
 
     def summarize_history(self, keep_recent: int = 5) -> list[dict]:
         """Summarize older history to save tokens.
@@ -760,17 +1195,14 @@ To preserve context budget:
 
         # Simple summary: count messages and key actions
         summary = f"[Previous {len(old)} messages summarized: "
-        actions = []
+        actions: dict[str, None] = {}  # Insertion-ordered set for a stable summary
         for msg in old:
-            content = msg.get("content", "")
-            if "commit" in content.lower():
-                actions.append("commit")
-            elif "test" in content.lower():
-                actions.append("test")
-            elif "implement" in content.lower():
-                actions.append("implement")
+            found = {m.lower() for m in _HISTORY_ACTION_RE.findall(msg.get("content", ""))}
+            if found:
+                # One action per message, by priority
+                actions[next(a for a in _HISTORY_ACTIONS if a in found)] = None
         if actions:
-            summary += ", ".join(set(actions))
+            summary += ", ".join(actions)
         else:
             summary += "general discussion"
         summary += "]"
@@ -863,12 +1295,14 @@ To preserve context budget:
 
     def reset(self) -> None:
         """Reset manager state for new session."""
-        self.budget = ContextBudget(max_tokens=self.budget.max_tokens)
+        self._pending_tokens.clear()
+        self._budget = ContextBudget(max_tokens=self._budget.max_tokens)
         self._loaded_files.clear()
         self._history.clear()
         self._current_issue_id = ""
         self._current_step = ""
-        # Keep cache for efficiency across sessions
+        # Keep cache for efficiency across sessions, bounding its disk part
+        self.cache.prune_disk_cache(AST_CACHE_MAX_BYTES)
         # Keep interrupted_session for continuation
 
 
@@ -20,6 +20,9 @@ if TYPE_CHECKING:
 PROMPTS_DIR: Path = Path(str(importlib.resources.files("axon_agent") / "prompts"))
 AGENT_DIR: Path = Path(".agent")
 
+# Возраст PROJECT_MAP.md, после которого карта генерируется заново (ENG-33)
+PROJECT_MAP_MAX_AGE_HOURS: float = 1.0
+
 
 def load_project_config(project_dir: Path | None = None) -> dict:
     """
@@ -231,10 +234,10 @@ def ensure_project_map(project_dir: Path | None = None) -> str:
     if not map_path.exists():
         should_generate = True
     else:
-        # Check if stale (older than 1 hour)
+        # Check if stale (older than PROJECT_MAP_MAX_AGE_HOURS)
         mtime = map_path.stat().st_mtime
         age_hours = (time.time() - mtime) / 3600
-        if age_hours > 1:
+        if age_hours > PROJECT_MAP_MAX_AGE_HOURS:
             should_generate = True
 
     if should_generate:
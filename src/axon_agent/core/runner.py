@@ -9,17 +9,29 @@
 """
 
 import asyncio
-import traceback
+import contextlib
+import functools
+import os
+import time
 from pathlib import Path
+from typing import Any, Callable
 
 from claude_agent_sdk import ClaudeSDKClient
+from dotenv import load_dotenv
 
-from axon_agent.core.client import create_client
+from axon_agent.core.client import (
+    close_mcp_http_client,
+    create_client_async,
+    get_mcp_http_client,
+    warmup_playwright,
+)
 from axon_agent.core.context import (
     get_context_manager,
 )
 from axon_agent.core.progress import print_session_header
+from axon_agent.monitoring.loop_monitor import event_loop_monitor
 from axon_agent.core.prompts import (
+    PROJECT_MAP_MAX_AGE_HOURS,
     ensure_project_map,
     get_continuation_task_with_memory,
     get_execute_task_with_memory,
@@ -34,6 +46,8 @@ from axon_agent.core.session import (
     SESSION_CONTEXT_LIMIT,
     COMPLETION_SIGNAL,
     CONTEXT_LIMIT_SIGNAL,
+    VERBOSE_OUTPUT,
+    print_traceback_async,
 )
 from axon_agent.core.state import (
     ErrorType,
@@ -56,27 +70,306 @@ from axon_agent.core.state import (
 # Конфигурация проверки паузы (ENG-52)
 PAUSE_CHECK_INTERVAL_SECONDS: int = 60
 
+# Сколько секунд результат проверки паузы берётся из кэша без stat (ENG-52)
+PAUSE_CACHE_TTL_SECONDS: float = 1.0
+
+# Последние проверки паузы: проект -> (время проверки по monotonic, на паузе ли)
+_pause_cache: dict[Path, tuple[float, bool]] = {}
+
 # Конфигурация
 AUTO_CONTINUE_DELAY_SECONDS: int = 3
 
+# Порог, начиная с которого блокировка event loop записывается в лог
+LOOP_BLOCK_THRESHOLD_MS: float = 50.0
+
+# Сколько ждать ответа на /clear при сбросе переиспользуемого клиента
+CLIENT_RESET_TIMEOUT_SECONDS: float = 30.0
+
+
+# Собранные промпты задач: (вид, команда, проект) -> (отпечаток входов, промпт)
+_prompt_cache: dict[tuple[str, str, str], tuple[tuple, str]] = {}
+
+_PROMPT_BUILDERS: dict[str, Callable[[str, Path], str]] = {
+    "execute": get_execute_task_with_memory,
+    "continuation": get_continuation_task_with_memory,
+}
+
+
+def _prompt_inputs_fingerprint(project_dir: Path) -> tuple | None:
+    """
+    Отпечаток файлов, из которых собирается промпт задачи.
+
+    Returns:
+        Кортеж (cwd, mtime_ns и размер MEMORY.md, PROJECT_MAP.md и
+        .project.json) или None, если карту проекта пора перегенерировать -
+        тогда промпт нужно собрать заново через ensure_project_map
+    """
+    stats: list[tuple[int, int] | None] = []
+    for path in (
+        project_dir / ".agent" / "MEMORY.md",
+        project_dir / ".agent" / "PROJECT_MAP.md",
+        project_dir / ".project.json",
+    ):
+        try:
+            st = path.stat()
+        except OSError:
+            stats.append(None)
+        else:
+            stats.append((st.st_mtime_ns, st.st_size))
+
+    map_stat = stats[1]
+    if map_stat is None or time.time() - map_stat[0] / 1e9 > PROJECT_MAP_MAX_AGE_HOURS * 3600:
+        return None
+    return (str(Path.cwd()), *stats)
+
+
+def _maybe_rebuild_prompt(kind: str, team: str, project_dir: Path) -> str:
+    """
+    Возвращает промпт задачи, пересобирая его только при изменении входов.
+
+    Шаблоны, память и карта проекта перечитываются, только если изменился
+    mtime/размер .agent/MEMORY.md, .agent/PROJECT_MAP.md или .project.json.
+
+    Args:
+        kind: "execute" или "continuation"
+        team: Ключ команды (например, "ENG")
+        project_dir: Директория проекта
+
+    Returns:
+        Текст промпта
+    """
+    key = (kind, team, str(project_dir))
+    fingerprint = _prompt_inputs_fingerprint(project_dir)
+    cached = _prompt_cache.get(key)
+    if fingerprint is not None and cached is not None and cached[0] == fingerprint:
+        return cached[1]
+
+    prompt = _PROMPT_BUILDERS[kind](team, project_dir)
+    # Отпечаток после сборки: ensure_project_map мог обновить карту
+    fingerprint = _prompt_inputs_fingerprint(project_dir)
+    if fingerprint is not None:
+        _prompt_cache[key] = (fingerprint, prompt)
+    else:
+        _prompt_cache.pop(key, None)
+    return prompt
+
+
+class _ReusableClient:
+    """
+    Клиент Claude SDK, переиспользуемый между итерациями цикла агента.
+
+    Новый клиент на каждую итерацию - это запуск процесса SDK и заново
+    рукопожатие со всеми MCP-серверами. Вместо этого история разговора
+    сбрасывается командой /clear. Если CLI её не объявляет или сброс не
+    удался, клиент пересоздаётся, как раньше; после ошибки сессии клиент
+    выбрасывается, чтобы не продолжать работу со сломанным процессом.
+    """
+
+    def __init__(self, project_dir: Path, model: str) -> None:
+        self._project_dir = project_dir
+        self._model = model
+        self._client: ClaudeSDKClient | None = None
+        self._reset_supported = True
+
+    async def acquire(self) -> ClaudeSDKClient:
+        """
+        Возвращает подключённый клиент с чистым контекстом разговора.
+
+        Returns:
+            Сброшенный прежний клиент или новый, если сброс невозможен
+        """
+        if self._client is not None:
+            if self._reset_supported and await self._reset(self._client):
+                return self._client
+            await self.discard()
+
+        client = await create_client_async(self._project_dir, self._model)
+        await client.connect()
+        self._client = client
+        return client
+
+    async def _reset(self, client: ClaudeSDKClient) -> bool:
+        """Очищает историю разговора клиента командой /clear."""
+        try:
+            info = await client.get_server_info() or {}
+            names = {
+                (cmd.get("name", "") if isinstance(cmd, dict) else str(cmd)).lstrip("/")
+                for cmd in info.get("commands", [])
+            }
+            if "clear" not in names:
+                self._reset_supported = False
+                print("(CLI не поддерживает /clear - новый клиент на каждую итерацию)")
+                return False
+
+            async with asyncio.timeout(CLIENT_RESET_TIMEOUT_SECONDS):
+                await client.query("/clear")
+                async for _ in client.receive_response():
+                    pass
+        except TimeoutError:
+            self._reset_supported = False
+            print("(Сброс клиента через /clear не ответил - новый клиент на каждую итерацию)")
+            return False
+        except Exception as e:
+            print(f"(Не удалось сбросить клиента: {e} - будет создан новый)")
+            return False
+        return True
+
+    async def discard(self) -> None:
+        """Отключает и забывает текущий клиент, если он есть."""
+        client, self._client = self._client, None
+        if client is None:
+            return
+        try:
+            await client.disconnect()
+        except Exception as e:
+            print(f"Примечание: Ошибка при отключении клиента: {e}")
+
+
+async def _cancel_task(task: asyncio.Task[Any]) -> None:
+    """Отменяет фоновую задачу и дожидается её завершения."""
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await task
+
 
 def is_agent_paused(project_dir: Path) -> bool:
     """
     Проверяет, находится ли агент на паузе, проверяя наличие файла .agent/PAUSED (ENG-52).
 
+    Повторные проверки в течение PAUSE_CACHE_TTL_SECONDS отвечают из кэша
+    без обращения к файловой системе.
+
+    Args:
+        project_dir: Путь к директории проекта
+
+    Returns:
+        True, если файл .agent/PAUSED существует, иначе False
+    """
+    now = time.monotonic()
+    cached = _pause_cache.get(project_dir)
+    if cached is not None and now - cached[0] < PAUSE_CACHE_TTL_SECONDS:
+        return cached[1]
+    paused = (project_dir / ".agent" / "PAUSED").exists()
+    _pause_cache[project_dir] = (now, paused)
+    return paused
+
+
+async def is_agent_paused_async(project_dir: Path) -> bool:
+    """
+    Асинхронный вариант is_agent_paused: stat выполняется в потоке (ENG-52).
+
     Args:
         project_dir: Путь к директории проекта
 
     Returns:
         True, если файл .agent/PAUSED существует, иначе False
     """
-    paused_file = project_dir / ".agent" / "PAUSED"
-    return paused_file.exists()
+    return await asyncio.to_thread(is_agent_paused, project_dir)
+
+
+def _log_blocking_call(log_path: Path, duration_ms: float, stack: str) -> None:
+    """
+    Дописывает в лог синхронную блокировку event loop и её стек.
+
+    Вызывается из потока монитора event loop, а не из самого цикла.
+
+    Args:
+        log_path: Путь к .agent/blocking.log
+        duration_ms: Длительность блокировки в миллисекундах
+        stack: Стек потока event loop в момент блокировки
+    """
+    try:
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(log_path, "a", encoding="utf-8") as f:
+            f.write(f"--- event loop blocked for {duration_ms:.0f} ms\n{stack}\n")
+    except OSError:
+        pass
+
+
+@functools.lru_cache(maxsize=1)
+def _get_telegram_creds(project_dir: Path) -> tuple[str, str]:
+    """
+    Читает учётные данные Telegram один раз за процесс (ENG-52).
+
+    .env проекта разбирается только при первом вызове; последующие
+    возобновления берут (token, chat_id) из кэша.
+
+    Args:
+        project_dir: Путь к директории проекта
+
+    Returns:
+        Кортеж (TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID), пустые строки если не заданы
+    """
+    load_dotenv(project_dir / ".env")
+    return (
+        os.environ.get("TELEGRAM_BOT_TOKEN", ""),
+        os.environ.get("TELEGRAM_CHAT_ID", ""),
+    )
+
+
+def _open_removal_watcher(directory: Path) -> Any | None:
+    """
+    Открывает inotify-наблюдатель удалений в директории (ENG-52).
+
+    Returns:
+        Экземпляр asyncinotify.Inotify или None, если asyncinotify не
+        установлен или inotify недоступен (не Linux, исчерпан лимит watch)
+    """
+    try:
+        from asyncinotify import Inotify, Mask
+    except ImportError:
+        return None
+
+    try:
+        inotify = Inotify()
+    except OSError:
+        return None
+    try:
+        inotify.add_watch(directory, Mask.DELETE | Mask.DELETE_SELF | Mask.MOVED_FROM)
+    except OSError:
+        inotify.close()
+        return None
+    return inotify
+
+
+async def _wait_for_file_removal(path: Path, recheck_interval: float) -> None:
+    """
+    Ждёт удаления файла: по событиям inotify, иначе опросом (ENG-52).
+
+    Раз в recheck_interval файл перепроверяется и при наличии наблюдателя -
+    это страховка от пропущенных событий и прежний интервал лога «на паузе».
+
+    Args:
+        path: Файл, удаления которого нужно дождаться
+        recheck_interval: Максимальный интервал между проверками, в секундах
+    """
+    loop = asyncio.get_running_loop()
+    inotify = _open_removal_watcher(path.parent)
+
+    if inotify is None:
+        while await asyncio.to_thread(path.exists):
+            await asyncio.sleep(recheck_interval)
+            print(f"[{loop.time():.0f}] Всё ещё на паузе, ожидание...")
+        return
+
+    with inotify:
+        # Проверка после установки наблюдателя: удаление не проскочит между ними
+        while await asyncio.to_thread(path.exists):
+            try:
+                async with asyncio.timeout(recheck_interval):
+                    async for event in inotify:
+                        if event.name is None or event.name.name == path.name:
+                            break
+            except TimeoutError:
+                print(f"[{loop.time():.0f}] Всё ещё на паузе, ожидание...")
 
 
 async def wait_while_paused(project_dir: Path) -> bool:
     """
-    Ожидает, пока агент на паузе, проверяя каждые PAUSE_CHECK_INTERVAL_SECONDS (ENG-52).
+    Ожидает, пока агент на паузе (ENG-52).
+
+    Снятие паузы отслеживается по событию удаления .agent/PAUSED, с
+    перепроверкой не реже раза в PAUSE_CHECK_INTERVAL_SECONDS.
 
     При возобновлении отправляет уведомление в Telegram, если настроено.
 
@@ -86,20 +379,20 @@ async def wait_while_paused(project_dir: Path) -> bool:
     Returns:
         True, если агент был на паузе и теперь возобновлён, False, если не был на паузе
     """
-    if not is_agent_paused(project_dir):
+    if not await is_agent_paused_async(project_dir):
         return False
 
     print("\n" + "=" * 70)
     print("  АГЕНТ НА ПАУЗЕ")
     print("=" * 70)
-    print(f"\nАгент на паузе. Проверка каждые {PAUSE_CHECK_INTERVAL_SECONDS}с...")
+    print("\nАгент на паузе. Ожидание снятия паузы...")
     print("Используйте команду /resume в Telegram для продолжения.\n")
 
     was_paused = True
 
-    while is_agent_paused(project_dir):
-        await asyncio.sleep(PAUSE_CHECK_INTERVAL_SECONDS)
-        print(f"[{asyncio.get_event_loop().time():.0f}] Всё ещё на паузе, ожидание...")
+    await _wait_for_file_removal(project_dir / ".agent" / "PAUSED", PAUSE_CHECK_INTERVAL_SECONDS)
+    # Файл удалён: закэшированное «на паузе» больше не верно
+    _pause_cache.pop(project_dir, None)
 
     # Агент возобновлён
     print("\n" + "=" * 70)
@@ -109,24 +402,18 @@ async def wait_while_paused(project_dir: Path) -> bool:
 
     # Попытка отправить Telegram-уведомление
     try:
-        import httpx
-        import os
-        from dotenv import load_dotenv
-        load_dotenv(project_dir / ".env")
-
-        telegram_bot_token = os.environ.get("TELEGRAM_BOT_TOKEN", "")
-        telegram_chat_id = os.environ.get("TELEGRAM_CHAT_ID", "")
+        telegram_bot_token, telegram_chat_id = _get_telegram_creds(project_dir)
 
         if telegram_bot_token and telegram_chat_id:
-            async with httpx.AsyncClient() as client:
-                url = f"https://api.telegram.org/bot{telegram_bot_token}/sendMessage"
-                payload = {
-                    "chat_id": telegram_chat_id,
-                    "text": "Agent resumed.",
-                    "parse_mode": "HTML",
-                }
-                await client.post(url, json=payload, timeout=10.0)
-                print("Отправлено уведомление в Telegram о возобновлении.")
+            client = get_mcp_http_client()
+            url = f"https://api.telegram.org/bot{telegram_bot_token}/sendMessage"
+            payload = {
+                "chat_id": telegram_chat_id,
+                "text": "Agent resumed.",
+                "parse_mode": "HTML",
+            }
+            await client.post(url, json=payload, timeout=10.0)
+            print("Отправлено уведомление в Telegram о возобновлении.")
     except Exception as e:
         print(f"Примечание: Не удалось отправить уведомление в Telegram: {e}")
 
@@ -138,6 +425,7 @@ async def run_autonomous_agent(
     model: str,
     team: str,
     max_iterations: int | None = None,
+    dashboard_port: int | None = None,
 ) -> None:
     """
     Запускает цикл автономного агента с отслеживанием состояния сессии и восстановлением после сбоев.
@@ -156,6 +444,8 @@ async def run_autonomous_agent(
         model: Модель Claude для использования
         team: Ключ команды для управления задачами (например, "ENG")
         max_iterations: Максимальное количество итераций (None для неограниченного)
+        dashboard_port: Порт дашборда, обслуживаемого в этом же event loop
+            (None - без дашборда)
 
     Raises:
         ValueError: Если max_iterations не положительное число
@@ -224,200 +514,231 @@ async def run_autonomous_agent(
 
     iteration: int = 0
 
-    while True:
-        iteration += 1
-
-        # Check for pause before each iteration (ENG-52)
-        await wait_while_paused(project_dir)
-
-        # Check max iterations
-        if max_iterations and iteration > max_iterations:
-            print(f"\nДостигнут максимум итераций ({max_iterations})")
-            print("Для продолжения запустите скрипт снова без --max-iterations")
-            break
-
-        # Print session header
-        print_session_header(iteration)
-
-        # Fresh client each iteration to avoid context window exhaustion
-        client: ClaudeSDKClient = create_client(project_dir, model)
-
-        # First iteration uses execute_task, subsequent iterations use continuation_task
-        # Continuation prompt checks META issue for previous session context before proceeding
-        # Both prompts now include .agent/MEMORY.md content for persistent memory
-        # Track context usage via context manager
-        ctx_manager = get_context_manager()
-        ctx_manager.reset()  # Fresh tracking for each session
-
-        if iteration == 1:
-            prompt: str = get_execute_task_with_memory(team, project_dir)
-            print("(Загрузка карты проекта и памяти из .agent/)")
-
-            # If recovering, inject structured recovery context (ENG-69)
-            if resume_phase and recovery_context_text:
-                prompt += recovery_context_text
-                resume_phase = None  # Clear after first use
-                recovery_context_text = ""  # Clear after first use
-        else:
-            prompt = get_continuation_task_with_memory(team, project_dir)
-            print("(Использование промпта продолжения - будет проверен контекст предыдущей сессии)")
-            print("(Загрузка карты проекта и памяти из .agent/)")
-
-        # Track prompt tokens
-        ctx_manager.set_system_prompt(prompt)
-        stats = ctx_manager.get_stats()
-        mode_info = f" [{stats['mode'].upper()}]" if stats['mode'] != "normal" else ""
-        print(f"(Бюджет контекста: {stats['total_used']:,} / {stats['max_tokens']:,} токенов{mode_info})")
-
-        # Show compact mode instructions if active
-        if ctx_manager.is_compact_mode:
-            print("(КОМПАКТНЫЙ РЕЖИМ: Использование минимального контекста для деталей задачи)")
-
-        # Run session with error recovery
-        result: SessionResult = SessionResult(status=SESSION_ERROR, response="uninitialized")
-        error_type_detected: ErrorType | None = None
-
-        try:
-            async with client:
+    # Клиент SDK переживает итерации; сбрасывается /clear, закрывается на выходе
+    clients = _ReusableClient(project_dir, model)
+
+    async with contextlib.AsyncExitStack() as stack:
+        # Дашборд работает в этом же event loop и останавливается вместе с циклом
+        if dashboard_port is not None:
+            from axon_agent.dashboard import start_dashboard, stop_dashboard
+
+            stack.push_async_callback(stop_dashboard, await start_dashboard(port=dashboard_port))
+
+        # Синхронные задержки event loop пишутся в .agent/blocking.log
+        stack.enter_context(event_loop_monitor(
+            threshold_ms=LOOP_BLOCK_THRESHOLD_MS,
+            on_blocking_call=functools.partial(
+                _log_blocking_call, project_dir / ".agent" / "blocking.log"
+            ),
+        ))
+        stack.push_async_callback(clients.discard)
+        # Прогрев npx кэша Playwright MCP снимается вместе с циклом
+        stack.push_async_callback(_cancel_task, asyncio.create_task(warmup_playwright()))
+        # Соединения пула (уведомления Telegram) закрываются вместе с циклом
+        stack.push_async_callback(close_mcp_http_client)
+
+        while True:
+            iteration += 1
+
+            # Check for pause before each iteration (ENG-52)
+            await wait_while_paused(project_dir)
+
+            # Check max iterations
+            if max_iterations and iteration > max_iterations:
+                print(f"\nДостигнут максимум итераций ({max_iterations})")
+                print("Для продолжения запустите скрипт снова без --max-iterations")
+                break
+
+            # Print session header
+            print_session_header(iteration)
+
+            # First iteration uses execute_task, subsequent iterations use continuation_task
+            # Continuation prompt checks META issue for previous session context before proceeding
+            # Both prompts now include .agent/MEMORY.md content for persistent memory
+            # Track context usage via context manager
+            ctx_manager = get_context_manager()
+            ctx_manager.reset()  # Fresh tracking for each session
+
+            if iteration == 1:
+                prompt: str = _maybe_rebuild_prompt("execute", team, project_dir)
+                print("(Загрузка карты проекта и памяти из .agent/)")
+
+                # If recovering, inject structured recovery context (ENG-69)
+                if resume_phase and recovery_context_text:
+                    prompt += recovery_context_text
+                    resume_phase = None  # Clear after first use
+                    recovery_context_text = ""  # Clear after first use
+            else:
+                prompt = _maybe_rebuild_prompt("continuation", team, project_dir)
+                print("(Использование промпта продолжения - будет проверен контекст предыдущей сессии)")
+                print("(Загрузка карты проекта и памяти из .agent/)")
+
+            # Track prompt tokens
+            ctx_manager.set_system_prompt(prompt)
+            if VERBOSE_OUTPUT:
+                stats = ctx_manager.get_stats()
+                mode_info = f" [{stats['mode'].upper()}]" if stats['mode'] != "normal" else ""
+                print(f"(Бюджет контекста: {stats['total_used']:,} / {stats['max_tokens']:,} токенов{mode_info})")
+
+            # Show compact mode instructions if active
+            if ctx_manager.is_compact_mode:
+                print("(КОМПАКТНЫЙ РЕЖИМ: Использование минимального контекста для деталей задачи)")
+
+            # Run session with error recovery
+            result: SessionResult = SessionResult(status=SESSION_ERROR, response="uninitialized")
+            error_type_detected: ErrorType | None = None
+
+            try:
+                # Чистый контекст каждой итерации, без пересоздания процесса SDK
+                client = await clients.acquire()
                 result = await run_agent_session(client, prompt, project_dir, ctx_manager)
 
-            # Success - clear session state
+                # Success - clear session state
+                if result.status == SESSION_COMPLETE:
+                    state_manager.clear_state()
+
+                # Context limit - trigger graceful shutdown with memory flush (ENG-29)
+                if result.status == SESSION_CONTEXT_LIMIT:
+                    print("\n" + "=" * 70)
+                    print("  ПЛАВНОЕ ЗАВЕРШЕНИЕ: Достигнут лимит контекста (85%)")
+                    print("=" * 70)
+                    print("\nКонтрольная точка сохранена. Сессия возобновится с этого места.")
+
+                    # Prepare for continuation
+                    memory_path = project_dir / ".agent" / "MEMORY.md"
+                    ctx_manager.prepare_graceful_shutdown(memory_path)
+
+                    # Сессия могла выйти посреди хода, не дочитав поток: такой
+                    # ход продолжает работать в процессе SDK, и его хвост
+                    # попал бы в ответ на /clear. Процесс закрывается целиком.
+                    await clients.discard()
+
+                    # Let the loop continue to next iteration with fresh context
+                    print(f"\nЗапуск новой сессии через {AUTO_CONTINUE_DELAY_SECONDS}с...")
+                    await asyncio.sleep(AUTO_CONTINUE_DELAY_SECONDS)
+                    continue
+
+            except ConnectionError as e:
+                print(f"\nСетевая ошибка во время сессии агента: {e}")
+                print("Проверьте подключение к Интернету и повторите попытку.")
+                await print_traceback_async()
+                error_type_detected = recovery.classify_error(e)
+                state_manager.record_error(e, error_type_detected)
+                result = SessionResult(status=SESSION_ERROR, response=str(e))
+
+            except TimeoutError as e:
+                print(f"\nТаймаут во время сессии агента: {e}")
+                error_type_detected = ErrorType.MCP_TIMEOUT
+                state_manager.record_error(e, error_type_detected)
+                result = SessionResult(status=SESSION_ERROR, response=str(e))
+
+            except Exception as e:
+                error_type_name: str = type(e).__name__
+                print(f"\nНеожиданная ошибка в контексте сессии ({error_type_name}): {e}")
+                await print_traceback_async()
+                error_type_detected = recovery.classify_error(e)
+                state_manager.record_error(e, error_type_detected)
+                result = SessionResult(status=SESSION_ERROR, response=str(e))
+
+            # После ошибки процесс SDK может быть в неизвестном состоянии
+            if result.status == SESSION_ERROR:
+                await clients.discard()
+
+            # Handle status
             if result.status == SESSION_COMPLETE:
-                state_manager.clear_state()
-
-            # Context limit - trigger graceful shutdown with memory flush (ENG-29)
-            if result.status == SESSION_CONTEXT_LIMIT:
                 print("\n" + "=" * 70)
-                print("  ПЛАВНОЕ ЗАВЕРШЕНИЕ: Достигнут лимит контекста (85%)")
+                print("  ВСЕ ЗАДАЧИ ВЫПОЛНЕНЫ")
                 print("=" * 70)
-                print("\nКонтрольная точка сохранена. Сессия возобновится с этого места.")
-
-                # Prepare for continuation
-                memory_path = project_dir / ".agent" / "MEMORY.md"
-                ctx_manager.prepare_graceful_shutdown(memory_path)
-
-                # Let the loop continue to next iteration with fresh context
-                print(f"\nЗапуск новой сессии через {AUTO_CONTINUE_DELAY_SECONDS}с...")
-                await asyncio.sleep(AUTO_CONTINUE_DELAY_SECONDS)
-                continue
-
-        except ConnectionError as e:
-            print(f"\nСетевая ошибка во время сессии агента: {e}")
-            print("Проверьте подключение к Интернету и повторите попытку.")
-            traceback.print_exc()
-            error_type_detected = recovery.classify_error(e)
-            state_manager.record_error(e, error_type_detected)
-            result = SessionResult(status=SESSION_ERROR, response=str(e))
-
-        except TimeoutError as e:
-            print(f"\nТаймаут во время сессии агента: {e}")
-            error_type_detected = ErrorType.MCP_TIMEOUT
-            state_manager.record_error(e, error_type_detected)
-            result = SessionResult(status=SESSION_ERROR, response=str(e))
-
-        except Exception as e:
-            error_type_name: str = type(e).__name__
-            print(f"\nНеожиданная ошибка в контексте сессии ({error_type_name}): {e}")
-            traceback.print_exc()
-            error_type_detected = recovery.classify_error(e)
-            state_manager.record_error(e, error_type_detected)
-            result = SessionResult(status=SESSION_ERROR, response=str(e))
-
-        # Handle status
-        if result.status == SESSION_COMPLETE:
-            print("\n" + "=" * 70)
-            print("  ВСЕ ЗАДАЧИ ВЫПОЛНЕНЫ")
-            print("=" * 70)
-            print("\nНет оставшихся задач в Todo.")
-            state_manager.clear_state()
-            break
-
-        elif result.status == SESSION_CONTINUE:
-            print(f"\nАгент автоматически продолжит работу через {AUTO_CONTINUE_DELAY_SECONDS}с...")
-
-        elif result.status == SESSION_ERROR:
-            print("\nВ сессии произошла ошибка")
-
-            # Apply phase-level retry strategy (ENG-67)
-            if error_type_detected:
-                current_phase = (
-                    state_manager.current_state.phase
-                    if state_manager.current_state
-                    else SessionPhase.ORIENT
-                )
-                attempt_tracker = state_manager.get_phase_attempt(current_phase)
-                delay = GracefulDegradation.get_backoff_delay(
-                    attempt_tracker.attempt, error_type_detected,
-                )
-
-                # Get retry strategy from SessionRecovery (ENG-67)
-                strategy = recovery.get_retry_strategy(
-                    current_phase, attempt_tracker.attempt,
-                )
-                print(f"Фаза: {current_phase.phase_name}, "
-                      f"попытка: {attempt_tracker.attempt}/{MAX_PHASE_RETRIES}, "
-                      f"стратегия: {strategy.value}")
-
-                if strategy == RetryStrategy.ESCALATE:
-                    # Check graceful degradation before fully escalating
-                    if GracefulDegradation.should_skip_service(
-                        error_type_detected, current_phase,
-                    ):
-                        msg = GracefulDegradation.get_degradation_message(
+                print("\nНет оставшихся задач в Todo.")
+                state_manager.clear_state()
+                break
+
+            elif result.status == SESSION_CONTINUE:
+                print(f"\nАгент автоматически продолжит работу через {AUTO_CONTINUE_DELAY_SECONDS}с...")
+
+            elif result.status == SESSION_ERROR:
+                print("\nВ сессии произошла ошибка")
+
+                # Apply phase-level retry strategy (ENG-67)
+                if error_type_detected:
+                    current_phase = (
+                        state_manager.current_state.phase
+                        if state_manager.current_state
+                        else SessionPhase.ORIENT
+                    )
+                    attempt_tracker = state_manager.get_phase_attempt(current_phase)
+                    delay = GracefulDegradation.get_backoff_delay(
+                        attempt_tracker.attempt, error_type_detected,
+                    )
+
+                    # Get retry strategy from SessionRecovery (ENG-67)
+                    strategy = recovery.get_retry_strategy(
+                        current_phase, attempt_tracker.attempt,
+                    )
+                    print(f"Фаза: {current_phase.phase_name}, "
+                          f"попытка: {attempt_tracker.attempt}/{MAX_PHASE_RETRIES}, "
+                          f"стратегия: {strategy.value}")
+
+                    if strategy == RetryStrategy.ESCALATE:
+                        # Check graceful degradation before fully escalating
+                        if GracefulDegradation.should_skip_service(
                             error_type_detected, current_phase,
-                        )
-                        print(f"Плавная деградация: {msg}")
-                        state_manager.mark_degraded(current_phase.phase_name)
-                        delay = AUTO_CONTINUE_DELAY_SECONDS
-                    else:
-                        # Save changes if git error during commit
-                        if (
-                            error_type_detected == ErrorType.GIT_ERROR
-                            and current_phase == SessionPhase.COMMIT
                         ):
-                            print("Попытка сохранить незакоммиченные изменения...")
-                            diff_file = await recovery.save_git_diff_to_file()
-                            if diff_file:
-                                print(f"Изменения сохранены в: {diff_file}")
-                            else:
-                                await recovery.stash_changes()
-
-                        # Mark issue as blocked and notify
-                        print(f"ЭСКАЛАЦИЯ: Фаза {current_phase.phase_name} "
-                              f"не удалась после {MAX_PHASE_RETRIES} попыток")
-                        if state_manager.current_state:
-                            state_manager.current_state.last_error = (
-                                f"Эскалация: {current_phase.phase_name} "
-                                f"не удалась после {MAX_PHASE_RETRIES} попыток"
+                            msg = GracefulDegradation.get_degradation_message(
+                                error_type_detected, current_phase,
                             )
-                            state_manager.save_state()
-
-                elif strategy == RetryStrategy.RETRY_FROM_ORIENT:
-                    print("Перезапуск с фазы ORIENT (сбой на ранней фазе)")
-                    if state_manager.current_state:
-                        state_manager._current_state.phase = SessionPhase.ORIENT
+                            print(f"Плавная деградация: {msg}")
+                            state_manager.mark_degraded(current_phase.phase_name)
+                            delay = AUTO_CONTINUE_DELAY_SECONDS
+                        else:
+                            # Save changes if git error during commit
+                            if (
+                                error_type_detected == ErrorType.GIT_ERROR
+                                and current_phase == SessionPhase.COMMIT
+                            ):
+                                print("Попытка сохранить незакоммиченные изменения...")
+                                diff_file = await recovery.save_git_diff_to_file()
+                                if diff_file:
+                                    print(f"Изменения сохранены в: {diff_file}")
+                                else:
+                                    await recovery.stash_changes()
+
+                            # Mark issue as blocked and notify
+                            print(f"ЭСКАЛАЦИЯ: Фаза {current_phase.phase_name} "
+                                  f"не удалась после {MAX_PHASE_RETRIES} попыток")
+                            if state_manager.current_state:
+                                state_manager.current_state.last_error = (
+                                    f"Эскалация: {current_phase.phase_name} "
+                                    f"не удалась после {MAX_PHASE_RETRIES} попыток"
+                                )
+                                state_manager.save_state()
+
+                    elif strategy == RetryStrategy.RETRY_FROM_ORIENT:
+                        print("Перезапуск с фазы ORIENT (сбой на ранней фазе)")
+                        if state_manager.current_state:
+                            state_manager._current_state.phase = SessionPhase.ORIENT
 
-                elif strategy == RetryStrategy.RETRY_IMPLEMENTATION:
-                    print("Повтор с фазы IMPLEMENTATION")
-                    if state_manager.current_state:
-                        state_manager._current_state.phase = SessionPhase.IMPLEMENTATION
+                    elif strategy == RetryStrategy.RETRY_IMPLEMENTATION:
+                        print("Повтор с фазы IMPLEMENTATION")
+                        if state_manager.current_state:
+                            state_manager._current_state.phase = SessionPhase.IMPLEMENTATION
 
-                elif strategy == RetryStrategy.RETRY_CURRENT:
-                    print(f"Повтор фазы {current_phase.phase_name}")
+                    elif strategy == RetryStrategy.RETRY_CURRENT:
+                        print(f"Повтор фазы {current_phase.phase_name}")
 
-                print(f"Повтор с задержкой {delay:.1f}с...")
-                await asyncio.sleep(delay)
-                continue
-            else:
-                print("Повтор с новой сессией...")
+                    print(f"Повтор с задержкой {delay:.1f}с...")
+                    await asyncio.sleep(delay)
+                    continue
+                else:
+                    print("Повтор с новой сессией...")
 
-        # Always wait before next iteration
-        await asyncio.sleep(AUTO_CONTINUE_DELAY_SECONDS)
+            # Always wait before next iteration
+            await asyncio.sleep(AUTO_CONTINUE_DELAY_SECONDS)
 
-        # Small delay between sessions
-        if max_iterations is None or iteration < max_iterations:
-            print("\nПодготовка следующей сессии...\n")
-            await asyncio.sleep(1)
+            # Small delay between sessions
+            if max_iterations is None or iteration < max_iterations:
+                print("\nПодготовка следующей сессии...\n")
+                await asyncio.sleep(1)
 
     # Final summary
     print("\n" + "=" * 70)
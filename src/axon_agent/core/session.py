@@ -7,9 +7,16 @@
 Реализует управление контекстным окном с компактным режимом и плавным завершением (ENG-29).
 """
 
+import asyncio
+import itertools
+import os
+import re
+import reprlib
+import sys
 import traceback
+from collections import deque
 from pathlib import Path
-from typing import Literal, NamedTuple
+from typing import Literal, NamedTuple, Self
 
 from claude_agent_sdk import (
     AssistantMessage,
@@ -43,6 +50,243 @@ COMPLETION_SIGNAL = "ALL_TASKS_DONE:"
 # Сигнал ограничения контекста, который запускает плавное завершение (ENG-29)
 CONTEXT_LIMIT_SIGNAL = "CONTEXT_LIMIT_REACHED:"
 
+# Подробный вывод в консоль (текст ответа, статистика контекста); AXON_VERBOSE=0
+# отключает его для CI и фоновых запусков, где stdout никто не читает
+VERBOSE_OUTPUT: bool = os.environ.get("AXON_VERBOSE", "1") != "0"
+
+# Сколько ждать новых фрагментов ответа перед записью пачки в stdout
+STDOUT_DEBOUNCE_SECONDS: float = 0.005
+
+# Сколько символов входа инструмента показывать в консоли
+TOOL_INPUT_DISPLAY_CHARS: int = 200
+
+# Предел строкового представления результата инструмента для учёта токенов (ENG-29)
+TOOL_RESULT_REPR_LIMIT: int = 64 * 1024
+
+# Сколько последних символов ответа агента сохранять в SessionResult.response
+RESPONSE_CAPTURE_MAX_CHARS: int = 64 * 1024
+
+_AUTH_GUIDANCE = (
+    "\nПохоже на ошибку аутентификации.",
+    "Проверьте переменную окружения CLAUDE_CODE_OAUTH_TOKEN.",
+)
+_RATE_LIMIT_GUIDANCE = (
+    "\nПохоже на ошибку превышения лимита запросов.",
+    "Агент повторит попытку после задержки.",
+)
+_BUFFER_GUIDANCE = (
+    "\nJSON-сообщение превысило лимит буфера 1МБ.",
+    "Обычно это вызвано browser_take_screenshot() без параметра filename или с fullPage=True.",
+    "Исправление: Всегда используйте browser_take_screenshot(filename='screenshots/ENG-XX.png') БЕЗ fullPage=True",
+    "Агент повторит попытку с новой сессией.",
+)
+
+# Подсказки по ключевым словам в тексте ошибки, в порядке приоритета
+_ERROR_GUIDANCE: dict[str, tuple[str, ...]] = {
+    "auth": _AUTH_GUIDANCE,
+    "token": _AUTH_GUIDANCE,
+    "rate": _RATE_LIMIT_GUIDANCE,
+    "limit": _RATE_LIMIT_GUIDANCE,
+    "buffer size": _BUFFER_GUIDANCE,
+    "1048576": _BUFFER_GUIDANCE,
+    "task": (
+        "\nПохоже на ошибку Task MCP Server.",
+        "Проверьте TASK_MCP_URL и убедитесь, что сервер запущен.",
+    ),
+    "telegram": (
+        "\nПохоже на ошибку Telegram MCP Server.",
+        "Проверьте TELEGRAM_MCP_URL и убедитесь, что сервер запущен.",
+    ),
+    "mcp": (
+        "\nПохоже на ошибку MCP-сервера.",
+        "Проверьте URL MCP-серверов и убедитесь, что они доступны.",
+    ),
+}
+
+# Один проход по тексту ошибки; lookahead находит и перекрывающиеся слова
+_ERROR_CLASS_RE = re.compile("(?=(" + "|".join(map(re.escape, _ERROR_GUIDANCE)) + "))")
+
+
+def _error_guidance(error_msg: str) -> tuple[str, ...] | None:
+    """
+    Подсказка для ошибки сессии по ключевым словам в её тексте.
+
+    Args:
+        error_msg: Текст исключения
+
+    Returns:
+        Строки подсказки или None для неизвестного типа ошибки
+    """
+    found = set(_ERROR_CLASS_RE.findall(error_msg.lower()))
+    if not found:
+        return None
+    return next(lines for keyword, lines in _ERROR_GUIDANCE.items() if keyword in found)
+
+
+class _BoundedRepr(reprlib.Repr):
+    """reprlib.Repr, который для небольших объектов совпадает с str().
+
+    Длинные строки обрезаются после 2*limit символов, поэтому первые limit
+    символов совпадают с str(obj); словари сохраняют порядок вставки,
+    а не сортируются, как в reprlib по умолчанию.
+    """
+
+    def __init__(self, limit: int) -> None:
+        super().__init__()
+        self.maxlevel = 32
+        self.maxstring = 2 * limit
+        self.maxother = self.maxlong = 2 * limit + 3
+        self.maxdict = self.maxlist = self.maxtuple = limit
+        self.maxset = self.maxfrozenset = self.maxdeque = self.maxarray = limit
+
+    def repr_str(self, x: str, level: int) -> str:
+        if len(x) <= self.maxstring:
+            return repr(x)
+        # repr() выбирает кавычки по всей строке, а не по срезу
+        probe = '"' if '"' in x else "'" if "'" in x else ""
+        return repr(x[: self.maxstring] + probe)[: self.maxstring] + "..."
+
+    def repr_dict(self, x: dict, level: int) -> str:
+        if not x:
+            return "{}"
+        if level <= 0:
+            return "{...}"
+        newlevel = level - 1
+        pieces = [
+            f"{self.repr1(key, newlevel)}: {self.repr1(value, newlevel)}"
+            for key, value in itertools.islice(x.items(), self.maxdict)
+        ]
+        if len(x) > self.maxdict:
+            pieces.append("...")
+        return "{" + ", ".join(pieces) + "}"
+
+
+def _bounded_str(obj: object, limit: int = TOOL_RESULT_REPR_LIMIT) -> tuple[str, bool]:
+    """
+    Строковое представление объекта длиной не больше limit символов.
+
+    В отличие от str(obj) не разворачивает целиком вложенные списки и
+    словари с мегабайтными строками (DOM, base64) ради первых символов.
+
+    Args:
+        obj: Вход или результат инструмента
+        limit: Максимальная длина результата
+
+    Returns:
+        Кортеж (префикс str(obj) длиной до limit, был ли текст обрезан)
+    """
+    if isinstance(obj, (list, tuple, dict)):
+        text = _BoundedRepr(limit).repr(obj)
+    else:
+        text = obj if isinstance(obj, str) else str(obj)
+    return text[:limit], len(text) > limit
+
+
+def _write_stderr(text: str) -> None:
+    sys.stderr.write(text)
+    sys.stderr.flush()
+
+
+async def print_traceback_async() -> None:
+    """
+    Печатает трассировку текущего исключения, не блокируя event loop.
+
+    Трассировка форматируется сразу (исключение доступно только в этом
+    потоке), а запись в stderr, которая может встать на заполненном пайпе,
+    уходит в поток. Вызывать только внутри блока except.
+    """
+    await asyncio.to_thread(_write_stderr, traceback.format_exc())
+
+
+class _StdoutBatcher:
+    """
+    Буферизованный вывод потока ответа в stdout.
+
+    Каждый TextBlock раньше печатался отдельным print(flush=True) — это
+    write+flush на каждый фрагмент, который на медленном терминале (SSH)
+    блокирует event loop. Здесь фрагменты кладутся в очередь, а одна
+    фоновая задача собирает всё накопившееся за debounce и делает один
+    write+flush на пачку. Весь вывод сессии во время стрима должен идти
+    через write(), иначе нарушится порядок строк.
+    """
+
+    def __init__(self, debounce: float = STDOUT_DEBOUNCE_SECONDS) -> None:
+        self._debounce = debounce
+        self._queue: asyncio.Queue[str | None] = asyncio.Queue()
+        self._task: asyncio.Task[None] | None = None
+
+    async def __aenter__(self) -> Self:
+        self._task = asyncio.create_task(self._writer())
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        # None — сигнал писателю дописать очередь и завершиться
+        self._queue.put_nowait(None)
+        if self._task is not None:
+            await self._task
+
+    def write(self, text: str) -> None:
+        """Поставить текст в очередь на вывод (не блокирует)."""
+        self._queue.put_nowait(text)
+
+    async def _writer(self) -> None:
+        while True:
+            chunk = await self._queue.get()
+            if chunk is not None:
+                await asyncio.sleep(self._debounce)
+            parts: list[str] = []
+            done = chunk is None
+            if chunk is not None:
+                parts.append(chunk)
+            while not self._queue.empty():
+                chunk = self._queue.get_nowait()
+                if chunk is None:
+                    done = True
+                else:
+                    parts.append(chunk)
+            if parts:
+                sys.stdout.write("".join(parts))
+                sys.stdout.flush()
+            if done:
+                return
+
+
+class _ResponseTail:
+    """
+    Ограниченный хвост текста ответа и поиск сигналов по всему потоку.
+
+    Полный ответ агента может занимать мегабайты, а нужен он только для
+    проверки сигналов и как текст результата. Сигналы ищутся в каждом
+    фрагменте вместе с концом предыдущего (сигнал может быть разрезан
+    между сообщениями), а хранятся только последние max_chars символов.
+    """
+
+    def __init__(self, signals: tuple[str, ...], max_chars: int) -> None:
+        self._signals = signals
+        self._carry_len = max(len(signal) for signal in signals) - 1
+        self._max_chars = max_chars
+        self._chunks: deque[str] = deque()
+        self._size = 0
+        self._carry = ""
+        self.found: set[str] = set()
+
+    def feed(self, text: str) -> None:
+        """Добавить фрагмент ответа."""
+        window = self._carry + text
+        for signal in self._signals:
+            if signal in window:
+                self.found.add(signal)
+        self._carry = window[len(window) - self._carry_len:]
+
+        self._chunks.append(text)
+        self._size += len(text)
+        while self._size - len(self._chunks[0]) >= self._max_chars:
+            self._size -= len(self._chunks.popleft())
+
+    def text(self) -> str:
+        """Последние max_chars символов ответа."""
+        return "".join(self._chunks)[-self._max_chars:]
+
 
 class SessionResult(NamedTuple):
     """Результат выполнения сессии агента.
@@ -93,81 +337,97 @@ async def run_agent_session(
         await client.query(message)
 
         # Собрать текст ответа и показать использование инструментов
-        response_text: str = ""
+        response = _ResponseTail(
+            (COMPLETION_SIGNAL, CONTEXT_LIMIT_SIGNAL), RESPONSE_CAPTURE_MAX_CHARS
+        )
         tool_call_count: int = 0
 
-        async for msg in client.receive_response():
-            # Обработать AssistantMessage (текст и использование инструментов)
-            if isinstance(msg, AssistantMessage):
-                for block in msg.content:
-                    if isinstance(block, TextBlock):
-                        response_text += block.text
-                        # Отследить токены ответа
-                        ctx_manager.budget.add("history", estimate_tokens(block.text))
-                        print(block.text, end="", flush=True)
-                    elif isinstance(block, ToolUseBlock):
-                        tool_call_count += 1
-                        print(f"\n[Tool: {block.name}]", flush=True)
-                        input_str: str = str(block.input)
-                        if len(input_str) > 200:
-                            print(f"   Input: {input_str[:200]}...", flush=True)
-                        else:
-                            print(f"   Input: {input_str}", flush=True)
-
-            # Обработать UserMessage (результаты инструментов)
-            elif isinstance(msg, UserMessage):
-                for block in msg.content:
-                    if isinstance(block, ToolResultBlock):
-                        result_content = str(block.content)
-                        is_error: bool = bool(block.is_error) if block.is_error else False
-
-                        # Отследить и обрезать вывод инструментов (ENG-29)
-                        processed_output = ctx_manager.track_tool_output(
-                            tool_name="tool_result",
-                            output=result_content,
-                        )
-
-                        # Проверить, была ли команда заблокирована хуком безопасности
-                        if "blocked" in result_content.lower():
-                            print(f"   [BLOCKED] {result_content}", flush=True)
-                        elif is_error:
-                            # Показать ошибки (обрезанные)
-                            error_str: str = result_content[:500]
-                            print(f"   [Error] {error_str}", flush=True)
-                        else:
-                            # Инструмент успешно выполнен - показать краткое подтверждение
-                            print("   [Done]", flush=True)
-
-            # Проверить бюджет контекста после каждого сообщения (ENG-29)
-            if ctx_manager.should_trigger_shutdown():
-                print("\n" + "!" * 70)
-                print("  ПРЕДУПРЕЖДЕНИЕ О ЛИМИТЕ КОНТЕКСТА: использовано 85%+ контекста")
-                print("  Запуск плавного завершения...")
-                print("!" * 70 + "\n")
-
-                # Prepare shutdown checkpoint
-                memory_path = project_dir / ".agent" / "MEMORY.md"
-                shutdown_info = ctx_manager.prepare_graceful_shutdown(memory_path)
-
-                return SessionResult(
-                    status=SESSION_CONTEXT_LIMIT,
-                    response=f"{CONTEXT_LIMIT_SIGNAL} {shutdown_info}"
-                )
+        # Потоковый вывод идёт пачками через фоновую задачу, а не print на каждый блок
+        async with _StdoutBatcher() as out:
+            async for msg in client.receive_response():
+                # Типы SDK не наследуются: точное сравнение type() вместо обхода MRO
+
+                # Обработать AssistantMessage (текст и использование инструментов)
+                if type(msg) is AssistantMessage:
+                    msg_text_parts: list[str] = []
+                    for block in msg.content:
+                        if type(block) is TextBlock:
+                            msg_text_parts.append(block.text)
+                            if VERBOSE_OUTPUT:
+                                out.write(block.text)
+                        elif type(block) is ToolUseBlock:
+                            tool_call_count += 1
+                            out.write(f"\n[Tool: {block.name}]\n")
+                            input_str, input_cut = _bounded_str(block.input, TOOL_INPUT_DISPLAY_CHARS)
+                            if input_cut:
+                                out.write(f"   Input: {input_str}...\n")
+                            else:
+                                out.write(f"   Input: {input_str}\n")
+
+                    # Отследить токены ответа: одна оценка на сообщение, не на блок
+                    if msg_text_parts:
+                        msg_text = "".join(msg_text_parts)
+                        response.feed(msg_text)
+                        ctx_manager.budget.add("history", estimate_tokens(msg_text))
+
+                # Обработать UserMessage (результаты инструментов)
+                elif type(msg) is UserMessage:
+                    for block in msg.content:
+                        if type(block) is ToolResultBlock:
+                            result_content, _ = _bounded_str(block.content)
+                            is_error: bool = bool(block.is_error) if block.is_error else False
+
+                            # Отследить и обрезать вывод инструментов (ENG-29)
+                            processed_output = ctx_manager.track_tool_output(
+                                tool_name="tool_result",
+                                output=result_content,
+                            )
+
+                            # Проверить, была ли команда заблокирована хуком безопасности
+                            if "blocked" in result_content.lower():
+                                out.write(f"   [BLOCKED] {result_content}\n")
+                            elif is_error:
+                                # Показать ошибки (обрезанные)
+                                error_str: str = result_content[:500]
+                                out.write(f"   [Error] {error_str}\n")
+                            else:
+                                # Инструмент успешно выполнен - показать краткое подтверждение
+                                out.write("   [Done]\n")
+
+                # Проверить бюджет контекста после каждого сообщения (ENG-29)
+                if ctx_manager.should_trigger_shutdown():
+                    out.write("\n" + "!" * 70 + "\n")
+                    out.write("  ПРЕДУПРЕЖДЕНИЕ О ЛИМИТЕ КОНТЕКСТА: использовано 85%+ контекста\n")
+                    out.write("  Запуск плавного завершения...\n")
+                    out.write("!" * 70 + "\n\n")
+
+                    # Prepare shutdown checkpoint
+                    memory_path = project_dir / ".agent" / "MEMORY.md"
+                    shutdown_info = ctx_manager.prepare_graceful_shutdown(memory_path)
+
+                    return SessionResult(
+                        status=SESSION_CONTEXT_LIMIT,
+                        response=f"{CONTEXT_LIMIT_SIGNAL} {shutdown_info}"
+                    )
 
         print("\n" + "-" * 70 + "\n")
 
         # Show context usage summary
-        stats = ctx_manager.get_stats()
-        mode_indicator = f" [{stats['mode'].upper()}]" if stats['mode'] != "normal" else ""
-        print(f"Context: {stats['usage_percent']:.1f}% used ({stats['total_used']:,} / {stats['max_tokens']:,}){mode_indicator}")
-        print(f"Tool calls: {tool_call_count}")
+        if VERBOSE_OUTPUT:
+            stats = ctx_manager.get_stats()
+            mode_indicator = f" [{stats['mode'].upper()}]" if stats['mode'] != "normal" else ""
+            print(f"Context: {stats['usage_percent']:.1f}% used ({stats['total_used']:,} / {stats['max_tokens']:,}){mode_indicator}")
+            print(f"Tool calls: {tool_call_count}")
+
+        # В результат идёт только хвост ответа; сигналы уже найдены по всему потоку
+        response_text = response.text()
 
         # Check for completion signal from orchestrator
-        if COMPLETION_SIGNAL in response_text:
+        if COMPLETION_SIGNAL in response.found:
             return SessionResult(status=SESSION_COMPLETE, response=response_text)
 
         # Check for context limit signal from orchestrator (self-reported)
-        if CONTEXT_LIMIT_SIGNAL in response_text:
+        if CONTEXT_LIMIT_SIGNAL in response.found:
             return SessionResult(status=SESSION_CONTEXT_LIMIT, response=response_text)
 
         return SessionResult(status=SESSION_CONTINUE, response=response_text)
@@ -175,13 +435,13 @@ async def run_agent_session(
     except ConnectionError as e:
         print(f"\nСетевая ошибка во время сессии агента: {e}")
         print("Проверьте подключение к Интернету и повторите попытку.")
-        traceback.print_exc()
+        await print_traceback_async()
         return SessionResult(status=SESSION_ERROR, response=str(e))
 
     except TimeoutError as e:
         print(f"\nТаймаут во время сессии агента: {e}")
         print("Истекло время ожидания ответа API. Будет повтор с новой сессией.")
-        traceback.print_exc()
+        await print_traceback_async()
         return SessionResult(status=SESSION_ERROR, response=str(e))
 
     except Exception as e:
@@ -190,30 +450,13 @@ async def run_agent_session(
 
         print(f"\nОшибка во время сессии агента ({error_type}): {error_msg}")
         print("\nПолная трассировка:")
-        traceback.print_exc()
+        await print_traceback_async()
 
         # Provide actionable guidance based on error type
-        error_lower = error_msg.lower()
-        if "auth" in error_lower or "token" in error_lower:
-            print("\nПохоже на ошибку аутентификации.")
-            print("Проверьте переменную окружения CLAUDE_CODE_OAUTH_TOKEN.")
-        elif "rate" in error_lower or "limit" in error_lower:
-            print("\nПохоже на ошибку превышения лимита запросов.")
-            print("Агент повторит попытку после задержки.")
-        elif "buffer size" in error_lower or "1048576" in error_lower:
-            print("\nJSON-сообщение превысило лимит буфера 1МБ.")
-            print("Обычно это вызвано browser_take_screenshot() без параметра filename или с fullPage=True.")
-            print("Исправление: Всегда используйте browser_take_screenshot(filename='screenshots/ENG-XX.png') БЕЗ fullPage=True")
-            print("Агент повторит попытку с новой сессией.")
-        elif "task" in error_lower:
-            print("\nПохоже на ошибку Task MCP Server.")
-            print("Проверьте TASK_MCP_URL и убедитесь, что сервер запущен.")
-        elif "telegram" in error_lower:
-            print("\nПохоже на ошибку Telegram MCP Server.")
-            print("Проверьте TELEGRAM_MCP_URL и убедитесь, что сервер запущен.")
-        elif "mcp" in error_lower:
-            print("\nПохоже на ошибку MCP-сервера.")
-            print("Проверьте URL MCP-серверов и убедитесь, что они доступны.")
+        guidance = _error_guidance(error_msg)
+        if guidance is not None:
+            for line in guidance:
+                print(line)
         else:
             # Unexpected error type - make this visible
             print(f"\nНеожиданный тип ошибки: {error_type}")
@@ -12,21 +12,26 @@ ENG-35: Детальное восстановление после ошибок
 """
 
 import asyncio
-import json
 import logging
 import os
 import tempfile
 import time
 import traceback
+import uuid
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 from pathlib import Path
 from typing import Any, Callable, Coroutine, TypeAlias
 
+import orjson
+
 # Configure logging
 logger = logging.getLogger("session_state")
 
+# Размер журнала событий, после которого он сворачивается в новый снимок
+EVENT_LOG_COMPACT_BYTES: int = 64 * 1024
+
 
 class SessionPhase(Enum):
     """Фазы сессии для восстановления на основе контрольных точек.
@@ -95,6 +100,20 @@ class RetryStrategy(Enum):
 # Максимальное количество попыток на фазу перед эскалацией (ENG-67)
 MAX_PHASE_RETRIES: int = 2
 
+# Стратегия повтора фазы до исчерпания попыток (ENG-67):
+# ранние фазы дёшево начать с ORIENT, реализацию повторить целиком,
+# поздние фазы (код уже написан) — повторить только саму фазу
+_PHASE_RETRY_STRATEGY: dict[SessionPhase, RetryStrategy] = {
+    SessionPhase.ORIENT: RetryStrategy.RETRY_FROM_ORIENT,
+    SessionPhase.STATUS_CHECK: RetryStrategy.RETRY_FROM_ORIENT,
+    SessionPhase.VERIFICATION: RetryStrategy.RETRY_FROM_ORIENT,
+    SessionPhase.IMPLEMENTATION: RetryStrategy.RETRY_IMPLEMENTATION,
+    SessionPhase.COMMIT: RetryStrategy.RETRY_CURRENT,
+    SessionPhase.MARK_DONE: RetryStrategy.RETRY_CURRENT,
+    SessionPhase.NOTIFY: RetryStrategy.RETRY_CURRENT,
+    SessionPhase.MEMORY_FLUSH: RetryStrategy.RETRY_CURRENT,
+}
+
 # Максимальный возраст (часы) для состояния восстановления, после которого оно считается устаревшим (ENG-69)
 STALE_RECOVERY_HOURS: float = 24.0
 
@@ -232,6 +251,9 @@ class GracefulDegradation:
     def get_backoff_delay(cls, attempt: int, error_type: ErrorType) -> float:
         """Get backoff delay for retry attempt.
 
+        Looks the delay up in the precomputed _BACKOFF_TABLE; attempts past
+        the table are computed on the fly.
+
         Args:
             attempt: Current attempt number (1-based)
             error_type: Type of error
@@ -239,6 +261,14 @@ class GracefulDegradation:
         Returns:
             Delay in seconds before retry
         """
+        delay = _BACKOFF_TABLE.get((error_type, attempt))
+        if delay is None:
+            delay = cls._compute_backoff_delay(attempt, error_type)
+        return delay
+
+    @classmethod
+    def _compute_backoff_delay(cls, attempt: int, error_type: ErrorType) -> float:
+        """Backoff policy behind get_backoff_delay."""
         if error_type == ErrorType.RATE_LIMIT:
             index = min(attempt - 1, len(cls.RATE_LIMIT_DELAYS) - 1)
             return cls.RATE_LIMIT_DELAYS[index]
@@ -280,16 +310,42 @@ class GracefulDegradation:
         return f"Service degraded: {error_type.value}"
 
 
+# Задержки повтора для всех типов ошибок и номеров попыток, которые
+# встречаются на практике (от 0 до максимума повторов + 1); считаются один раз
+_BACKOFF_TABLE: dict[tuple[ErrorType, int], float] = {
+    (error_type, attempt): GracefulDegradation._compute_backoff_delay(attempt, error_type)
+    for error_type in ErrorType
+    for attempt in range(
+        max(MAX_PHASE_RETRIES, *GracefulDegradation.MAX_RETRIES.values()) + 2
+    )
+}
+
+
 class SessionStateManager:
-    """Manages session state persistence and recovery."""
+    """Manages session state persistence and recovery.
+
+    State is persisted as a full snapshot (``session_state.json``) plus an
+    append-only delta log (``session_events.jsonl``). Phase transitions,
+    errors and other small updates append one JSON line instead of
+    rewriting the whole snapshot; the log is folded into a fresh snapshot
+    once it exceeds EVENT_LOG_COMPACT_BYTES. Each snapshot carries a
+    generation id and events only apply to the generation they were
+    written against, so a crash between compaction steps cannot replay
+    stale deltas.
+    """
 
     STATE_FILE = ".agent/session_state.json"
+    EVENTS_FILE = ".agent/session_events.jsonl"
 
     def __init__(self, project_dir: Path):
         self.project_dir = project_dir
         self.state_file = project_dir / self.STATE_FILE
+        self.events_file = project_dir / self.EVENTS_FILE
         self._current_state: SessionState | None = None
         self._phase_attempts: dict[SessionPhase, PhaseAttempt] = {}
+        # Generation of the snapshot on disk that new events extend
+        self._generation: str | None = None
+        self._events_bytes = 0
 
     @property
     def current_state(self) -> SessionState | None:
@@ -302,16 +358,18 @@ class SessionStateManager:
         agent_dir.mkdir(parents=True, exist_ok=True)
 
     def save_state(self) -> None:
-        """Save current state to file using atomic write.
+        """Save a full snapshot of the current state using atomic write.
 
         Writes to a temporary file in the same directory, then renames
         to the target path. This prevents corrupt/partial writes if the
-        process crashes mid-write.
+        process crashes mid-write. The snapshot starts a new generation,
+        so the delta log is discarded afterwards.
         """
         if self._current_state is None:
             return
 
         self._ensure_agent_dir()
+        generation = uuid.uuid4().hex
 
         try:
             # Write to temp file in the same directory, then atomic rename
@@ -322,8 +380,11 @@ class SessionStateManager:
                 dir=str(parent_dir),
             )
             try:
-                with os.fdopen(fd, "w") as f:
-                    json.dump(self._current_state.to_dict(), f, indent=2)
+                with os.fdopen(fd, "wb") as f:
+                    f.write(orjson.dumps(
+                        {**self._current_state.to_dict(), "generation": generation},
+                        option=orjson.OPT_INDENT_2,
+                    ))
                 os.replace(tmp_path, str(self.state_file))
             except BaseException:
                 # Clean up temp file on any error
@@ -332,22 +393,91 @@ class SessionStateManager:
                 except OSError:
                     pass
                 raise
+            self._generation = generation
+            self._events_bytes = 0
+            self.events_file.unlink(missing_ok=True)
             logger.debug(f"Session state saved: {self._current_state.phase.phase_name}")
         except IOError as e:
             logger.error(f"Failed to save session state: {e}")
 
+    def _append_event(
+        self,
+        changes: dict[str, Any],
+        appends: dict[str, list[Any]] | None = None,
+    ) -> None:
+        """Persist a state delta as one line of the event log.
+
+        Falls back to a full snapshot when there is no snapshot of this
+        manager's state on disk yet, and compacts the log once it grows
+        past EVENT_LOG_COMPACT_BYTES.
+
+        Args:
+            changes: Serialized fields replaced by this update
+            appends: Serialized list fields extended by this update
+        """
+        if self._current_state is None:
+            return
+        if self._generation is None:
+            self.save_state()
+            return
+
+        event: dict[str, Any] = {"generation": self._generation, "set": changes}
+        if appends:
+            event["append"] = appends
+        line = orjson.dumps(event, option=orjson.OPT_APPEND_NEWLINE)
+
+        try:
+            # O_APPEND keeps each line contiguous even if the process dies mid-log
+            fd = os.open(self.events_file, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            try:
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+        except OSError as e:
+            logger.warning(f"Failed to append session event, writing snapshot: {e}")
+            self.save_state()
+            return
+
+        self._events_bytes += len(line)
+        if self._events_bytes > EVENT_LOG_COMPACT_BYTES:
+            self.save_state()
+
+    def _replay_events(self, data: dict[str, Any]) -> None:
+        """Apply logged deltas of the snapshot's generation to its data in place."""
+        generation = data.get("generation")
+        try:
+            raw = self.events_file.read_bytes()
+        except OSError:
+            return
+
+        for line in raw.splitlines():
+            try:
+                event = orjson.loads(line)
+            except orjson.JSONDecodeError:
+                continue  # Torn final line from a crash mid-write
+            if generation is None or event.get("generation") != generation:
+                continue
+            data.update(event.get("set", {}))
+            for key, items in event.get("append", {}).items():
+                data[key] = [*data.get(key, []), *items]
+
+        if self._current_state is None and generation is not None:
+            # Continue the loaded generation when this state is resumed
+            self._generation = generation
+            self._events_bytes = len(raw)
+
     def load_state(self) -> SessionState | None:
-        """Load state from file if exists."""
+        """Load state from the snapshot and replay the event log, if it exists."""
         if not self.state_file.exists():
             return None
 
         try:
-            with open(self.state_file, "r") as f:
-                data = json.load(f)
+            data = orjson.loads(self.state_file.read_bytes())
+            self._replay_events(data)
             state = SessionState.from_dict(data)
             logger.info(f"Loaded session state: phase={state.phase.phase_name}, issue={state.issue_id}")
             return state
-        except (IOError, json.JSONDecodeError, ValueError) as e:
+        except (IOError, orjson.JSONDecodeError, ValueError) as e:
             logger.warning(f"Failed to load session state: {e}")
             return None
 
@@ -359,8 +489,14 @@ class SessionStateManager:
                 logger.debug("Session state cleared")
             except IOError as e:
                 logger.warning(f"Failed to clear session state: {e}")
+        try:
+            self.events_file.unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning(f"Failed to clear session events: {e}")
         self._current_state = None
         self._phase_attempts.clear()
+        self._generation = None
+        self._events_bytes = 0
 
     def start_session(self, issue_id: str) -> SessionState:
         """Start a new session.
@@ -405,20 +541,25 @@ class SessionStateManager:
         old_phase = self._current_state.phase
         now = datetime.now().isoformat()
 
+        appends: dict[str, list[Any]] = {}
+
         # Mark old phase as completed if not already tracked
         if old_phase.phase_name not in self._current_state.completed_phases:
             self._current_state.completed_phases.append(old_phase.phase_name)
+            appends["completed_phases"] = [old_phase.phase_name]
 
         # Append to phase_history log (ENG-66)
-        self._current_state.phase_history.append({
+        history_entry = {
             "phase": phase.phase_name,
             "timestamp": now,
-        })
+        }
+        self._current_state.phase_history.append(history_entry)
+        appends["phase_history"] = [history_entry]
 
         self._current_state.phase = phase
         self._current_state.last_updated = now
         logger.info(f"Phase transition: {old_phase.phase_name} -> {phase.phase_name}")
-        self.save_state()
+        self._append_event({"phase": phase.phase_name, "last_updated": now}, appends)
 
     def record_error(
         self,
@@ -455,7 +596,15 @@ class SessionStateManager:
         # Update serializable phase attempts
         self._current_state.phase_attempts[phase.phase_name] = self._phase_attempts[phase].attempt
 
-        self.save_state()
+        self._append_event(
+            {
+                "last_error": self._current_state.last_error,
+                "last_error_type": error_type.value,
+                "last_updated": self._current_state.last_updated,
+                "phase_attempts": self._current_state.phase_attempts,
+            },
+            {"error_log": [log_entry]},
+        )
 
     def get_phase_attempt(self, phase: SessionPhase) -> PhaseAttempt:
         """Get attempt tracker for a phase."""
@@ -476,13 +625,13 @@ class SessionStateManager:
             self._phase_attempts[phase] = PhaseAttempt(phase=phase)
         if self._current_state and phase.phase_name in self._current_state.phase_attempts:
             self._current_state.phase_attempts[phase.phase_name] = 0
-            self.save_state()
+            self._append_event({"phase_attempts": self._current_state.phase_attempts})
 
     def mark_degraded(self, service: str) -> None:
         """Mark a service as degraded."""
         if self._current_state and service not in self._current_state.degraded_services:
             self._current_state.degraded_services.append(service)
-            self.save_state()
+            self._append_event({}, {"degraded_services": [service]})
 
     def has_uncommitted_changes(self) -> bool:
         """Check git status for uncommitted changes."""
@@ -499,7 +648,7 @@ class SessionStateManager:
             has_changes = bool(result.stdout.strip())
             if self._current_state:
                 self._current_state.uncommitted_changes = has_changes
-                self.save_state()
+                self._append_event({"uncommitted_changes": has_changes})
             return has_changes
         except (subprocess.SubprocessError, FileNotFoundError):
             return False
@@ -659,32 +808,8 @@ class SessionRecovery:
         """
         if attempts >= MAX_PHASE_RETRIES:
             return RetryStrategy.ESCALATE
-
-        # Early phases: restart from beginning (cheap)
-        early_phases = (
-            SessionPhase.ORIENT,
-            SessionPhase.STATUS_CHECK,
-            SessionPhase.VERIFICATION,
-        )
-        if phase in early_phases:
-            return RetryStrategy.RETRY_FROM_ORIENT
-
-        # Implementation: retry just implementation
-        if phase == SessionPhase.IMPLEMENTATION:
-            return RetryStrategy.RETRY_IMPLEMENTATION
-
-        # Late phases: retry current phase only (code already written)
-        late_phases = (
-            SessionPhase.COMMIT,
-            SessionPhase.MARK_DONE,
-            SessionPhase.NOTIFY,
-            SessionPhase.MEMORY_FLUSH,
-        )
-        if phase in late_phases:
-            return RetryStrategy.RETRY_CURRENT
-
-        # Fallback for any unknown phase
-        return RetryStrategy.RETRY_CURRENT
+        # Fallback for any unknown phase: retry current phase only
+        return _PHASE_RETRY_STRATEGY.get(phase, RetryStrategy.RETRY_CURRENT)
 
     def classify_error(self, error: Exception) -> ErrorType:
         """Classify an exception into an error type."""
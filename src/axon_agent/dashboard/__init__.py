@@ -1,14 +1,84 @@
 """Built-in analytics dashboard — starts with the agent automatically."""
 
+import asyncio
+import logging
 import threading
+import weakref
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
+    import uvicorn
     from fastapi import FastAPI
 
+logger = logging.getLogger(__name__)
+
+# Servers behind the tasks returned by start_dashboard, for stop_dashboard
+_SERVERS: "weakref.WeakKeyDictionary[asyncio.Task[None], uvicorn.Server]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+async def _serve(server: "uvicorn.Server", port: int) -> None:
+    """Run the server, keeping startup failures away from the agent loop."""
+    try:
+        await server.serve()
+    except SystemExit:
+        # uvicorn exits the process when the port cannot be bound
+        logger.warning("Dashboard failed to start on port %d", port)
+
+
+async def start_dashboard(port: int = 8003) -> asyncio.Task[None]:
+    """Serve the FastAPI + static dashboard as a task on the running loop.
+
+    The dashboard shares the agent's event loop instead of running a second
+    loop in its own thread. Keep a reference to the returned task for as
+    long as the dashboard should run and pass it to ``stop_dashboard`` to
+    shut the server down.
+
+    Args:
+        port: TCP port to bind (default 8003).
+
+    Returns:
+        The task running the server.
+    """
+    import uvicorn
+
+    from axon_agent.dashboard.api import app
+
+    config = uvicorn.Config(
+        app, host="0.0.0.0", port=port, log_level="warning", loop="asyncio"
+    )
+    server = uvicorn.Server(config)
+    task = asyncio.create_task(_serve(server, port), name="dashboard")
+    _SERVERS[task] = server
+    return task
+
+
+async def stop_dashboard(task: asyncio.Task[None], timeout: float = 5.0) -> None:
+    """Shut down a dashboard started by ``start_dashboard`` and wait for it.
+
+    The server is asked to exit so it closes its sockets; if it has not
+    finished within ``timeout`` seconds the task is cancelled.
+
+    Args:
+        task: Task returned by ``start_dashboard``.
+        timeout: Seconds to wait for a graceful shutdown.
+    """
+    server = _SERVERS.pop(task, None)
+    if server is not None:
+        server.should_exit = True
+    if task.done():
+        return
+    try:
+        await asyncio.wait_for(task, timeout)
+    except TimeoutError:
+        logger.warning("Dashboard did not stop within %.1fs, cancelled", timeout)
+    except Exception as exc:
+        logger.warning("Dashboard stopped with an error: %s", exc)
+
 
-def start_dashboard(port: int = 8003) -> threading.Thread:
-    """Launch the FastAPI + static dashboard in a background daemon thread.
+def start_dashboard_thread(port: int = 8003) -> threading.Thread:
+    """Launch the dashboard in a background daemon thread with its own loop.
 
     Args:
         port: TCP port to bind (default 8003).
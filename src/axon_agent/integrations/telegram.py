@@ -32,20 +32,64 @@ Usage:
         highlights=["Added auth system", "Fixed login bug"],
     )
 
-    # Send via Telegram MCP
-    Telegram_SendMessage(message=report, parse_mode="HTML")
+    # Send via Telegram MCP, one call per chunk
+    for chunk in chunk_message(report):
+        Telegram_SendMessage(message=chunk, parse_mode="HTML")
 """
 
+import functools
+import io
+from collections.abc import Sequence
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from typing import Any
 
+# Single-pass HTML escaping for Telegram messages
+_HTML_ESCAPE_TABLE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;"})
+# Text inside <code> keeps its double quotes
+_HTML_ESCAPE_TABLE_NOQUOTE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+
+# Sparkline levels, lowest to highest
+_SPARK_BLOCKS = "\u2581\u2582\u2583\u2584\u2585\u2586\u2587\u2588"
+
+# Session summary status emoji
+_STATUS_EMOJI = {
+    "completed": "\u2705",
+    "error": "\u274c",
+    "partial": "\u26a0\ufe0f",
+}
+
+# Session summary status labels, as str.title() would print them
+_STATUS_LABEL = {
+    "completed": "Completed",
+    "error": "Error",
+    "partial": "Partial",
+}
+
+# Error alert type emoji
+_ERR_TYPE_EMOJI = {
+    "syntax": "\U0001f534",
+    "runtime": "\U0001f4a5",
+    "test": "\U0001f9ea",
+    "mcp": "\U0001f50c",
+    "network": "\U0001f310",
+    "git": "\U0001f4e6",
+    "timeout": "\u23f0",
+}
+
+# English month abbreviations as printed by strftime("%b"), indexed by month
+_MONTH_ABBR = (
+    "", "Jan", "Feb", "Mar", "Apr", "May", "Jun",
+    "Jul", "Aug", "Sep", "Oct", "Nov", "Dec",
+)
+
 
 # =============================================================================
 # Progress Bar
 # =============================================================================
 
 
+@functools.lru_cache(maxsize=512)
 def format_progress_bar(
     current: int,
     total: int,
@@ -56,6 +100,9 @@ def format_progress_bar(
     """
     Create a visual progress bar.
 
+    Results are memoized per argument tuple, so repeated digests with
+    unchanged counts reuse the same string. Arguments must stay hashable.
+
     Args:
         current: Current progress value
         total: Total value
@@ -73,12 +120,19 @@ def format_progress_bar(
     if total <= 0:
         return f"{empty_char * width} 0%"
 
-    percentage = min(100, max(0, (current / total) * 100))
-    filled = int((percentage / 100) * width)
-    empty = width - filled
+    # Integer math only: the bar rounds down, the percentage to nearest
+    filled = current * width // total
+    if filled < 0:
+        filled = 0
+    elif filled > width:
+        filled = width
+    pct = (current * 200 + total) // (2 * total)
+    if pct > 100:
+        pct = 100
+    elif pct < 0:
+        pct = 0
 
-    bar = fill_char * filled + empty_char * empty
-    return f"{bar} {percentage:.0f}%"
+    return f"{fill_char * filled}{empty_char * (width - filled)} {pct}%"
 
 
 def format_progress_bar_with_label(
@@ -108,7 +162,7 @@ def format_progress_bar_with_label(
 # =============================================================================
 
 
-@dataclass
+@dataclass(slots=True)
 class DailyDigestData:
     """Data for daily digest report."""
 
@@ -135,78 +189,136 @@ class DailyDigestData:
     # Highlights
     highlights: list[str] = field(default_factory=list)
 
-    # Date
-    date: datetime = field(default_factory=datetime.now)
-
-
-def format_daily_digest(data: DailyDigestData) -> str:
+    # Date (None: the time the digest is formatted)
+    date: datetime | None = None
+
+
+# Optional daily digest sections, one bit each
+_DIGEST_PROGRESS = 1 << 0
+_DIGEST_BLOCKED = 1 << 1
+_DIGEST_SESSIONS = 1 << 2
+_DIGEST_GIT = 1 << 3
+_DIGEST_USAGE = 1 << 4
+_DIGEST_COST = 1 << 5
+_DIGEST_HIGHLIGHTS = 1 << 6
+
+# Digest sections in display order as (flags, %-template) pairs. A section
+# with flags 0 is always shown; the others only when all their bits are set.
+_DIGEST_SECTIONS: tuple[tuple[int, str], ...] = (
+    (0, "<b>\U0001f4ca \u0414\u0430\u0439\u0434\u0436\u0435\u0441\u0442 \u0437\u0430 \u0434\u0435\u043d\u044c \u2014 %(date)s</b>\n\n"),
+    (_DIGEST_PROGRESS, "<b>\u041f\u0440\u043e\u0433\u0440\u0435\u0441\u0441:</b> %(bar)s\n\n"),
+    (
+        0,
+        (
+            "<b>\u0417\u0430\u0434\u0430\u0447\u0438:</b>\n"
+            "  \u2705 \u0417\u0430\u0432\u0435\u0440\u0448\u0435\u043d\u043e: %(completed)s\n"
+            "  \U0001f504 \u0412 \u0440\u0430\u0431\u043e\u0442\u0435: %(in_progress)s\n"
+            "  \U0001f4cb \u041a \u0432\u044b\u043f\u043e\u043b\u043d\u0435\u043d\u0438\u044e: %(todo)s\n"
+        ),
+    ),
+    (_DIGEST_BLOCKED, "  \u26a0\ufe0f \u0417\u0430\u0431\u043b\u043e\u043a\u0438\u0440\u043e\u0432\u0430\u043d\u043e: %(blocked)s\n"),
+    (0, "\n"),
+    (
+        _DIGEST_SESSIONS,
+        (
+            "<b>\u0421\u0435\u0441\u0441\u0438\u0438:</b>\n"
+            "  \u23f1\ufe0f \u041a\u043e\u043b\u0438\u0447\u0435\u0441\u0442\u0432\u043e: %(sessions)s\n"
+            "  \u23f0 \u0414\u043b\u0438\u0442\u0435\u043b\u044c\u043d\u043e\u0441\u0442\u044c: %(duration)s\n"
+            "\n"
+        ),
+    ),
+    (
+        _DIGEST_GIT,
+        (
+            "<b>Git:</b>\n"
+            "  \U0001f4dd \u041a\u043e\u043c\u043c\u0438\u0442\u043e\u0432: %(commits)s\n"
+            "  \U0001f4c1 \u0424\u0430\u0439\u043b\u043e\u0432: %(files)s\n"
+            "  <code>+%(added)s / -%(removed)s</code>\n"
+            "\n"
+        ),
+    ),
+    (
+        _DIGEST_USAGE,
+        (
+            "<b>\u0418\u0441\u043f\u043e\u043b\u044c\u0437\u043e\u0432\u0430\u043d\u0438\u0435:</b>\n"
+            "  \U0001f3ab \u0422\u043e\u043a\u0435\u043d\u043e\u0432: %(tokens)s\n"
+        ),
+    ),
+    (_DIGEST_USAGE | _DIGEST_COST, "  \U0001f4b5 \u0421\u0442\u043e\u0438\u043c\u043e\u0441\u0442\u044c: $%(cost).2f\n"),
+    (_DIGEST_USAGE, "\n"),
+    (_DIGEST_HIGHLIGHTS, "<b>\u0418\u0442\u043e\u0433\u0438:</b>\n%(highlights)s\n"),
+)
+
+
+def _build_report_template(sections: tuple[tuple[int, str], ...], mask: int) -> str:
+    """Concatenate the sections enabled by ``mask`` into one %-template."""
+    template = "".join(part for flag, part in sections if flag & mask == flag)
+    # Every section ends with a newline; the report carries none after its last line
+    return template[:-1]
+
+
+# One branch-free template per combination of optional sections
+_DIGEST_TEMPLATES = tuple(
+    _build_report_template(_DIGEST_SECTIONS, mask) for mask in range(_DIGEST_HIGHLIGHTS << 1)
+)
+
+
+def format_daily_digest(data: DailyDigestData, now: datetime | None = None) -> str:
     """
     Format a daily digest report.
 
+    The optional sections present are folded into a bitmask that selects a
+    pre-built template, so rendering is a single %-format.
+
     Args:
         data: DailyDigestData with statistics
+        now: Current time to use when ``data.date`` is unset; pass one value
+            to format many reports against a single clock reading
 
     Returns:
         HTML-formatted Telegram message
     """
-    date_str = data.date.strftime("%Y-%m-%d")
+    d = data.date or now or datetime.now()
     total_tasks = data.completed_today + data.in_progress + data.todo + data.blocked
+    subs: dict[str, object] = {
+        "date": f"{d.year:04d}-{d.month:02d}-{d.day:02d}",
+        "completed": data.completed_today,
+        "in_progress": data.in_progress,
+        "todo": data.todo,
+    }
+    mask = 0
 
-    lines = [
-        f"<b>\U0001f4ca \u0414\u0430\u0439\u0434\u0436\u0435\u0441\u0442 \u0437\u0430 \u0434\u0435\u043d\u044c \u2014 {date_str}</b>",
-        "",
-    ]
-
-    # Progress bar for completed vs total
     if total_tasks > 0:
-        bar = format_progress_bar(data.completed_today, total_tasks, width=12)
-        lines.append(f"<b>\u041f\u0440\u043e\u0433\u0440\u0435\u0441\u0441:</b> {bar}")
-        lines.append("")
-
-    # Task breakdown
-    lines.append("<b>\u0417\u0430\u0434\u0430\u0447\u0438:</b>")
-    lines.append(f"  \u2705 \u0417\u0430\u0432\u0435\u0440\u0448\u0435\u043d\u043e: {data.completed_today}")
-    lines.append(f"  \U0001f504 \u0412 \u0440\u0430\u0431\u043e\u0442\u0435: {data.in_progress}")
-    lines.append(f"  \U0001f4cb \u041a \u0432\u044b\u043f\u043e\u043b\u043d\u0435\u043d\u0438\u044e: {data.todo}")
+        mask |= _DIGEST_PROGRESS
+        subs["bar"] = format_progress_bar(data.completed_today, total_tasks, width=12)
     if data.blocked > 0:
-        lines.append(f"  \u26a0\ufe0f \u0417\u0430\u0431\u043b\u043e\u043a\u0438\u0440\u043e\u0432\u0430\u043d\u043e: {data.blocked}")
-    lines.append("")
-
-    # Session stats
+        mask |= _DIGEST_BLOCKED
+        subs["blocked"] = data.blocked
     if data.sessions_count > 0:
+        mask |= _DIGEST_SESSIONS
         hours = data.total_duration_minutes // 60
         minutes = data.total_duration_minutes % 60
-        duration_str = f"{hours}\u0447 {minutes}\u043c" if hours > 0 else f"{minutes}\u043c"
-
-        lines.append("<b>\u0421\u0435\u0441\u0441\u0438\u0438:</b>")
-        lines.append(f"  \u23f1\ufe0f \u041a\u043e\u043b\u0438\u0447\u0435\u0441\u0442\u0432\u043e: {data.sessions_count}")
-        lines.append(f"  \u23f0 \u0414\u043b\u0438\u0442\u0435\u043b\u044c\u043d\u043e\u0441\u0442\u044c: {duration_str}")
-        lines.append("")
-
-    # Git stats
+        subs["sessions"] = data.sessions_count
+        subs["duration"] = f"{hours}\u0447 {minutes}\u043c" if hours > 0 else f"{minutes}\u043c"
     if data.commits_today > 0:
-        lines.append("<b>Git:</b>")
-        lines.append(f"  \U0001f4dd \u041a\u043e\u043c\u043c\u0438\u0442\u043e\u0432: {data.commits_today}")
-        lines.append(f"  \U0001f4c1 \u0424\u0430\u0439\u043b\u043e\u0432: {data.files_changed}")
-        lines.append(f"  <code>+{data.lines_added} / -{data.lines_removed}</code>")
-        lines.append("")
-
-    # Cost stats (if available)
+        mask |= _DIGEST_GIT
+        subs["commits"] = data.commits_today
+        subs["files"] = data.files_changed
+        subs["added"] = data.lines_added
+        subs["removed"] = data.lines_removed
     if data.tokens_used > 0:
-        lines.append("<b>\u0418\u0441\u043f\u043e\u043b\u044c\u0437\u043e\u0432\u0430\u043d\u0438\u0435:</b>")
-        lines.append(f"  \U0001f3ab \u0422\u043e\u043a\u0435\u043d\u043e\u0432: {data.tokens_used:,}")
+        mask |= _DIGEST_USAGE
+        subs["tokens"] = _fmt_thousands(data.tokens_used)
         if data.estimated_cost_usd > 0:
-            lines.append(f"  \U0001f4b5 \u0421\u0442\u043e\u0438\u043c\u043e\u0441\u0442\u044c: ${data.estimated_cost_usd:.2f}")
-        lines.append("")
-
-    # Highlights
+            mask |= _DIGEST_COST
+            subs["cost"] = data.estimated_cost_usd
     if data.highlights:
-        lines.append("<b>\u0418\u0442\u043e\u0433\u0438:</b>")
-        for highlight in data.highlights[:5]:  # Limit to 5
-            lines.append(f"  \u2022 {highlight}")
-        lines.append("")
+        mask |= _DIGEST_HIGHLIGHTS
+        subs["highlights"] = "".join(
+            f"  \u2022 {highlight}\n" for highlight in data.highlights[:5]  # Limit to 5
+        )
 
-    return "\n".join(lines)
+    return _DIGEST_TEMPLATES[mask] % subs
 
 
 def format_daily_digest_simple(
@@ -244,7 +356,7 @@ def format_daily_digest_simple(
 # =============================================================================
 
 
-@dataclass
+@dataclass(slots=True)
 class SessionSummaryData:
     """Data for session summary report."""
 
@@ -288,21 +400,20 @@ def format_session_summary(data: SessionSummaryData) -> str:
     Returns:
         HTML-formatted Telegram message
     """
-    # Status emoji
-    status_emoji = {
-        "completed": "\u2705",
-        "error": "\u274c",
-        "partial": "\u26a0\ufe0f",
-    }.get(data.status, "\u2139\ufe0f")
-
-    lines = [
-        f"<b>\U0001f4cb \u0418\u0442\u043e\u0433\u0438 \u0441\u0435\u0441\u0441\u0438\u0438</b>",
-        "",
-        f"<b>\u0417\u0430\u0434\u0430\u0447\u0430:</b> {data.issue_id}",
-        f"<b>\u0417\u0430\u0433\u043e\u043b\u043e\u0432\u043e\u043a:</b> {data.issue_title[:50]}{'...' if len(data.issue_title) > 50 else ''}",
-        f"<b>\u0421\u0442\u0430\u0442\u0443\u0441:</b> {status_emoji} {data.status.title()}",
-        "",
-    ]
+    status_emoji = _STATUS_EMOJI.get(data.status, "\u2139\ufe0f")
+    # Fall back to title() only for statuses outside the known set
+    status_label = _STATUS_LABEL.get(data.status) or data.status.title()
+
+    buf = io.StringIO()
+    w = buf.write
+    w(
+        f"<b>\U0001f4cb \u0418\u0442\u043e\u0433\u0438 \u0441\u0435\u0441\u0441\u0438\u0438</b>\n"
+        "\n"
+        f"<b>\u0417\u0430\u0434\u0430\u0447\u0430:</b> {data.issue_id}\n"
+        f"<b>\u0417\u0430\u0433\u043e\u043b\u043e\u0432\u043e\u043a:</b> {_truncate(data.issue_title, 50)}\n"
+        f"<b>\u0421\u0442\u0430\u0442\u0443\u0441:</b> {status_emoji} {status_label}\n"
+        "\n"
+    )
 
     # Timing
     if data.duration_minutes > 0:
@@ -312,54 +423,55 @@ def format_session_summary(data: SessionSummaryData) -> str:
             duration_str = f"{hours}\u0447 {minutes}\u043c"
         else:
             duration_str = f"{minutes}\u043c"
-        lines.append(f"<b>\u0414\u043b\u0438\u0442\u0435\u043b\u044c\u043d\u043e\u0441\u0442\u044c:</b> \u23f1\ufe0f {duration_str}")
+        w(f"<b>\u0414\u043b\u0438\u0442\u0435\u043b\u044c\u043d\u043e\u0441\u0442\u044c:</b> \u23f1\ufe0f {duration_str}\n")
 
     # Tokens
     if data.total_tokens > 0:
-        lines.append(f"<b>\u0422\u043e\u043a\u0435\u043d\u043e\u0432:</b> \U0001f3ab {data.total_tokens:,}")
+        w(f"<b>\u0422\u043e\u043a\u0435\u043d\u043e\u0432:</b> \U0001f3ab {_fmt_thousands(data.total_tokens)}\n")
         if data.input_tokens > 0 and data.output_tokens > 0:
-            lines.append(f"  <code>\u2193{data.input_tokens:,} \u2191{data.output_tokens:,}</code>")
+            w(f"  <code>\u2193{_fmt_thousands(data.input_tokens)} \u2191{_fmt_thousands(data.output_tokens)}</code>\n")
 
     # Cost
     if data.estimated_cost_usd > 0:
-        lines.append(f"<b>\u0421\u0442\u043e\u0438\u043c\u043e\u0441\u0442\u044c:</b> \U0001f4b5 ${data.estimated_cost_usd:.4f}")
+        w(f"<b>\u0421\u0442\u043e\u0438\u043c\u043e\u0441\u0442\u044c:</b> \U0001f4b5 ${data.estimated_cost_usd:.4f}\n")
 
-    lines.append("")
+    w("\n")
 
     # Git commits
     if data.commits:
-        lines.append("<b>\u041a\u043e\u043c\u043c\u0438\u0442\u044b:</b>")
+        w("<b>\u041a\u043e\u043c\u043c\u0438\u0442\u044b:</b>\n")
         for commit in data.commits[:5]:
-            # Truncate long commit messages
-            msg = commit[:60] + "..." if len(commit) > 60 else commit
-            lines.append(f"  <code>\u2022</code> {msg}")
+            w(f"  <code>\u2022</code> {_truncate(commit, 60)}\n")
         if len(data.commits) > 5:
-            lines.append(f"  <i>...\u0438 \u0435\u0449\u0451 {len(data.commits) - 5}</i>")
-        lines.append("")
+            w(f"  <i>...\u0438 \u0435\u0449\u0451 {len(data.commits) - 5}</i>\n")
+        w("\n")
 
     # Files changed
     if data.files_changed:
-        lines.append(f"<b>\u0418\u0437\u043c\u0435\u043d\u0435\u043d\u043e \u0444\u0430\u0439\u043b\u043e\u0432:</b> {len(data.files_changed)}")
+        w(f"<b>\u0418\u0437\u043c\u0435\u043d\u0435\u043d\u043e \u0444\u0430\u0439\u043b\u043e\u0432:</b> {len(data.files_changed)}\n")
         for file in data.files_changed[:5]:
-            lines.append(f"  <code>\u2022</code> {file}")
+            w(f"  <code>\u2022</code> {file}\n")
         if len(data.files_changed) > 5:
-            lines.append(f"  <i>...\u0438 \u0435\u0449\u0451 {len(data.files_changed) - 5}</i>")
-        lines.append("")
+            w(f"  <i>...\u0438 \u0435\u0449\u0451 {len(data.files_changed) - 5}</i>\n")
+        w("\n")
 
     # Error message
     if data.status == "error" and data.error_message:
-        lines.append(f"<b>\u041e\u0448\u0438\u0431\u043a\u0430:</b>")
-        lines.append(f"<code>{data.error_message[:200]}</code>")
-        lines.append("")
+        w(
+            f"<b>\u041e\u0448\u0438\u0431\u043a\u0430:</b>\n"
+            f"<code>{data.error_message[:200]}</code>\n"
+            "\n"
+        )
 
     # Next steps
     if data.next_steps:
-        lines.append("<b>\u0421\u043b\u0435\u0434\u0443\u044e\u0449\u0438\u0435 \u0448\u0430\u0433\u0438:</b>")
+        w("<b>\u0421\u043b\u0435\u0434\u0443\u044e\u0449\u0438\u0435 \u0448\u0430\u0433\u0438:</b>\n")
         for step in data.next_steps[:3]:
-            lines.append(f"  \u2192 {step}")
-        lines.append("")
+            w(f"  \u2192 {step}\n")
+        w("\n")
 
-    return "\n".join(lines)
+    # Every write ends with a newline; join() put none after the last line
+    return buf.getvalue()[:-1]
 
 
 def format_session_summary_simple(
@@ -403,7 +515,7 @@ def format_session_summary_simple(
 # =============================================================================
 
 
-@dataclass
+@dataclass(slots=True)
 class ErrorAlertData:
     """Data for error alert report."""
 
@@ -428,94 +540,104 @@ class ErrorAlertData:
     # Stack trace (optional, truncated)
     stack_trace: str = ""
 
-    # Timestamp
-    timestamp: datetime = field(default_factory=datetime.now)
+    # Timestamp (None: the time the alert is formatted)
+    timestamp: datetime | None = None
 
 
-def format_error_alert(data: ErrorAlertData) -> str:
+def format_error_alert(data: ErrorAlertData, now: datetime | None = None) -> str:
     """
     Format an error alert report.
 
     Args:
         data: ErrorAlertData with error info
+        now: Current time to use when ``data.timestamp`` is unset
 
     Returns:
         HTML-formatted Telegram message
     """
-    # Error type emoji
-    type_emoji = {
-        "syntax": "\U0001f534",
-        "runtime": "\U0001f4a5",
-        "test": "\U0001f9ea",
-        "mcp": "\U0001f50c",
-        "network": "\U0001f310",
-        "git": "\U0001f4e6",
-        "timeout": "\u23f0",
-    }.get(data.error_type, "\u274c")
-
-    lines = [
-        f"<b>{type_emoji} \u041e\u043f\u043e\u0432\u0435\u0449\u0435\u043d\u0438\u0435 \u043e\u0431 \u043e\u0448\u0438\u0431\u043a\u0435</b>",
-        "",
-        f"<b>\u0422\u0438\u043f:</b> {data.error_type.upper()}",
-    ]
+    type_emoji = _ERR_TYPE_EMOJI.get(data.error_type, "\u274c")
+
+    buf = io.StringIO()
+    w = buf.write
+    w(
+        f"<b>{type_emoji} \u041e\u043f\u043e\u0432\u0435\u0449\u0435\u043d\u0438\u0435 \u043e\u0431 \u043e\u0448\u0438\u0431\u043a\u0435</b>\n"
+        "\n"
+        f"<b>\u0422\u0438\u043f:</b> {data.error_type.upper()}\n"
+    )
 
     # Issue context
     if data.issue_id:
-        lines.append(f"<b>\u0417\u0430\u0434\u0430\u0447\u0430:</b> {data.issue_id}")
+        w(f"<b>\u0417\u0430\u0434\u0430\u0447\u0430:</b> {data.issue_id}\n")
 
     if data.phase:
-        lines.append(f"<b>\u0424\u0430\u0437\u0430:</b> {data.phase}")
+        w(f"<b>\u0424\u0430\u0437\u0430:</b> {data.phase}\n")
 
-    lines.append("")
+    w("\n")
 
     # Location
     if data.file_path:
-        lines.append("<b>\u0420\u0430\u0441\u043f\u043e\u043b\u043e\u0436\u0435\u043d\u0438\u0435:</b>")
-        lines.append(f"  \U0001f4c1 <code>{data.file_path}</code>")
+        w(
+            "<b>\u0420\u0430\u0441\u043f\u043e\u043b\u043e\u0436\u0435\u043d\u0438\u0435:</b>\n"
+            f"  \U0001f4c1 <code>{data.file_path}</code>\n"
+        )
         if data.line_number > 0:
-            lines.append(f"  \U0001f4cd \u0421\u0442\u0440\u043e\u043a\u0430 {data.line_number}")
+            w(f"  \U0001f4cd \u0421\u0442\u0440\u043e\u043a\u0430 {data.line_number}\n")
         if data.function_name:
-            lines.append(f"  \U0001f527 <code>{data.function_name}()</code>")
-        lines.append("")
+            w(f"  \U0001f527 <code>{data.function_name}()</code>\n")
+        w("\n")
 
     # Error message
-    lines.append("<b>\u041e\u0448\u0438\u0431\u043a\u0430:</b>")
-    # Escape HTML entities in error message
-    escaped_msg = (
-        data.error_message
-        .replace("&", "&amp;")
-        .replace("<", "&lt;")
-        .replace(">", "&gt;")
-    )[:300]
-    lines.append(f"<code>{escaped_msg}</code>")
-    lines.append("")
+    # Escape HTML entities in error message. Every character escapes to at
+    # least one, so only the first 300 raw characters can reach the output.
+    escaped_msg = data.error_message[:300].translate(_HTML_ESCAPE_TABLE_NOQUOTE)[:300]
+    w(
+        "<b>\u041e\u0448\u0438\u0431\u043a\u0430:</b>\n"
+        f"<code>{escaped_msg}</code>\n"
+        "\n"
+    )
 
     # Retry info
     if data.attempt_count > 1 or data.will_retry:
-        lines.append("<b>\u0421\u0442\u0430\u0442\u0443\u0441 \u043f\u043e\u0432\u0442\u043e\u0440\u0430:</b>")
-        lines.append(f"  \U0001f504 \u041f\u043e\u043f\u044b\u0442\u043a\u0430: {data.attempt_count}/{data.max_attempts}")
+        w(
+            "<b>\u0421\u0442\u0430\u0442\u0443\u0441 \u043f\u043e\u0432\u0442\u043e\u0440\u0430:</b>\n"
+            f"  \U0001f504 \u041f\u043e\u043f\u044b\u0442\u043a\u0430: {data.attempt_count}/{data.max_attempts}\n"
+        )
         if data.will_retry:
-            lines.append(f"  \u23f3 \u0411\u0443\u0434\u0435\u0442 \u043f\u043e\u0432\u0442\u043e\u0440 \u0430\u0432\u0442\u043e\u043c\u0430\u0442\u0438\u0447\u0435\u0441\u043a\u0438")
+            w(f"  \u23f3 \u0411\u0443\u0434\u0435\u0442 \u043f\u043e\u0432\u0442\u043e\u0440 \u0430\u0432\u0442\u043e\u043c\u0430\u0442\u0438\u0447\u0435\u0441\u043a\u0438\n")
         else:
-            lines.append(f"  \u26d4 \u0414\u043e\u0441\u0442\u0438\u0433\u043d\u0443\u0442 \u043b\u0438\u043c\u0438\u0442 \u043f\u043e\u043f\u044b\u0442\u043e\u043a")
-        lines.append("")
+            w(f"  \u26d4 \u0414\u043e\u0441\u0442\u0438\u0433\u043d\u0443\u0442 \u043b\u0438\u043c\u0438\u0442 \u043f\u043e\u043f\u044b\u0442\u043e\u043a\n")
+        w("\n")
 
     # Stack trace (truncated)
     if data.stack_trace:
-        lines.append("<b>\u0422\u0440\u0430\u0441\u0441\u0438\u0440\u043e\u0432\u043a\u0430:</b>")
-        trace_lines = data.stack_trace.split("\n")[:5]
-        for line in trace_lines:
-            escaped = line.replace("<", "&lt;").replace(">", "&gt;")[:80]
-            lines.append(f"<code>{escaped}</code>")
-        if len(data.stack_trace.split("\n")) > 5:
-            lines.append("<i>...\u043e\u0431\u0440\u0435\u0437\u0430\u043d\u043e</i>")
-        lines.append("")
+        w("<b>\u0422\u0440\u0430\u0441\u0441\u0438\u0440\u043e\u0432\u043a\u0430:</b>\n")
+        # Walk the first five lines in place (trailing newlines ignored) and
+        # escape at most 80 characters of each, however long the trace is
+        trace = data.stack_trace
+        end = len(trace)
+        while end and trace[end - 1] == "\n":
+            end -= 1
+        pos = 0
+        for _ in range(5):
+            eol = trace.find("\n", pos, end)
+            if eol == -1:
+                eol = end
+            escaped = trace[pos:min(eol, pos + 80)].translate(_HTML_ESCAPE_TABLE_NOQUOTE)[:80]
+            w(f"<code>{escaped}</code>\n")
+            pos = eol + 1
+            if pos > end:
+                break
+        if pos <= end:
+            w("<i>...\u043e\u0431\u0440\u0435\u0437\u0430\u043d\u043e</i>\n")
+        w("\n")
 
     # Timestamp
-    time_str = data.timestamp.strftime("%H:%M:%S")
-    lines.append(f"<i>\U0001f550 {time_str}</i>")
+    ts = data.timestamp or now or datetime.now()
+    time_str = f"{ts.hour:02d}:{ts.minute:02d}:{ts.second:02d}"
+    w(f"<i>\U0001f550 {time_str}</i>\n")
 
-    return "\n".join(lines)
+    # Every write ends with a newline; join() put none after the last line
+    return buf.getvalue()[:-1]
 
 
 def format_error_alert_simple(
@@ -559,13 +681,13 @@ def format_error_alert_simple(
 # =============================================================================
 
 
-@dataclass
+@dataclass(slots=True)
 class WeeklySummaryData:
     """Data for weekly summary report."""
 
-    # Week identification
-    week_start: datetime = field(default_factory=lambda: datetime.now() - timedelta(days=7))
-    week_end: datetime = field(default_factory=datetime.now)
+    # Week identification (None: a week ending when the summary is formatted)
+    week_start: datetime | None = None
+    week_end: datetime | None = None
 
     # Task metrics
     tasks_completed: int = 0
@@ -595,97 +717,114 @@ class WeeklySummaryData:
     total_lines_removed: int = 0
 
     # Daily breakdown
-    daily_completions: list[int] = field(default_factory=lambda: [0] * 7)
+    daily_completions: Sequence[int] = (0,) * 7  # Mon..Sun; shared immutable default
 
     # Top contributors (issues)
     top_issues: list[tuple[str, str]] = field(default_factory=list)  # (id, title)
 
 
-def format_weekly_summary(data: WeeklySummaryData) -> str:
+def format_weekly_summary(data: WeeklySummaryData, now: datetime | None = None) -> str:
     """
     Format a weekly summary report.
 
     Args:
         data: WeeklySummaryData with weekly stats
+        now: Current time to use when ``data.week_end`` is unset
 
     Returns:
         HTML-formatted Telegram message
     """
-    week_str = f"{data.week_start.strftime('%b %d')} - {data.week_end.strftime('%b %d, %Y')}"
+    end = data.week_end or now or datetime.now()
+    start = data.week_start or end - timedelta(days=7)
+    week_str = (
+        f"{_MONTH_ABBR[start.month]} {start.day:02d} - "
+        f"{_MONTH_ABBR[end.month]} {end.day:02d}, {end.year:04d}"
+    )
 
-    lines = [
-        f"<b>\U0001f4c5 \u041d\u0435\u0434\u0435\u043b\u044c\u043d\u044b\u0439 \u043e\u0442\u0447\u0451\u0442</b>",
-        f"<i>{week_str}</i>",
-        "",
-    ]
+    buf = io.StringIO()
+    w = buf.write
+    w(
+        f"<b>\U0001f4c5 \u041d\u0435\u0434\u0435\u043b\u044c\u043d\u044b\u0439 \u043e\u0442\u0447\u0451\u0442</b>\n"
+        f"<i>{week_str}</i>\n"
+        "\n"
+    )
 
     # Task metrics
-    lines.append("<b>\U0001f4ca \u0417\u0430\u0434\u0430\u0447\u0438:</b>")
-    lines.append(f"  \u2705 \u0417\u0430\u0432\u0435\u0440\u0448\u0435\u043d\u043e: {data.tasks_completed}")
-    lines.append(f"  \u2795 \u0421\u043e\u0437\u0434\u0430\u043d\u043e: {data.tasks_created}")
+    w(
+        "<b>\U0001f4ca \u0417\u0430\u0434\u0430\u0447\u0438:</b>\n"
+        f"  \u2705 \u0417\u0430\u0432\u0435\u0440\u0448\u0435\u043d\u043e: {data.tasks_completed}\n"
+        f"  \u2795 \u0421\u043e\u0437\u0434\u0430\u043d\u043e: {data.tasks_created}\n"
+    )
     if data.average_completion_hours > 0:
-        lines.append(f"  \u23f1\ufe0f \u0421\u0440\u0435\u0434\u043d\u0435\u0435 \u0432\u0440\u0435\u043c\u044f: {data.average_completion_hours:.1f}\u0447")
-    lines.append("")
+        w(f"  \u23f1\ufe0f \u0421\u0440\u0435\u0434\u043d\u0435\u0435 \u0432\u0440\u0435\u043c\u044f: {data.average_completion_hours:.1f}\u0447\n")
+    w("\n")
 
     # Velocity trend
     if data.velocity_current_week > 0:
-        lines.append("<b>\U0001f4c8 \u0421\u043a\u043e\u0440\u043e\u0441\u0442\u044c:</b>")
-        lines.append(f"  \u0422\u0435\u043a\u0443\u0449\u0430\u044f: {data.velocity_current_week:.1f} \u0437\u0430\u0434\u0430\u0447/\u0434\u0435\u043d\u044c")
+        w(
+            "<b>\U0001f4c8 \u0421\u043a\u043e\u0440\u043e\u0441\u0442\u044c:</b>\n"
+            f"  \u0422\u0435\u043a\u0443\u0449\u0430\u044f: {data.velocity_current_week:.1f} \u0437\u0430\u0434\u0430\u0447/\u0434\u0435\u043d\u044c\n"
+        )
         if data.velocity_previous_week > 0:
             trend_emoji = "\U0001f4c8" if data.velocity_change_percent >= 0 else "\U0001f4c9"
             sign = "+" if data.velocity_change_percent >= 0 else ""
-            lines.append(f"  {trend_emoji} {sign}{data.velocity_change_percent:.0f}% \u043a \u043f\u0440\u043e\u0448\u043b\u043e\u0439 \u043d\u0435\u0434\u0435\u043b\u0435")
-        lines.append("")
+            w(f"  {trend_emoji} {sign}{data.velocity_change_percent:.0f}% \u043a \u043f\u0440\u043e\u0448\u043b\u043e\u0439 \u043d\u0435\u0434\u0435\u043b\u0435\n")
+        w("\n")
 
     # Daily sparkline
-    if any(d > 0 for d in data.daily_completions):
-        max_val = max(data.daily_completions) or 1
-        sparkline = ""
-        for val in data.daily_completions:
-            # Use block characters for sparkline
-            level = int((val / max_val) * 8) if max_val > 0 else 0
-            blocks = "\u2581\u2582\u2583\u2584\u2585\u2586\u2587\u2588"
-            sparkline += blocks[min(level, 7)]
-        lines.append(f"<b>\u041f\u043e \u0434\u043d\u044f\u043c:</b> <code>{sparkline}</code>")
-        lines.append(f"<i>       \u041f\u043d\u2192\u0412\u0441</i>")
-        lines.append("")
+    max_val = max(data.daily_completions, default=0)
+    if max_val > 0:
+        sparkline = "".join(
+            _SPARK_BLOCKS[min(val * 8 // max_val, 7)] for val in data.daily_completions
+        )
+        w(
+            f"<b>\u041f\u043e \u0434\u043d\u044f\u043c:</b> <code>{sparkline}</code>\n"
+            f"<i>       \u041f\u043d\u2192\u0412\u0441</i>\n"
+            "\n"
+        )
 
     # Cost metrics
     if data.total_cost_usd > 0:
-        lines.append("<b>\U0001f4b0 \u0421\u0442\u043e\u0438\u043c\u043e\u0441\u0442\u044c:</b>")
-        lines.append(f"  \u042d\u0442\u0430 \u043d\u0435\u0434\u0435\u043b\u044f: ${data.total_cost_usd:.2f}")
-        lines.append(f"  \u0422\u043e\u043a\u0435\u043d\u043e\u0432: {data.total_tokens:,}")
+        w(
+            "<b>\U0001f4b0 \u0421\u0442\u043e\u0438\u043c\u043e\u0441\u0442\u044c:</b>\n"
+            f"  \u042d\u0442\u0430 \u043d\u0435\u0434\u0435\u043b\u044f: ${data.total_cost_usd:.2f}\n"
+            f"  \u0422\u043e\u043a\u0435\u043d\u043e\u0432: {_fmt_thousands(data.total_tokens)}\n"
+        )
         if data.cost_previous_week > 0:
             trend_emoji = "\U0001f4c8" if data.cost_change_percent > 0 else "\U0001f4c9"
             sign = "+" if data.cost_change_percent >= 0 else ""
-            lines.append(f"  {trend_emoji} {sign}{data.cost_change_percent:.0f}% \u043a \u043f\u0440\u043e\u0448\u043b\u043e\u0439 \u043d\u0435\u0434\u0435\u043b\u0435")
-        lines.append("")
+            w(f"  {trend_emoji} {sign}{data.cost_change_percent:.0f}% \u043a \u043f\u0440\u043e\u0448\u043b\u043e\u0439 \u043d\u0435\u0434\u0435\u043b\u0435\n")
+        w("\n")
 
     # Session metrics
     if data.total_sessions > 0:
-        lines.append("<b>\U0001f504 \u0421\u0435\u0441\u0441\u0438\u0438:</b>")
-        lines.append(f"  \u041a\u043e\u043b\u0438\u0447\u0435\u0441\u0442\u0432\u043e: {data.total_sessions}")
-        lines.append(f"  \u041e\u0431\u0449\u0435\u0435 \u0432\u0440\u0435\u043c\u044f: {data.total_duration_hours:.1f}\u0447")
-        lines.append(f"  \u0421\u0440\u0435\u0434\u043d\u044f\u044f \u0441\u0435\u0441\u0441\u0438\u044f: {data.average_session_minutes:.0f}\u043c")
-        lines.append("")
+        w(
+            "<b>\U0001f504 \u0421\u0435\u0441\u0441\u0438\u0438:</b>\n"
+            f"  \u041a\u043e\u043b\u0438\u0447\u0435\u0441\u0442\u0432\u043e: {data.total_sessions}\n"
+            f"  \u041e\u0431\u0449\u0435\u0435 \u0432\u0440\u0435\u043c\u044f: {data.total_duration_hours:.1f}\u0447\n"
+            f"  \u0421\u0440\u0435\u0434\u043d\u044f\u044f \u0441\u0435\u0441\u0441\u0438\u044f: {data.average_session_minutes:.0f}\u043c\n"
+            "\n"
+        )
 
     # Git metrics
     if data.total_commits > 0:
-        lines.append("<b>\U0001f4dd Git:</b>")
-        lines.append(f"  \u041a\u043e\u043c\u043c\u0438\u0442\u043e\u0432: {data.total_commits}")
-        lines.append(f"  \u0424\u0430\u0439\u043b\u043e\u0432: {data.total_files_changed}")
-        lines.append(f"  <code>+{data.total_lines_added:,} / -{data.total_lines_removed:,}</code>")
-        lines.append("")
+        w(
+            "<b>\U0001f4dd Git:</b>\n"
+            f"  \u041a\u043e\u043c\u043c\u0438\u0442\u043e\u0432: {data.total_commits}\n"
+            f"  \u0424\u0430\u0439\u043b\u043e\u0432: {data.total_files_changed}\n"
+            f"  <code>+{data.total_lines_added:,} / -{data.total_lines_removed:,}</code>\n"
+            "\n"
+        )
 
     # Top issues
     if data.top_issues:
-        lines.append("<b>\U0001f3c6 \u0422\u043e\u043f \u0437\u0430\u0434\u0430\u0447:</b>")
+        w("<b>\U0001f3c6 \u0422\u043e\u043f \u0437\u0430\u0434\u0430\u0447:</b>\n")
         for issue_id, title in data.top_issues[:3]:
-            title_short = title[:40] + "..." if len(title) > 40 else title
-            lines.append(f"  \u2022 <b>{issue_id}</b>: {title_short}")
-        lines.append("")
+            w(f"  \u2022 <b>{issue_id}</b>: {_truncate(title, 40)}\n")
+        w("\n")
 
-    return "\n".join(lines)
+    # Every write ends with a newline; join() put none after the last line
+    return buf.getvalue()[:-1]
 
 
 def format_weekly_summary_simple(
@@ -781,6 +920,37 @@ def format_all_tasks_complete() -> str:
 # =============================================================================
 
 
+def _truncate(text: str, limit: int) -> str:
+    """Cut text to ``limit`` characters, marking the cut with an ellipsis.
+
+    Short strings are returned as is, without slicing.
+
+    Args:
+        text: Text to shorten.
+        limit: Maximum number of characters kept before the ellipsis.
+
+    Returns:
+        ``text`` itself or its first ``limit`` characters followed by ``...``.
+    """
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
+@functools.lru_cache(maxsize=256)
+def _fmt_thousands(n: int) -> str:
+    """Format a token count with comma thousands separators.
+
+    Token totals repeat across digests and summaries, so the most recent
+    values are served from a small cache.
+
+    Args:
+        n: Integer to format.
+
+    Returns:
+        String like ``1,234,567``.
+    """
+    return f"{n:,}"
+
+
 def escape_html(text: str) -> str:
     """Escape HTML special characters to prevent XSS in Telegram messages.
 
@@ -790,13 +960,7 @@ def escape_html(text: str) -> str:
     Returns:
         Text with ``&``, ``<``, ``>``, and ``"`` replaced by HTML entities.
     """
-    return (
-        text
-        .replace("&", "&amp;")
-        .replace("<", "&lt;")
-        .replace(">", "&gt;")
-        .replace('"', "&quot;")
-    )
+    return text.translate(_HTML_ESCAPE_TABLE)
 
 
 def truncate_message(message: str, max_length: int = 4096) -> str:
@@ -822,14 +986,109 @@ def truncate_message(message: str, max_length: int = 4096) -> str:
     return truncated + "\n\n<i>...message truncated</i>"
 
 
+def chunk_message(message: str, max_length: int = 4096) -> list[str]:
+    """
+    Split a report into Telegram-sized messages at paragraph boundaries.
+
+    Each report should reach Telegram as whole messages: send every chunk
+    with one sendMessage call instead of streaming the report line by line.
+    Chunks break at the last blank line before the limit, then at the last
+    newline, and only mid-line when a single line is longer than the limit.
+
+    Args:
+        message: Report text to split
+        max_length: Maximum chunk length (Telegram limit is 4096)
+
+    Returns:
+        Non-empty chunks in order; ``[message]`` when it already fits
+    """
+    if len(message) <= max_length:
+        return [message]
+
+    chunks = []
+    start = 0
+    end = len(message)
+    while end - start > max_length:
+        limit = start + max_length
+        cut = message.rfind("\n\n", start, limit)
+        if cut <= start:
+            cut = message.rfind("\n", start, limit)
+        if cut <= start:
+            cut = limit
+        chunks.append(message[start:cut])
+        # The boundary newlines are not carried into the next chunk
+        start = cut
+        while start < end and message[start] == "\n":
+            start += 1
+    if start < end:
+        chunks.append(message[start:])
+    return chunks
+
+
 # =============================================================================
 # Status Command Report (ENG-51)
 # =============================================================================
 
 
-@dataclass
+# Fixed opening of every /status report: title, blank line, task header
+_STATUS_HEAD = "<b>\u0421\u0442\u0430\u0442\u0443\u0441</b>\n\n<b>\u0417\u0430\u0434\u0430\u0447\u0438:</b>"
+# Labels shared by more than one branch of format_status
+_STATUS_LBL_CURRENT = "<b>\u0422\u0435\u043a\u0443\u0449\u0430\u044f:</b>"
+_STATUS_LBL_DURATION = "  \u0414\u043b\u0438\u0442\u0435\u043b\u044c\u043d\u043e\u0441\u0442\u044c: "
+# Marker shown before the /status session state
+_SESSION_STATE_EMOJI = {
+    "idle": "",
+    "active": "",
+    "paused": "",
+}
+# /status session state labels, as str.title() would print them
+_SESSION_STATE_LABEL = {
+    "idle": "Idle",
+    "active": "Active",
+    "paused": "Paused",
+}
+
+# Optional /status sections, one bit each
+_STATUS_PROGRESS = 1 << 0
+_STATUS_CURRENT_TASK = 1 << 1
+_STATUS_CURRENT_COUNT = 1 << 2
+_STATUS_SESSION = 1 << 3
+_STATUS_DURATION = 1 << 4
+_STATUS_STALE = 1 << 5
+_STATUS_ALL_DONE = 1 << 6
+
+# /status sections in display order as (flags, %-template) pairs, with the
+# same flag rules as _DIGEST_SECTIONS
+_STATUS_SECTIONS: tuple[tuple[int, str], ...] = (
+    (
+        0,
+        (
+            _STATUS_HEAD + "\n"
+            "  \u041a \u0432\u044b\u043f\u043e\u043b\u043d\u0435\u043d\u0438\u044e: %(todo)s\n"
+            "  \u0412 \u0440\u0430\u0431\u043e\u0442\u0435: %(in_progress)s\n"
+            "  \u0417\u0430\u0432\u0435\u0440\u0448\u0435\u043d\u043e: %(done)s\n"
+            "\n"
+        ),
+    ),
+    (_STATUS_PROGRESS, "<b>\u041f\u0440\u043e\u0433\u0440\u0435\u0441\u0441:</b> %(bar)s\n\n"),
+    (_STATUS_CURRENT_TASK, _STATUS_LBL_CURRENT + "\n  <code>%(task_id)s</code> %(title)s\n\n"),
+    (_STATUS_CURRENT_COUNT, _STATUS_LBL_CURRENT + "\n  %(in_progress)s \u0437\u0430\u0434\u0430\u0447 \u0432 \u0440\u0430\u0431\u043e\u0442\u0435\n\n"),
+    (_STATUS_SESSION, "<b>\u0421\u0435\u0441\u0441\u0438\u044f:</b>\n  #%(session)s %(state_emoji)s %(state)s\n"),
+    (_STATUS_SESSION | _STATUS_DURATION, _STATUS_LBL_DURATION + "%(duration)s\n"),
+    (_STATUS_SESSION, "\n"),
+    (_STATUS_STALE, "<b>\u041f\u0440\u0435\u0434\u0443\u043f\u0440\u0435\u0436\u0434\u0435\u043d\u0438\u0435:</b> %(stale)s \u0443\u0441\u0442\u0430\u0440\u0435\u0432\u0448\u0438\u0445 \u0437\u0430\u0434\u0430\u0447\n\n"),
+    (_STATUS_ALL_DONE, "\u0412\u0441\u0435 \u0437\u0430\u0434\u0430\u0447\u0438 \u0432\u044b\u043f\u043e\u043b\u043d\u0435\u043d\u044b!\n"),
+)
+
+# One branch-free template per combination of optional sections
+_STATUS_TEMPLATES = tuple(
+    _build_report_template(_STATUS_SECTIONS, mask) for mask in range(_STATUS_ALL_DONE << 1)
+)
+
+
+@dataclass(frozen=True, slots=True)
 class StatusData:
-    """Data for /status command response."""
+    """Data for /status command response (immutable, so reports can be cached)."""
 
     # Task counts by state
     todo_count: int = 0
@@ -876,68 +1135,72 @@ def format_status(data: StatusData) -> str:
           #8  Active
           Duration: 45m
     """
-    lines = [
-        "<b>\u0421\u0442\u0430\u0442\u0443\u0441</b>",
-        "",
-    ]
-
-    # Task counts
-    lines.append("<b>\u0417\u0430\u0434\u0430\u0447\u0438:</b>")
-    lines.append(f"  \u041a \u0432\u044b\u043f\u043e\u043b\u043d\u0435\u043d\u0438\u044e: {data.todo_count}")
-    lines.append(f"  \u0412 \u0440\u0430\u0431\u043e\u0442\u0435: {data.in_progress_count}")
-    lines.append(f"  \u0417\u0430\u0432\u0435\u0440\u0448\u0435\u043d\u043e: {data.done_count}")
-    lines.append("")
-
-    # Progress bar
-    if data.total_tasks > 0:
-        bar = format_progress_bar(data.done_count, data.total_tasks, width=10)
-        lines.append(f"<b>\u041f\u0440\u043e\u0433\u0440\u0435\u0441\u0441:</b> {bar}")
-        lines.append("")
+    return _format_status_cached(
+        data.todo_count,
+        data.in_progress_count,
+        data.done_count,
+        data.current_task_id,
+        data.current_task_title,
+        data.session_number,
+        data.session_status,
+        data.elapsed_minutes,
+        data.total_tasks,
+        data.stale_count,
+    )
 
-    # Current task
-    if data.current_task_id:
-        lines.append("<b>\u0422\u0435\u043a\u0443\u0449\u0430\u044f:</b>")
-        title_display = data.current_task_title[:40]
-        if len(data.current_task_title) > 40:
-            title_display += "..."
-        lines.append(f"  <code>{data.current_task_id}</code> {title_display}")
-        lines.append("")
-    elif data.in_progress_count > 0:
-        lines.append("<b>\u0422\u0435\u043a\u0443\u0449\u0430\u044f:</b>")
-        lines.append(f"  {data.in_progress_count} \u0437\u0430\u0434\u0430\u0447 \u0432 \u0440\u0430\u0431\u043e\u0442\u0435")
-        lines.append("")
 
-    # Session info
-    if data.session_number > 0 or data.session_status != "idle":
-        lines.append("<b>\u0421\u0435\u0441\u0441\u0438\u044f:</b>")
-
-        status_emoji = {
-            "idle": "",
-            "active": "",
-            "paused": "",
-        }.get(data.session_status, "")
-
-        lines.append(f"  #{data.session_number} {status_emoji} {data.session_status.title()}")
-
-        if data.elapsed_minutes > 0:
-            hours = data.elapsed_minutes // 60
-            mins = data.elapsed_minutes % 60
-            if hours > 0:
-                lines.append(f"  \u0414\u043b\u0438\u0442\u0435\u043b\u044c\u043d\u043e\u0441\u0442\u044c: {hours}\u0447 {mins}\u043c")
-            else:
-                lines.append(f"  \u0414\u043b\u0438\u0442\u0435\u043b\u044c\u043d\u043e\u0441\u0442\u044c: {mins}\u043c")
-        lines.append("")
-
-    # Stale tasks warning
-    if data.stale_count > 0:
-        lines.append(f"<b>\u041f\u0440\u0435\u0434\u0443\u043f\u0440\u0435\u0436\u0434\u0435\u043d\u0438\u0435:</b> {data.stale_count} \u0443\u0441\u0442\u0430\u0440\u0435\u0432\u0448\u0438\u0445 \u0437\u0430\u0434\u0430\u0447")
-        lines.append("")
+@functools.lru_cache(maxsize=128)
+def _format_status_cached(
+    todo_count: int,
+    in_progress_count: int,
+    done_count: int,
+    current_task_id: str,
+    current_task_title: str,
+    session_number: int,
+    session_status: str,
+    elapsed_minutes: int,
+    total_tasks: int,
+    stale_count: int,
+) -> str:
+    """Render the /status report as one %-format of its section template.
 
-    # All tasks done celebration
-    if data.todo_count == 0 and data.in_progress_count == 0 and data.done_count > 0:
-        lines.append("\u0412\u0441\u0435 \u0437\u0430\u0434\u0430\u0447\u0438 \u0432\u044b\u043f\u043e\u043b\u043d\u0435\u043d\u044b!")
+    Repeated polls with unchanged state are served from the cache.
+    """
+    subs: dict[str, object] = {
+        "todo": todo_count,
+        "in_progress": in_progress_count,
+        "done": done_count,
+    }
+    mask = 0
 
-    return "\n".join(lines)
+    if total_tasks > 0:
+        mask |= _STATUS_PROGRESS
+        subs["bar"] = format_progress_bar(done_count, total_tasks, width=10)
+    if current_task_id:
+        mask |= _STATUS_CURRENT_TASK
+        subs["task_id"] = current_task_id
+        subs["title"] = _truncate(current_task_title, 40)
+    elif in_progress_count > 0:
+        mask |= _STATUS_CURRENT_COUNT
+    if session_number > 0 or session_status != "idle":
+        mask |= _STATUS_SESSION
+        subs["session"] = session_number
+        subs["state_emoji"] = _SESSION_STATE_EMOJI.get(session_status, "")
+        # Fall back to title() only for states outside the known set
+        subs["state"] = _SESSION_STATE_LABEL.get(session_status) or session_status.title()
+        if elapsed_minutes > 0:
+            mask |= _STATUS_DURATION
+            hours = elapsed_minutes // 60
+            mins = elapsed_minutes % 60
+            subs["duration"] = f"{hours}\u0447 {mins}\u043c" if hours > 0 else f"{mins}\u043c"
+    if stale_count > 0:
+        mask |= _STATUS_STALE
+        subs["stale"] = stale_count
+    # Any remaining work, the usual case, settles this on the first operand
+    if not (todo_count or in_progress_count) and done_count > 0:
+        mask |= _STATUS_ALL_DONE
+
+    return _STATUS_TEMPLATES[mask] % subs
 
 
 def format_status_simple(
@@ -968,19 +1231,18 @@ def format_status_simple(
     Returns:
         HTML-formatted Telegram message
     """
-    data = StatusData(
-        todo_count=todo,
-        in_progress_count=in_progress,
-        done_count=done,
-        current_task_id=current_task_id,
-        current_task_title=current_task_title,
-        session_number=session_number,
-        session_status=session_status,
-        elapsed_minutes=elapsed_minutes,
-        total_tasks=todo + in_progress + done,
-        stale_count=stale_count,
+    return _format_status_cached(
+        todo,
+        in_progress,
+        done,
+        current_task_id,
+        current_task_title,
+        session_number,
+        session_status,
+        elapsed_minutes,
+        todo + in_progress + done,
+        stale_count,
     )
-    return format_status(data)
 
 
 # =============================================================================
@@ -988,6 +1250,54 @@ def format_status_simple(
 # =============================================================================
 
 
+# /next priority markers, keyed by lower-cased priority
+_PRIORITY_EMOJI = {
+    "urgent": "!!!",
+    "high": "!",
+    "medium": "",
+    "low": "",
+    "none": "",
+}
+
+# /log markers per action type; unknown types use the default one
+_ACTION_TYPE_EMOJI = {
+    "tool_call": "",
+    "file_change": "",
+    "test_result": "",
+    "commit": "",
+    "error": "",
+    "session": "",
+    "action": "",
+    "default": "",
+}
+_DEFAULT_ACTION_EMOJI = _ACTION_TYPE_EMOJI["default"]
+
+# /log title, shared by the empty and the filled reply
+_ACTION_LOG_HEAD = "<b>\u041f\u043e\u0441\u043b\u0435\u0434\u043d\u0438\u0435 \u0434\u0435\u0439\u0441\u0442\u0432\u0438\u044f</b>"
+
+# Every /budget context bar, indexed by the number of filled cells (0-10)
+_BUDGET_BAR_WIDTH = 10
+_BUDGET_BARS = tuple("|" * f + " " * (_BUDGET_BAR_WIDTH - f) for f in range(_BUDGET_BAR_WIDTH + 1))
+
+
+@functools.lru_cache(maxsize=64)
+def _queue_suffix(total_todo: int) -> str:
+    """Format the /next queue-size line.
+
+    Queue sizes stay small and repeat between calls, so the finished lines
+    are served from a small cache.
+
+    Args:
+        total_todo: Number of tasks in the Todo queue.
+
+    Returns:
+        Line like ``5 tasks remaining in queue``, or the last-task note.
+    """
+    if total_todo > 1:
+        return f"{total_todo} \u0437\u0430\u0434\u0430\u0447 \u043e\u0441\u0442\u0430\u043b\u043e\u0441\u044c \u0432 \u043e\u0447\u0435\u0440\u0435\u0434\u0438"
+    return "\u042d\u0442\u043e \u043f\u043e\u0441\u043b\u0435\u0434\u043d\u044f\u044f \u0437\u0430\u0434\u0430\u0447\u0430 \u0432 \u043e\u0447\u0435\u0440\u0435\u0434\u0438"
+
+
 def format_next_task(
     task_id: str,
     title: str,
@@ -1019,38 +1329,24 @@ def format_next_task(
 
         5 tasks remaining in queue
     """
-    # Priority emoji
-    priority_emoji = {
-        "urgent": "!!!",
-        "high": "!",
-        "medium": "",
-        "low": "",
-        "none": "",
-    }.get(priority.lower(), "")
-
-    lines = [
-        "<b>\u0421\u043b\u0435\u0434\u0443\u044e\u0449\u0430\u044f \u0437\u0430\u0434\u0430\u0447\u0430</b>",
-        "",
-        f"<code>{task_id}</code> {priority_emoji}{title}",
-        f"<b>\u041f\u0440\u0438\u043e\u0440\u0438\u0442\u0435\u0442:</b> {priority}",
-    ]
+    priority_emoji = _PRIORITY_EMOJI.get(priority.lower(), "")
+
+    buf = io.StringIO()
+    w = buf.write
+    w(
+        "<b>\u0421\u043b\u0435\u0434\u0443\u044e\u0449\u0430\u044f \u0437\u0430\u0434\u0430\u0447\u0430</b>\n"
+        "\n"
+        f"<code>{task_id}</code> {priority_emoji}{title}\n"
+        f"<b>\u041f\u0440\u0438\u043e\u0440\u0438\u0442\u0435\u0442:</b> {priority}\n"
+    )
 
     # Add truncated description if available
     if description:
-        desc_truncated = description[:150]
-        if len(description) > 150:
-            desc_truncated += "..."
-        lines.append("")
-        lines.append(f"<i>{desc_truncated}</i>")
+        w(f"\n<i>{_truncate(description, 150)}</i>\n")
 
     # Add queue count
-    lines.append("")
-    if total_todo > 1:
-        lines.append(f"{total_todo} \u0437\u0430\u0434\u0430\u0447 \u043e\u0441\u0442\u0430\u043b\u043e\u0441\u044c \u0432 \u043e\u0447\u0435\u0440\u0435\u0434\u0438")
-    else:
-        lines.append("\u042d\u0442\u043e \u043f\u043e\u0441\u043b\u0435\u0434\u043d\u044f\u044f \u0437\u0430\u0434\u0430\u0447\u0430 \u0432 \u043e\u0447\u0435\u0440\u0435\u0434\u0438")
-
-    return "\n".join(lines)
+    w("\n")
+    return buf.getvalue() + _queue_suffix(total_todo)
 
 
 def format_action_log(actions: list[dict]) -> str:
@@ -1078,38 +1374,19 @@ def format_action_log(actions: list[dict]) -> str:
           tool_call: Updated task status
     """
     if not actions:
-        return "<b>\u041f\u043e\u0441\u043b\u0435\u0434\u043d\u0438\u0435 \u0434\u0435\u0439\u0441\u0442\u0432\u0438\u044f</b>\n\n\u0414\u0435\u0439\u0441\u0442\u0432\u0438\u044f \u043d\u0435 \u0437\u0430\u0440\u0435\u0433\u0438\u0441\u0442\u0440\u0438\u0440\u043e\u0432\u0430\u043d\u044b."
-
-    lines = [
-        "<b>\u041f\u043e\u0441\u043b\u0435\u0434\u043d\u0438\u0435 \u0434\u0435\u0439\u0441\u0442\u0432\u0438\u044f</b>",
-        "",
-    ]
-
-    # Type emoji mapping
-    type_emoji = {
-        "tool_call": "",
-        "file_change": "",
-        "test_result": "",
-        "commit": "",
-        "error": "",
-        "session": "",
-        "action": "",
-        "default": "",
-    }
-
-    for action in actions:
-        action_type = action.get("type", "action")
-        title = action.get("title", "Unknown action")[:60]
-        emoji = type_emoji.get(action_type, type_emoji["default"])
-
-        # Add task reference if available
-        task_ref = ""
-        if action.get("task_id"):
-            task_ref = f" [{action['task_id']}]"
+        return _ACTION_LOG_HEAD + "\n\n\u0414\u0435\u0439\u0441\u0442\u0432\u0438\u044f \u043d\u0435 \u0437\u0430\u0440\u0435\u0433\u0438\u0441\u0442\u0440\u0438\u0440\u043e\u0432\u0430\u043d\u044b."
 
-        lines.append(f"  {emoji} {title}{task_ref}")
+    get_emoji = _ACTION_TYPE_EMOJI.get
+    default_emoji = _DEFAULT_ACTION_EMOJI
 
-    return "\n".join(lines)
+    # One line per action, with the task reference when there is one
+    body = "\n".join([
+        f"  {get_emoji(action.get('type', 'action'), default_emoji)} "
+        f"{action.get('title', 'Unknown action')[:60]}"
+        + (f" [{action['task_id']}]" if action.get("task_id") else "")
+        for action in actions
+    ])
+    return f"{_ACTION_LOG_HEAD}\n\n{body}"
 
 
 def format_budget_status(
@@ -1146,10 +1423,9 @@ def format_budget_status(
         $12.45 spent
         $87.55 remaining (of $100 limit)
     """
-    lines = [
-        "<b>\u0421\u0442\u0430\u0442\u0443\u0441 \u0431\u044e\u0434\u0436\u0435\u0442\u0430</b>",
-        "",
-    ]
+    buf = io.StringIO()
+    w = buf.write
+    w("<b>\u0421\u0442\u0430\u0442\u0443\u0441 \u0431\u044e\u0434\u0436\u0435\u0442\u0430</b>\n\n")
 
     # Context usage section
     if context_stats:
@@ -1158,28 +1434,27 @@ def format_budget_status(
         max_tokens = context_stats.get("max_tokens", 180000)
         mode = context_stats.get("mode", "normal")
 
-        # Create visual progress bar
-        bar_width = 10
-        filled = int((usage_pct / 100) * bar_width)
-        bar = "|" * filled + " " * (bar_width - filled)
+        # Visual progress bar; out-of-range usage is pinned to an empty/full bar
+        filled = int((usage_pct / 100) * _BUDGET_BAR_WIDTH)
+        bar = _BUDGET_BARS[min(max(filled, 0), _BUDGET_BAR_WIDTH)]
 
-        lines.append("<b>\u041a\u043e\u043d\u0442\u0435\u043a\u0441\u0442:</b>")
-        lines.append(f"<code>[{bar}]</code> {usage_pct:.0f}%")
-        lines.append(f"  {total_used:,} / {max_tokens:,} \u0442\u043e\u043a\u0435\u043d\u043e\u0432")
+        w(
+            "<b>\u041a\u043e\u043d\u0442\u0435\u043a\u0441\u0442:</b>\n"
+            f"<code>[{bar}]</code> {usage_pct:.0f}%\n"
+            f"  {total_used:,} / {max_tokens:,} \u0442\u043e\u043a\u0435\u043d\u043e\u0432\n"
+        )
 
         # Mode indicator
         if mode == "critical":
-            lines.append("  \u0420\u0435\u0436\u0438\u043c: \u041a\u0420\u0418\u0422\u0418\u0427\u0415\u0421\u041a\u0418\u0419")
+            w("  \u0420\u0435\u0436\u0438\u043c: \u041a\u0420\u0418\u0422\u0418\u0427\u0415\u0421\u041a\u0418\u0419\n\n")
         elif mode == "compact":
-            lines.append("  \u0420\u0435\u0436\u0438\u043c: \u041a\u041e\u041c\u041f\u0410\u041a\u0422\u041d\u042b\u0419")
+            w("  \u0420\u0435\u0436\u0438\u043c: \u041a\u041e\u041c\u041f\u0410\u041a\u0422\u041d\u042b\u0419\n\n")
         else:
-            lines.append(f"  \u0420\u0435\u0436\u0438\u043c: {mode}")
-
-        lines.append("")
+            w(f"  \u0420\u0435\u0436\u0438\u043c: {mode}\n\n")
 
     # Cost section
     if cost_stats:
-        lines.append("<b>\u0421\u0442\u043e\u0438\u043c\u043e\u0441\u0442\u044c:</b>")
+        w("<b>\u0421\u0442\u043e\u0438\u043c\u043e\u0441\u0442\u044c:</b>\n")
 
         if "limit_usd" in cost_stats:
             # Budget with limit
@@ -1187,29 +1462,31 @@ def format_budget_status(
             limit = cost_stats.get("limit_usd", 0)
             remaining = cost_stats.get("remaining_usd", limit - spent)
 
-            lines.append(f"  ${spent:.2f} \u043f\u043e\u0442\u0440\u0430\u0447\u0435\u043d\u043e")
+            w(f"  ${spent:.2f} \u043f\u043e\u0442\u0440\u0430\u0447\u0435\u043d\u043e\n")
             if limit > 0:
-                lines.append(f"  ${remaining:.2f} \u043e\u0441\u0442\u0430\u043b\u043e\u0441\u044c (\u0438\u0437 ${limit:.2f} \u043b\u0438\u043c\u0438\u0442\u0430)")
+                w(f"  ${remaining:.2f} \u043e\u0441\u0442\u0430\u043b\u043e\u0441\u044c (\u0438\u0437 ${limit:.2f} \u043b\u0438\u043c\u0438\u0442\u0430)\n")
 
                 # Add warning if over 80%
                 if spent / limit > 0.8:
-                    lines.append("  \u26a0\ufe0f \u0418\u0441\u043f\u043e\u043b\u044c\u0437\u043e\u0432\u0430\u043d\u043e \u0431\u043e\u043b\u0435\u0435 80% \u0431\u044e\u0434\u0436\u0435\u0442\u0430")
+                    w("  \u26a0\ufe0f \u0418\u0441\u043f\u043e\u043b\u044c\u0437\u043e\u0432\u0430\u043d\u043e \u0431\u043e\u043b\u0435\u0435 80% \u0431\u044e\u0434\u0436\u0435\u0442\u0430\n")
         else:
             # Just cost tracking without limit
             cost = cost_stats.get("cost_usd", 0)
             sessions = cost_stats.get("sessions", 0)
             tasks = cost_stats.get("tasks_completed", 0)
 
-            lines.append(f"  ${cost:.2f} \u0437\u0430 \u044d\u0442\u0443 \u043d\u0435\u0434\u0435\u043b\u044e")
+            w(f"  ${cost:.2f} \u0437\u0430 \u044d\u0442\u0443 \u043d\u0435\u0434\u0435\u043b\u044e\n")
             if sessions > 0:
-                lines.append(f"  {sessions} \u0441\u0435\u0441\u0441\u0438\u0439, {tasks} \u0437\u0430\u0434\u0430\u0447 \u0437\u0430\u0432\u0435\u0440\u0448\u0435\u043d\u043e")
+                w(f"  {sessions} \u0441\u0435\u0441\u0441\u0438\u0439, {tasks} \u0437\u0430\u0434\u0430\u0447 \u0437\u0430\u0432\u0435\u0440\u0448\u0435\u043d\u043e\n")
     else:
-        lines.append("<i>\u041e\u0442\u0441\u043b\u0435\u0436\u0438\u0432\u0430\u043d\u0438\u0435 \u0441\u0442\u043e\u0438\u043c\u043e\u0441\u0442\u0438 \u043d\u0435 \u043d\u0430\u0441\u0442\u0440\u043e\u0435\u043d\u043e</i>")
-        lines.append("")
-        lines.append("\u0414\u043b\u044f \u0432\u043a\u043b\u044e\u0447\u0435\u043d\u0438\u044f \u0441\u043e\u0437\u0434\u0430\u0439\u0442\u0435 <code>.agent/budget.json</code>:")
-        lines.append('<code>{"limit_usd": 100}</code>')
+        w(
+            "<i>\u041e\u0442\u0441\u043b\u0435\u0436\u0438\u0432\u0430\u043d\u0438\u0435 \u0441\u0442\u043e\u0438\u043c\u043e\u0441\u0442\u0438 \u043d\u0435 \u043d\u0430\u0441\u0442\u0440\u043e\u0435\u043d\u043e</i>\n"
+            "\n"
+            "\u0414\u043b\u044f \u0432\u043a\u043b\u044e\u0447\u0435\u043d\u0438\u044f \u0441\u043e\u0437\u0434\u0430\u0439\u0442\u0435 <code>.agent/budget.json</code>:\n"
+            '<code>{"limit_usd": 100}</code>\n'
+        )
 
-    return "\n".join(lines)
+    return buf.getvalue()[:-1]
 
 
 # =============================================================================
@@ -1263,12 +1540,11 @@ class TelegramReports:
             bar = self.EMPTY_CHAR * self.PROGRESS_BAR_WIDTH
             return f"[{bar}] 0%"
 
-        percentage = min(100, max(0, (done / total) * 100))
-        filled = int((percentage / 100) * self.PROGRESS_BAR_WIDTH)
-        empty = self.PROGRESS_BAR_WIDTH - filled
+        width = self.PROGRESS_BAR_WIDTH
+        filled = min(width, max(0, done * width // total))
+        pct = min(100, max(0, (done * 200 + total) // (2 * total)))
 
-        bar = self.FILL_CHAR * filled + self.EMPTY_CHAR * empty
-        return f"[{bar}] {percentage:.0f}%"
+        return f"[{self.FILL_CHAR * filled}{self.EMPTY_CHAR * (width - filled)}] {pct}%"
 
     def generate_daily_digest(self, tasks_stats: dict[str, object]) -> str:
         """Generate a daily digest report in Telegram-compatible HTML.
@@ -1367,7 +1643,7 @@ class TelegramReports:
         Returns:
             Comma-separated string like ``150,000``.
         """
-        return f"{count:,}"
+        return _fmt_thousands(count)
 
     def generate_session_summary(self, session_data: dict[str, object]) -> str:
         """Generate an HTML session summary report for Telegram.
@@ -78,6 +78,7 @@ TELEGRAM_TOOLS: list[str] = [
 # - format_error_alert() - Error with file, line, attempt context
 # - format_weekly_summary() - Cost and velocity trends
 # - format_progress_bar() - Visual percentage completion
+# - chunk_message() - Split long reports into one SendMessage call per chunk
 
 # Playwright MCP tools for browser automation
 PLAYWRIGHT_TOOLS: list[str] = [
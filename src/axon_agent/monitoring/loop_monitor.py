@@ -0,0 +1,123 @@
+"""
+Event Loop Monitor
+==================
+
+Detects synchronous stalls of the asyncio event loop during agent runs.
+
+A daemon watcher thread periodically schedules a no-op callback on the
+loop. If the callback does not run within the threshold, the loop thread
+is blocked: the watcher samples its current stack (the offender), waits
+for the loop to recover and reports the stall duration together with
+that stack. The loop itself does no extra work, so the monitor can stay
+enabled in production runs.
+
+Usage:
+    with event_loop_monitor(threshold_ms=50.0, on_blocking_call=report):
+        await main()
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+
+logger = logging.getLogger("loop_monitor")
+
+# Callback receiving (stall duration in ms, formatted stack of the loop thread)
+BlockingCallback = Callable[[float, str], None]
+
+# Default pause between probes; stalls are sampled, not traced
+DEFAULT_PROBE_INTERVAL_SECONDS: float = 0.5
+
+
+class EventLoopMonitor:
+    """Watcher thread that reports when the event loop stops responding.
+
+    Args:
+        loop: Event loop to watch (must be running in the calling thread).
+        threshold_ms: Minimum stall duration worth reporting.
+        on_blocking_call: Called from the watcher thread for every stall.
+        interval: Seconds between probes.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        threshold_ms: float,
+        on_blocking_call: BlockingCallback,
+        interval: float = DEFAULT_PROBE_INTERVAL_SECONDS,
+    ) -> None:
+        self._loop = loop
+        self._loop_thread_id = threading.get_ident()
+        self._threshold = threshold_ms / 1000
+        self._on_blocking_call = on_blocking_call
+        self._interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._watch, name="event-loop-monitor", daemon=True
+        )
+
+    def start(self) -> None:
+        """Start the watcher thread."""
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the watcher thread and wait for it to exit."""
+        self._stop.set()
+        self._thread.join()
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self._interval):
+            responded = threading.Event()
+            sent_at = time.monotonic()
+            try:
+                self._loop.call_soon_threadsafe(responded.set)
+            except RuntimeError:
+                return  # Loop closed
+            if responded.wait(self._threshold):
+                continue
+
+            # Still blocked: the loop thread's current frame is the offender
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame is not None else ""
+            while not responded.wait(self._interval):
+                if self._stop.is_set():
+                    break
+            duration_ms = (time.monotonic() - sent_at) * 1000
+            try:
+                self._on_blocking_call(duration_ms, stack)
+            except Exception:
+                # A failing reporter must not kill the watcher
+                logger.debug("Blocking-call reporter failed", exc_info=True)
+
+
+@contextmanager
+def event_loop_monitor(
+    threshold_ms: float,
+    on_blocking_call: BlockingCallback,
+    interval: float = DEFAULT_PROBE_INTERVAL_SECONDS,
+) -> Iterator[EventLoopMonitor]:
+    """Watch the running event loop for stalls while the context is active.
+
+    Must be entered from a coroutine running on the loop to watch.
+
+    Args:
+        threshold_ms: Minimum stall duration worth reporting.
+        on_blocking_call: Receives (duration_ms, stack) for every stall.
+        interval: Seconds between probes.
+
+    Yields:
+        The started monitor.
+    """
+    monitor = EventLoopMonitor(
+        asyncio.get_running_loop(), threshold_ms, on_blocking_call, interval
+    )
+    monitor.start()
+    try:
+        yield monitor
+    finally:
+        monitor.stop()
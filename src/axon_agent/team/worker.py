@@ -74,7 +74,7 @@ async def _execute_task(
     """
     # Lazy imports so that this module can be tested without the full SDK
     # installed — only the actual execution path pulls in heavy deps.
-    from axon_agent.core.client import create_client  # noqa: WPS433
+    from axon_agent.core.client import create_client_async  # noqa: WPS433
     from axon_agent.core.session import run_agent_session, COMPLETION_SIGNAL, SESSION_COMPLETE  # noqa: WPS433
 
     issue_id: str = issue.get("identifier", issue.get("id", "???"))
@@ -100,7 +100,7 @@ async def _execute_task(
         f"When complete, output: {COMPLETION_SIGNAL}\n"
     )
 
-    client = create_client(config.project_dir, config.model)
+    client = await create_client_async(config.project_dir, config.model)
     try:
         async with client:
             result = await run_agent_session(client, prompt, config.project_dir)
@@ -0,0 +1,60 @@
+"""
+Dashboard Startup Tests
+=======================
+
+Tests for serving the dashboard on the caller's event loop.
+Coverage: task creation, bind failure isolation, graceful and forced shutdown.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import uvicorn
+
+from axon_agent.dashboard import start_dashboard, stop_dashboard
+
+
+class TestStartDashboard:
+    """Test running the dashboard as a task on the current loop."""
+
+    async def test_serves_on_running_loop(self) -> None:
+        """The server coroutine runs as a task of the caller's loop."""
+        with patch.object(uvicorn.Server, "serve", AsyncMock()) as mock_serve:
+            task = await start_dashboard(port=8123)
+            await task
+
+        assert task.get_loop() is asyncio.get_running_loop()
+        mock_serve.assert_awaited_once()
+
+    async def test_bind_failure_does_not_exit(self) -> None:
+        """uvicorn's SystemExit on startup failure stays inside the task."""
+        with patch.object(uvicorn.Server, "serve", AsyncMock(side_effect=SystemExit(1))):
+            task = await start_dashboard(port=8123)
+            await task
+
+        assert task.exception() is None
+
+    async def test_stop_asks_server_to_exit(self) -> None:
+        """stop_dashboard sets should_exit and waits for the server to finish."""
+        async def _serve(self: uvicorn.Server) -> None:
+            while not self.should_exit:
+                await asyncio.sleep(0.01)
+
+        with patch.object(uvicorn.Server, "serve", _serve):
+            task = await start_dashboard(port=8123)
+            await asyncio.sleep(0)
+            await stop_dashboard(task)
+
+        assert task.done() and not task.cancelled()
+
+    async def test_stop_cancels_hung_server(self) -> None:
+        """A server that ignores should_exit is cancelled after the timeout."""
+        async def _hang(self: uvicorn.Server) -> None:
+            await asyncio.Event().wait()
+
+        with patch.object(uvicorn.Server, "serve", _hang):
+            task = await start_dashboard(port=8123)
+            await asyncio.sleep(0)
+            await stop_dashboard(task, timeout=0.05)
+
+        assert task.cancelled()
@@ -17,6 +17,12 @@ os.environ.setdefault("TASK_MCP_URL", "http://localhost:8001/sse")
 os.environ.setdefault("TELEGRAM_MCP_URL", "http://localhost:8002/sse")
 
 
+@pytest.fixture(autouse=True)
+def _no_user_ast_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Keep ContextManager's on-disk AST cache out of the user's home directory."""
+    monkeypatch.setattr("axon_agent.core.context.AST_CACHE_DIR", None)
+
+
 @pytest.fixture(scope="session")
 def event_loop():
     """Create event loop for async tests."""
@@ -0,0 +1,376 @@
+"""
+Tests for SDK client setup helpers
+==================================
+
+Verifies:
+1. Orchestrator prompt and security settings are built once per process
+2. write_security_settings writes the expected JSON
+3. Unchanged settings files are not rewritten
+4. Settings are swapped in atomically via a uniquely named temp file
+5. create_client_async prepares inputs off-loop
+6. The Playwright warm-up never leaves npx running
+7. tool_output_truncation_hook dispatch and near-limit fast path
+8. The shared HTTP client can be closed and uses HTTP/2 when available
+"""
+
+import asyncio
+import json
+import os
+from pathlib import Path
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+import axon_agent.core.client as client_module
+from axon_agent.core.client import (
+    _build_client,
+    close_mcp_http_client,
+    create_client_async,
+    create_security_settings,
+    get_mcp_http_client,
+    load_orchestrator_prompt,
+    subagent_start_hook,
+    subagent_stop_hook,
+    tool_output_truncation_hook,
+    warmup_playwright,
+    write_security_settings,
+)
+from axon_agent.core.context import TOOL_OUTPUT_MAX_CHARS
+
+
+class TestMemoizedSetup:
+    """Test process-wide caching of static client inputs."""
+
+    def test_orchestrator_prompt_read_once(self) -> None:
+        """The prompt file is read from disk only on the first call."""
+        load_orchestrator_prompt.cache_clear()
+        with patch.object(Path, "read_bytes", return_value="промпт".encode()) as mock_read:
+            first = load_orchestrator_prompt()
+            second = load_orchestrator_prompt()
+        load_orchestrator_prompt.cache_clear()
+
+        assert first == second == "промпт"
+        assert mock_read.call_count == 1
+
+    def test_orchestrator_prompt_packaged(self) -> None:
+        """The packaged orchestrator prompt decodes as non-empty UTF-8 text."""
+        load_orchestrator_prompt.cache_clear()
+        assert load_orchestrator_prompt().strip()
+
+    def test_security_settings_shared(self) -> None:
+        """Repeated calls return the same settings object."""
+        assert create_security_settings() is create_security_settings()
+
+
+class TestWriteSecuritySettings:
+    """Test persisting security settings to the project directory."""
+
+    def test_writes_json(self, tmp_path: Path) -> None:
+        """Settings are written as indented JSON."""
+        settings = create_security_settings()
+        settings_file = write_security_settings(tmp_path, settings)
+
+        assert settings_file == tmp_path / ".claude_settings.json"
+        assert json.loads(settings_file.read_text()) == settings
+
+    def test_unchanged_file_not_rewritten(self, tmp_path: Path) -> None:
+        """A second write with identical content leaves the file untouched."""
+        settings = create_security_settings()
+        write_security_settings(tmp_path, settings)
+
+        with patch("axon_agent.core.client.os.open") as mock_open:
+            write_security_settings(tmp_path, settings)
+
+        mock_open.assert_not_called()
+
+    def test_temp_file_fsynced_before_replace(self, tmp_path: Path) -> None:
+        """The new content is flushed to disk before it replaces the target."""
+        calls: list[str] = []
+        real_fsync, real_replace = os.fsync, os.replace
+
+        def _fsync(fd: int) -> None:
+            calls.append("fsync")
+            real_fsync(fd)
+
+        def _replace(src: Any, dst: Any) -> None:
+            calls.append("replace")
+            real_replace(src, dst)
+
+        with (
+            patch("axon_agent.core.client.os.fsync", side_effect=_fsync),
+            patch("axon_agent.core.client.os.replace", side_effect=_replace),
+        ):
+            write_security_settings(tmp_path, create_security_settings())
+
+        assert calls == ["fsync", "replace"]
+
+    def test_changed_file_rewritten(self, tmp_path: Path) -> None:
+        """Stale content on disk is replaced."""
+        settings_file = tmp_path / ".claude_settings.json"
+        settings_file.write_text("{}")
+
+        write_security_settings(tmp_path, create_security_settings())
+
+        assert json.loads(settings_file.read_text()) == create_security_settings()
+
+    def test_no_temp_file_left_behind(self, tmp_path: Path) -> None:
+        """The temp file is renamed over the target, not left in the directory."""
+        write_security_settings(tmp_path, create_security_settings())
+
+        assert [p.name for p in tmp_path.iterdir()] == [".claude_settings.json"]
+
+    def test_failed_replace_keeps_original(self, tmp_path: Path) -> None:
+        """A failing rename leaves the previous file intact and cleans up."""
+        settings_file = tmp_path / ".claude_settings.json"
+        settings_file.write_text("{}")
+
+        with patch("axon_agent.core.client.os.replace", side_effect=OSError("disk full")):
+            with pytest.raises(IOError, match="Failed to write security settings"):
+                write_security_settings(tmp_path, create_security_settings())
+
+        assert settings_file.read_text() == "{}"
+        assert [p.name for p in tmp_path.iterdir()] == [".claude_settings.json"]
+
+    def test_concurrent_writers_use_separate_temp_files(self, tmp_path: Path) -> None:
+        """A second writer finishing mid-write does not break the first one."""
+        settings = create_security_settings()
+        other: Any = {**settings, "extra": True}
+        real_fsync = os.fsync
+        nested: list[bool] = []
+
+        def _fsync(fd: int) -> None:
+            real_fsync(fd)
+            if not nested:
+                nested.append(True)
+                write_security_settings(tmp_path, other)
+
+        with patch("axon_agent.core.client.os.fsync", side_effect=_fsync):
+            write_security_settings(tmp_path, settings)
+
+        settings_file = tmp_path / ".claude_settings.json"
+        assert json.loads(settings_file.read_text()) == settings
+        assert [p.name for p in tmp_path.iterdir()] == [".claude_settings.json"]
+
+
+class TestCreateClientAsync:
+    """Test the event-loop friendly client factory."""
+
+    async def test_builds_client_and_writes_settings(self, tmp_path: Path) -> None:
+        """Configs and settings file are prepared and passed to the builder."""
+        sentinel = MagicMock()
+        with patch.object(client_module, "_build_client", return_value=sentinel) as mock_build:
+            result = await create_client_async(tmp_path, "haiku")
+
+        assert result is sentinel
+        project_dir, model, task_cfg, telegram_cfg, settings_file = mock_build.call_args.args
+        assert (project_dir, model) == (tmp_path, "haiku")
+        assert "url" in task_cfg and "url" in telegram_cfg
+        assert settings_file == tmp_path / ".claude_settings.json"
+        assert settings_file.exists()
+
+
+class TestWarmupPlaywright:
+    """Test the background npx cache warm-up."""
+
+    async def test_tolerates_missing_npx(self) -> None:
+        """A missing npx binary is logged, not raised."""
+        with patch(
+            "axon_agent.core.client.asyncio.create_subprocess_exec",
+            AsyncMock(side_effect=FileNotFoundError("npx")),
+        ):
+            await warmup_playwright()
+
+    async def test_timeout_kills_and_reaps(self) -> None:
+        """A warm-up past its timeout is killed and waited for."""
+        proc = _hanging_process()
+        with (
+            patch("axon_agent.core.client.asyncio.create_subprocess_exec", AsyncMock(return_value=proc)),
+            patch.object(client_module, "PLAYWRIGHT_WARMUP_TIMEOUT_SECONDS", 0.01),
+        ):
+            await warmup_playwright()
+
+        proc.kill.assert_called_once()
+        assert proc.returncode == -9
+
+    async def test_cancel_kills_and_reaps(self) -> None:
+        """Cancelling the warm-up task does not leave npx running."""
+        proc = _hanging_process()
+        with patch(
+            "axon_agent.core.client.asyncio.create_subprocess_exec", AsyncMock(return_value=proc)
+        ):
+            task = asyncio.create_task(warmup_playwright())
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        proc.kill.assert_called_once()
+        assert proc.returncode == -9
+
+
+def _hanging_process() -> MagicMock:
+    """Subprocess stub whose wait() blocks until kill() is called."""
+    killed = asyncio.Event()
+    proc = MagicMock(returncode=None)
+
+    def _kill() -> None:
+        proc.returncode = -9
+        killed.set()
+
+    async def _wait() -> int:
+        await killed.wait()
+        return proc.returncode
+
+    proc.kill = MagicMock(side_effect=_kill)
+    proc.wait = _wait
+    return proc
+
+
+class TestToolOutputTruncationHook:
+    """Test the post-tool output truncation middleware."""
+
+    def test_short_output_untouched(self) -> None:
+        """Outputs within the limit are returned as-is."""
+        assert tool_output_truncation_hook("Read", {}, "ok") == "ok"
+
+    def test_bash_diff_uses_git_truncation(self) -> None:
+        """Bash diff commands are routed to the git diff truncator."""
+        output = "diff --git a/x b/x\n" + "+line\n" * 2000
+        with patch("axon_agent.core.client.truncate_git_diff", return_value=("cut", True)) as m:
+            result = tool_output_truncation_hook("Bash", {"command": "git DIFF HEAD"}, output)
+
+        assert result == "cut"
+        m.assert_called_once_with(output)
+
+    def test_bash_difftool_not_treated_as_diff(self) -> None:
+        """Only the standalone word 'diff' selects the git diff truncator."""
+        output = "x" * (TOOL_OUTPUT_MAX_CHARS * 2)
+        with patch("axon_agent.core.client.truncate_git_diff") as m:
+            tool_output_truncation_hook("Bash", {"command": "git difftool"}, output)
+
+        m.assert_not_called()
+
+    def test_near_limit_fast_path(self) -> None:
+        """Slightly oversized output is sliced without the general truncator."""
+        output = "y" * (TOOL_OUTPUT_MAX_CHARS + 10)
+        with patch("axon_agent.core.client.truncate_tool_output") as m:
+            result = tool_output_truncation_hook("Read", {}, output)
+
+        m.assert_not_called()
+        assert result.startswith("y" * TOOL_OUTPUT_MAX_CHARS)
+        assert result.endswith("[truncated]")
+
+    def test_large_output_sliced_without_general_truncator(self) -> None:
+        """Far oversized plain output is cut to head and tail directly."""
+        output = "z" * (TOOL_OUTPUT_MAX_CHARS * 3)
+        with patch("axon_agent.core.client.truncate_tool_output") as m:
+            result = tool_output_truncation_hook("Read", {}, output)
+
+        m.assert_not_called()
+        assert "[...truncated" in result
+        assert len(result) < len(output)
+
+    def test_large_shell_output_uses_general_truncator(self) -> None:
+        """Bash output keeps the general truncator's shell handling."""
+        output = "z" * (TOOL_OUTPUT_MAX_CHARS * 3)
+        with patch(
+            "axon_agent.core.client.truncate_tool_output", return_value=("cut", True)
+        ) as m:
+            result = tool_output_truncation_hook("Bash", {"command": "ls"}, output)
+
+        m.assert_called_once_with(output, "Bash")
+        assert result == "cut"
+
+
+class TestMcpHttpClient:
+    """Test the shared pooled HTTP client."""
+
+    def test_client_shared(self) -> None:
+        """Repeated calls return the same pooled client."""
+        assert get_mcp_http_client() is get_mcp_http_client()
+
+    async def test_close_releases_client(self) -> None:
+        """Closing shuts the pool down and the next call builds a new client."""
+        http_client = get_mcp_http_client()
+
+        await close_mcp_http_client()
+        await close_mcp_http_client()
+
+        assert http_client.is_closed
+        assert get_mcp_http_client() is not http_client
+
+    def test_http2_follows_h2_availability(self) -> None:
+        """HTTP/2 is only requested when the h2 package is importable."""
+        with patch("axon_agent.core.client.httpx.AsyncClient") as mock_client:
+            get_mcp_http_client.cache_clear()
+            get_mcp_http_client()
+        get_mcp_http_client.cache_clear()
+
+        assert mock_client.call_args.kwargs["http2"] is client_module.MCP_HTTP2_ENABLED
+
+
+class TestSubagentHooks:
+    """Test the subagent lifecycle audit hooks."""
+
+    async def test_hooks_return_shared_empty_result(self) -> None:
+        """Both hooks continue execution with the same empty result object."""
+        start = await subagent_start_hook({"agent_id": "a1", "agent_type": "coder"}, None, {})
+        stop = await subagent_stop_hook({"agent_id": "a1"}, None, {})
+
+        assert start == {}
+        assert start is stop
+
+    async def test_hooks_log_fields(self, caplog: pytest.LogCaptureFixture) -> None:
+        """Complete and partial inputs are both logged, with defaults for missing keys."""
+        with caplog.at_level("INFO", logger="client"):
+            await subagent_start_hook({"agent_id": "a1", "agent_type": "coder"}, None, {})
+            await subagent_stop_hook({"agent_id": "a1"}, None, {})
+
+        assert "Subagent started: id=a1 type=coder" in caplog.text
+        assert "Subagent stopped: id=a1 type=unknown transcript=n/a" in caplog.text
+
+
+class TestBuildClient:
+    """Test assembling ClaudeAgentOptions for the SDK client."""
+
+    def test_static_options_shared_between_clients(self, tmp_path: Path) -> None:
+        """Tools and hooks are built once; only the task/telegram configs vary."""
+        task_cfg = {"type": "sse", "url": "http://task"}
+        telegram_cfg = {"type": "sse", "url": "http://telegram"}
+        with patch.object(client_module, "ClaudeSDKClient") as mock_sdk:
+            _build_client(tmp_path, "haiku", task_cfg, telegram_cfg, tmp_path / "s.json")
+            _build_client(tmp_path, "haiku", task_cfg, telegram_cfg, tmp_path / "s.json")
+
+        first, second = (c.kwargs["options"] for c in mock_sdk.call_args_list)
+        assert first.allowed_tools is second.allowed_tools
+        assert first.hooks is second.hooks
+        assert "Bash" in first.allowed_tools
+        assert first.mcp_servers["task"] is task_cfg
+        assert set(first.hooks) == {"PreToolUse", "SubagentStart", "SubagentStop"}
+
+    def test_banner_printed_once_when_verbose(
+        self, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        """The startup summary is written in a single print call."""
+        cfg = {"type": "sse", "url": "http://task"}
+        with (
+            patch.object(client_module, "ClaudeSDKClient"),
+            patch("builtins.print", wraps=print) as mock_print,
+        ):
+            _build_client(tmp_path, "haiku", cfg, cfg, tmp_path / "s.json", verbose=True)
+
+        mock_print.assert_called_once()
+        out = capsys.readouterr().out
+        assert "Compact mode: 70%" in out
+        assert "task (http://task)" in out
+
+    def test_banner_suppressed_when_not_verbose(
+        self, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        """Non-verbose startup keeps stdout clean."""
+        cfg = {"type": "sse", "url": "http://task"}
+        with patch.object(client_module, "ClaudeSDKClient"):
+            _build_client(tmp_path, "haiku", cfg, cfg, tmp_path / "s.json", verbose=False)
+
+        assert capsys.readouterr().out == ""
@@ -9,13 +9,20 @@ Verifies:
 4. Max retries exceeded raises MCPTimeoutError
 5. Rate limit backoff uses longer initial delay
 6. Graceful degradation triggered on exhaustion
-7. MCPTimeoutError attributes
+7. MCPTimeoutError attributes, messages and pickling
 8. Non-retryable errors propagate immediately
 9. Success on first attempt (no retry overhead)
 10. Success after transient timeout
+11. Circuit breaker state machine and fail-fast on open circuit; probe slots are freed
+12. Retry-After / X-RateLimit-Reset headers drive rate-limit backoff
+13. Token bucket admission gate and AIMD rate adaptation
+14. Fresh/stale response cache for read-only tools
+15. Deadline budget bounds total retry time
 """
 
 import asyncio
+import pickle
+import time
 from typing import Any
 from unittest.mock import AsyncMock, patch
 
@@ -28,10 +35,33 @@ from axon_agent.core.client import (
     MAX_RETRIES,
     MCP_TIMEOUT_SECONDS,
     RATE_LIMIT_INITIAL_BACKOFF_SECONDS,
+    CircuitBreaker,
+    CircuitState,
+    MCPCircuitOpenError,
     MCPTimeoutError,
+    TokenBucket,
+    _extract_retry_after,
     calculate_backoff,
     call_mcp_tool_with_retry,
+    get_circuit_breaker,
+    get_token_bucket,
+    reset_circuit_breakers,
+    reset_response_cache,
+    reset_token_buckets,
 )
+from axon_agent.core.recovery import FailureType
+
+
+@pytest.fixture(autouse=True)
+def _reset_breakers() -> Any:
+    """Isolate module-level breaker, token bucket and response cache state between tests."""
+    reset_circuit_breakers()
+    reset_token_buckets()
+    reset_response_cache()
+    yield
+    reset_circuit_breakers()
+    reset_token_buckets()
+    reset_response_cache()
 
 
 # ---------------------------------------------------------------------------
@@ -84,6 +114,32 @@ class TestMCPTimeoutError:
         err = MCPTimeoutError("tool", 1.0)
         assert isinstance(err, Exception)
 
+    def test_custom_message(self) -> None:
+        """An explicit message replaces the default one."""
+        err = MCPTimeoutError("tool", 1.0, "custom")
+        assert str(err) == "custom"
+        assert err.args == ("custom",)
+
+    def test_pickle_round_trip(self) -> None:
+        """Both MCP errors survive pickling with their attributes and message."""
+        for err in (
+            MCPTimeoutError("mcp__task__GetIssue", 30.0),
+            MCPCircuitOpenError("mcp__task__GetIssue", 30.0, "task", 12.5),
+        ):
+            restored = pickle.loads(pickle.dumps(err))
+            assert type(restored) is type(err)
+            assert str(restored) == str(err)
+            assert restored.args == err.args
+            assert vars(restored) == vars(err)
+
+    def test_circuit_open_message(self) -> None:
+        """The open-circuit message goes through the base constructor."""
+        err = MCPCircuitOpenError("mcp__task__GetIssue", 30.0, "task", 12.5)
+        assert err.args == (str(err),)
+        assert str(err) == (
+            "MCP circuit for 'task' is open, 'mcp__task__GetIssue' rejected (retry in 12.5s)"
+        )
+
 
 # ---------------------------------------------------------------------------
 # calculate_backoff Tests
@@ -146,6 +202,16 @@ class TestCalculateBackoff:
         # 1.0 * 3^2 = 9.0, no jitter when random=0.5
         assert backoff == pytest.approx(9.0)
 
+    def test_schedule_matches_formula(self) -> None:
+        """Precomputed schedules agree with the uncached formula for every attempt."""
+        with patch("axon_agent.core.client.random.random", return_value=0.5):
+            for initial in (INITIAL_BACKOFF_SECONDS, RATE_LIMIT_INITIAL_BACKOFF_SECONDS):
+                for attempt in range(MAX_RETRIES + 2):
+                    expected = min(
+                        initial * BACKOFF_MULTIPLIER ** attempt, MAX_BACKOFF_SECONDS,
+                    )
+                    assert calculate_backoff(attempt, initial=initial) == pytest.approx(expected)
+
     def test_default_parameters_match_constants(self) -> None:
         """Default parameters use the module-level constants."""
         with patch("axon_agent.core.client.random.random", return_value=0.5):
@@ -164,7 +230,7 @@ class TestCallMCPToolWithRetry:
         """Returns result immediately when call succeeds."""
         mock_fn = AsyncMock(return_value={"status": "ok"})
 
-        with patch("axon_agent.core.client.asyncio.wait_for", new_callable=AsyncMock) as mock_wf:
+        with patch("axon_agent.core.client._await_with_timeout", new_callable=AsyncMock) as mock_wf:
             mock_wf.return_value = {"status": "ok"}
             result = await call_mcp_tool_with_retry(
                 "mcp__task__GetIssue", mock_fn, timeout=5.0,
@@ -172,11 +238,29 @@ class TestCallMCPToolWithRetry:
 
         assert result == {"status": "ok"}
 
+    async def test_real_timeout_cancels_slow_call(self) -> None:
+        """A call exceeding the timeout is cancelled and retried without mocks."""
+        calls = 0
+
+        async def _slow() -> str:
+            nonlocal calls
+            calls += 1
+            await asyncio.Event().wait()
+            return "never"
+
+        with patch("axon_agent.core.client.calculate_backoff", return_value=0.0):
+            with pytest.raises(MCPTimeoutError):
+                await call_mcp_tool_with_retry(
+                    "mcp__task__Task_CreateIssue", _slow, timeout=0.01, max_retries=2,
+                )
+
+        assert calls == 2
+
     async def test_retries_on_timeout(self) -> None:
         """Retries the call when asyncio.TimeoutError occurs."""
         call_count = 0
 
-        async def _mock_wait_for(coro: Any, timeout: float) -> str:
+        async def _mock_await_with_timeout(coro: Any, timeout: float) -> str:
             nonlocal call_count
             call_count += 1
             # Close the coroutine to avoid warnings
@@ -186,7 +270,7 @@ class TestCallMCPToolWithRetry:
             return "recovered"
 
         with (
-            patch("axon_agent.core.client.asyncio.wait_for", side_effect=_mock_wait_for),
+            patch("axon_agent.core.client._await_with_timeout", side_effect=_mock_await_with_timeout),
             patch("axon_agent.core.client.asyncio.sleep", new_callable=AsyncMock),
         ):
             result = await call_mcp_tool_with_retry(
@@ -198,12 +282,12 @@ class TestCallMCPToolWithRetry:
 
     async def test_raises_mcp_timeout_after_max_retries(self) -> None:
         """Raises MCPTimeoutError after all retries are exhausted."""
-        async def _mock_wait_for(coro: Any, timeout: float) -> None:
+        async def _mock_await_with_timeout(coro: Any, timeout: float) -> None:
             coro.close()
             raise asyncio.TimeoutError()
 
         with (
-            patch("axon_agent.core.client.asyncio.wait_for", side_effect=_mock_wait_for),
+            patch("axon_agent.core.client._await_with_timeout", side_effect=_mock_await_with_timeout),
             patch("axon_agent.core.client.asyncio.sleep", new_callable=AsyncMock),
         ):
             with pytest.raises(MCPTimeoutError) as exc_info:
@@ -217,12 +301,12 @@ class TestCallMCPToolWithRetry:
 
     async def test_backoff_called_between_retries(self) -> None:
         """asyncio.sleep is called with calculated backoff between retries."""
-        async def _mock_wait_for(coro: Any, timeout: float) -> None:
+        async def _mock_await_with_timeout(coro: Any, timeout: float) -> None:
             coro.close()
             raise asyncio.TimeoutError()
 
         with (
-            patch("axon_agent.core.client.asyncio.wait_for", side_effect=_mock_wait_for),
+            patch("axon_agent.core.client._await_with_timeout", side_effect=_mock_await_with_timeout),
             patch("axon_agent.core.client.asyncio.sleep", new_callable=AsyncMock) as mock_sleep,
             patch("axon_agent.core.client.calculate_backoff", side_effect=[1.5, 3.0]) as mock_backoff,
         ):
@@ -245,7 +329,7 @@ class TestCallMCPToolWithRetry:
         """Rate limit errors use RATE_LIMIT_INITIAL_BACKOFF_SECONDS as base."""
         call_count = 0
 
-        async def _mock_wait_for(coro: Any, timeout: float) -> str:
+        async def _mock_await_with_timeout(coro: Any, timeout: float) -> str:
             nonlocal call_count
             coro.close()
             call_count += 1
@@ -254,7 +338,7 @@ class TestCallMCPToolWithRetry:
             return "ok"
 
         with (
-            patch("axon_agent.core.client.asyncio.wait_for", side_effect=_mock_wait_for),
+            patch("axon_agent.core.client._await_with_timeout", side_effect=_mock_await_with_timeout),
             patch("axon_agent.core.client.asyncio.sleep", new_callable=AsyncMock),
             patch("axon_agent.core.client.calculate_backoff", return_value=5.0) as mock_backoff,
         ):
@@ -272,13 +356,13 @@ class TestCallMCPToolWithRetry:
         """Non-timeout, non-rate-limit errors are raised without retry."""
         call_count = 0
 
-        async def _mock_wait_for(coro: Any, timeout: float) -> None:
+        async def _mock_await_with_timeout(coro: Any, timeout: float) -> None:
             nonlocal call_count
             coro.close()
             call_count += 1
             raise ValueError("Invalid API key")
 
-        with patch("axon_agent.core.client.asyncio.wait_for", side_effect=_mock_wait_for):
+        with patch("axon_agent.core.client._await_with_timeout", side_effect=_mock_await_with_timeout):
             with pytest.raises(ValueError, match="Invalid API key"):
                 await call_mcp_tool_with_retry(
                     "mcp__task__GetIssue", AsyncMock(),
@@ -296,10 +380,10 @@ class TestCallMCPToolWithRetry:
         async def _tool_fn(*args: Any, **kwargs: Any) -> dict[str, str]:
             return {"id": args[0], "state": kwargs.get("state", "Todo")}
 
-        async def _mock_wait_for(coro: Any, timeout: float) -> Any:
+        async def _mock_await_with_timeout(coro: Any, timeout: float) -> Any:
             return await coro
 
-        with patch("axon_agent.core.client.asyncio.wait_for", side_effect=_mock_wait_for):
+        with patch("axon_agent.core.client._await_with_timeout", side_effect=_mock_await_with_timeout):
             result = await call_mcp_tool_with_retry(
                 "mcp__task__UpdateIssue",
                 _tool_fn,
@@ -314,12 +398,12 @@ class TestCallMCPToolWithRetry:
         """Default timeout parameter uses MCP_TIMEOUT_SECONDS."""
         captured_timeout: list[float] = []
 
-        async def _mock_wait_for(coro: Any, timeout: float) -> str:
+        async def _mock_await_with_timeout(coro: Any, timeout: float) -> str:
             captured_timeout.append(timeout)
             coro.close()
             return "ok"
 
-        with patch("axon_agent.core.client.asyncio.wait_for", side_effect=_mock_wait_for):
+        with patch("axon_agent.core.client._await_with_timeout", side_effect=_mock_await_with_timeout):
             await call_mcp_tool_with_retry("mcp__task__WhoAmI", AsyncMock())
 
         assert captured_timeout[0] == MCP_TIMEOUT_SECONDS
@@ -328,14 +412,14 @@ class TestCallMCPToolWithRetry:
         """Default max_retries parameter uses MAX_RETRIES."""
         call_count = 0
 
-        async def _mock_wait_for(coro: Any, timeout: float) -> None:
+        async def _mock_await_with_timeout(coro: Any, timeout: float) -> None:
             nonlocal call_count
             coro.close()
             call_count += 1
             raise asyncio.TimeoutError()
 
         with (
-            patch("axon_agent.core.client.asyncio.wait_for", side_effect=_mock_wait_for),
+            patch("axon_agent.core.client._await_with_timeout", side_effect=_mock_await_with_timeout),
             patch("axon_agent.core.client.asyncio.sleep", new_callable=AsyncMock),
         ):
             with pytest.raises(MCPTimeoutError):
@@ -346,27 +430,30 @@ class TestCallMCPToolWithRetry:
         assert call_count == MAX_RETRIES
 
     async def test_graceful_degradation_triggered_on_exhaustion(self) -> None:
-        """GracefulDegradation is instantiated when retries are exhausted."""
-        async def _mock_wait_for(coro: Any, timeout: float) -> None:
+        """The shared GracefulDegradation guards the exhaustion path."""
+        async def _mock_await_with_timeout(coro: Any, timeout: float) -> None:
             coro.close()
             raise asyncio.TimeoutError()
 
+        from contextlib import asynccontextmanager
+
+        entered: list[FailureType] = []
+
+        @asynccontextmanager
+        async def _mock_protected(failure_type: Any) -> Any:
+            """Mock protected context that records entry and re-raises exceptions."""
+            entered.append(failure_type)
+            try:
+                yield
+            except Exception:
+                raise
+
         with (
-            patch("axon_agent.core.client.asyncio.wait_for", side_effect=_mock_wait_for),
+            patch("axon_agent.core.client._await_with_timeout", side_effect=_mock_await_with_timeout),
             patch("axon_agent.core.client.asyncio.sleep", new_callable=AsyncMock),
+            patch("axon_agent.core.client._DEGRADATION") as mock_recovery,
             patch("axon_agent.core.client.GracefulDegradation") as mock_gd_cls,
         ):
-            from contextlib import asynccontextmanager
-
-            @asynccontextmanager
-            async def _mock_protected(failure_type: Any) -> Any:
-                """Mock protected context that re-raises exceptions."""
-                try:
-                    yield
-                except Exception:
-                    raise
-
-            mock_recovery = mock_gd_cls.return_value
             mock_recovery.protected = _mock_protected
 
             with pytest.raises(MCPTimeoutError):
@@ -375,16 +462,19 @@ class TestCallMCPToolWithRetry:
                     timeout=5.0, max_retries=2,
                 )
 
-            mock_gd_cls.assert_called_once()
+            # No per-call instance: the module-level singleton is reused
+            mock_gd_cls.assert_not_called()
+
+        assert entered == [FailureType.MCP_TIMEOUT]
 
     async def test_rate_limit_exhaustion_raises_timeout_error(self) -> None:
         """When rate-limit retries are exhausted, MCPTimeoutError is raised."""
-        async def _mock_wait_for(coro: Any, timeout: float) -> None:
+        async def _mock_await_with_timeout(coro: Any, timeout: float) -> None:
             coro.close()
             raise Exception("429 Too Many Requests")
 
         with (
-            patch("axon_agent.core.client.asyncio.wait_for", side_effect=_mock_wait_for),
+            patch("axon_agent.core.client._await_with_timeout", side_effect=_mock_await_with_timeout),
             patch("axon_agent.core.client.asyncio.sleep", new_callable=AsyncMock),
         ):
             with pytest.raises(MCPTimeoutError):
@@ -397,7 +487,7 @@ class TestCallMCPToolWithRetry:
         """Succeeds on third attempt after two timeouts."""
         call_count = 0
 
-        async def _mock_wait_for(coro: Any, timeout: float) -> str:
+        async def _mock_await_with_timeout(coro: Any, timeout: float) -> str:
             nonlocal call_count
             coro.close()
             call_count += 1
@@ -406,7 +496,7 @@ class TestCallMCPToolWithRetry:
             return "finally"
 
         with (
-            patch("axon_agent.core.client.asyncio.wait_for", side_effect=_mock_wait_for),
+            patch("axon_agent.core.client._await_with_timeout", side_effect=_mock_await_with_timeout),
             patch("axon_agent.core.client.asyncio.sleep", new_callable=AsyncMock),
         ):
             result = await call_mcp_tool_with_retry(
@@ -418,6 +508,464 @@ class TestCallMCPToolWithRetry:
         assert call_count == 3
 
 
+# ---------------------------------------------------------------------------
+# Circuit breaker Tests
+# ---------------------------------------------------------------------------
+
+class TestCircuitBreaker:
+    """Test the Closed/Open/Half-Open state machine."""
+
+    def test_opens_after_threshold(self) -> None:
+        """Breaker opens once failure_threshold consecutive failures occur."""
+        breaker = CircuitBreaker(failure_threshold=3)
+        for _ in range(2):
+            breaker.record_failure()
+        assert breaker.state is CircuitState.CLOSED
+        breaker.record_failure()
+        assert breaker.state is CircuitState.OPEN
+        assert breaker.allow_request() is False
+
+    def test_success_resets_failure_count(self) -> None:
+        """A success in CLOSED state resets the consecutive failure counter."""
+        breaker = CircuitBreaker(failure_threshold=2)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state is CircuitState.CLOSED
+
+    def test_half_open_single_probe_then_closes(self) -> None:
+        """After cooldown one probe at a time is allowed; enough successes close it."""
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10.0, success_threshold=2)
+        with patch("axon_agent.core.client.time.monotonic", return_value=100.0):
+            breaker.record_failure()
+        with patch("axon_agent.core.client.time.monotonic", return_value=111.0):
+            assert breaker.allow_request() is True
+            assert breaker.state is CircuitState.HALF_OPEN
+            assert breaker.allow_request() is False
+            breaker.record_success()
+            assert breaker.allow_request() is True
+            breaker.record_success()
+        assert breaker.state is CircuitState.CLOSED
+
+    def test_half_open_failure_reopens(self) -> None:
+        """A failed probe sends the breaker straight back to OPEN."""
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10.0)
+        with patch("axon_agent.core.client.time.monotonic", return_value=100.0):
+            breaker.record_failure()
+        with patch("axon_agent.core.client.time.monotonic", return_value=111.0):
+            assert breaker.allow_request() is True
+            breaker.record_failure()
+            assert breaker.state is CircuitState.OPEN
+            assert breaker.allow_request() is False
+
+    def test_breakers_keyed_by_server_prefix(self) -> None:
+        """Tools of the same MCP server share one breaker."""
+        assert get_circuit_breaker("mcp__task__GetIssue") is get_circuit_breaker(
+            "mcp__task__ListIssues"
+        )
+        assert get_circuit_breaker("mcp__task__GetIssue") is not get_circuit_breaker(
+            "mcp__telegram__SendMessage"
+        )
+
+    async def test_open_circuit_fails_fast(self) -> None:
+        """An open circuit rejects the call without invoking call_fn."""
+        breaker = get_circuit_breaker("mcp__task__GetIssue")
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+
+        mock_fn = AsyncMock(return_value="ok")
+        with pytest.raises(MCPCircuitOpenError) as exc_info:
+            await call_mcp_tool_with_retry("mcp__task__ListIssues", mock_fn, timeout=5.0)
+
+        assert isinstance(exc_info.value, MCPTimeoutError)
+        assert exc_info.value.server == "task"
+        mock_fn.assert_not_called()
+
+    async def test_timeouts_trip_breaker_across_calls(self) -> None:
+        """Repeated timeouts across calls open the circuit for the server."""
+        async def _mock_await_with_timeout(coro: Any, timeout: float) -> None:
+            coro.close()
+            raise asyncio.TimeoutError()
+
+        with (
+            patch("axon_agent.core.client._await_with_timeout", side_effect=_mock_await_with_timeout),
+            patch("axon_agent.core.client.asyncio.sleep", new_callable=AsyncMock),
+        ):
+            with pytest.raises(MCPTimeoutError):
+                await call_mcp_tool_with_retry(
+                    "mcp__task__GetIssue", AsyncMock(), timeout=5.0, max_retries=3,
+                )
+            with pytest.raises(MCPCircuitOpenError):
+                await call_mcp_tool_with_retry(
+                    "mcp__task__GetIssue", AsyncMock(), timeout=5.0, max_retries=3,
+                )
+
+        assert get_circuit_breaker("mcp__task__GetIssue").state is CircuitState.OPEN
+
+    def test_release_probe_frees_half_open_slot(self) -> None:
+        """A released probe lets the next caller probe again."""
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10.0)
+        with patch("axon_agent.core.client.time.monotonic", return_value=100.0):
+            breaker.record_failure()
+        with patch("axon_agent.core.client.time.monotonic", return_value=111.0):
+            assert breaker.allow_request() is True
+            assert breaker.can_attempt() is False
+            breaker.release_probe()
+            assert breaker.can_attempt() is True
+            assert breaker.allow_request() is True
+
+    async def test_exhausted_deadline_keeps_probe_slot_free(self) -> None:
+        """A half-open call that runs out of deadline leaves the probe to the next call."""
+        breaker = get_circuit_breaker("mcp__task__GetIssue")
+        breaker.record_failure()
+        breaker._trip()
+        breaker.opened_at = time.monotonic() - breaker.reset_timeout - 1
+
+        mock_fn = AsyncMock(return_value="ok")
+        with pytest.raises(MCPTimeoutError):
+            await call_mcp_tool_with_retry(
+                "mcp__task__CreateIssue", mock_fn, deadline=time.monotonic() - 1,
+            )
+        mock_fn.assert_not_called()
+        assert breaker.half_open_probes == 0
+
+        assert await call_mcp_tool_with_retry("mcp__task__CreateIssue", mock_fn) == "ok"
+
+    async def test_cancelled_probe_frees_slot(self) -> None:
+        """Cancelling the half-open probe mid-call does not wedge the breaker."""
+        breaker = get_circuit_breaker("mcp__task__GetIssue")
+        breaker._trip()
+        breaker.opened_at = time.monotonic() - breaker.reset_timeout - 1
+        started = asyncio.Event()
+
+        async def _hang() -> str:
+            started.set()
+            await asyncio.Event().wait()
+            return "never"
+
+        task = asyncio.create_task(call_mcp_tool_with_retry("mcp__task__CreateIssue", _hang))
+        await started.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert breaker.state is CircuitState.HALF_OPEN
+        assert breaker.half_open_probes == 0
+        assert await call_mcp_tool_with_retry(
+            "mcp__task__CreateIssue", AsyncMock(return_value="ok"),
+        ) == "ok"
+
+    async def test_client_errors_do_not_trip_breaker(self) -> None:
+        """Non-server errors propagate without counting as breaker failures."""
+        async def _mock_await_with_timeout(coro: Any, timeout: float) -> None:
+            coro.close()
+            raise ValueError("Invalid API key")
+
+        with patch("axon_agent.core.client._await_with_timeout", side_effect=_mock_await_with_timeout):
+            for _ in range(10):
+                with pytest.raises(ValueError):
+                    await call_mcp_tool_with_retry("mcp__task__GetIssue", AsyncMock())
+
+        assert get_circuit_breaker("mcp__task__GetIssue").state is CircuitState.CLOSED
+
+
+# ---------------------------------------------------------------------------
+# Retry-After Tests
+# ---------------------------------------------------------------------------
+
+class _RateLimitError(Exception):
+    """httpx-style error carrying a response with headers."""
+
+    def __init__(self, headers: dict[str, str]) -> None:
+        super().__init__("HTTP 429: Too Many Requests")
+        self.response = type("_Resp", (), {"status_code": 429, "headers": headers})()
+
+
+class TestRetryAfter:
+    """Test server-directed backoff for rate-limited calls."""
+
+    def test_numeric_retry_after(self) -> None:
+        """Numeric Retry-After header is returned as seconds."""
+        assert _extract_retry_after(_RateLimitError({"Retry-After": "8"})) == 8.0
+
+    def test_lowercase_header_name(self) -> None:
+        """Header lookup works for lowercase dict keys too."""
+        assert _extract_retry_after(_RateLimitError({"retry-after": "3"})) == 3.0
+
+    def test_http_date_retry_after(self) -> None:
+        """HTTP-date Retry-After is converted to a relative delay."""
+        with patch("axon_agent.core.client.time.time", return_value=1_700_000_000.0):
+            delay = _extract_retry_after(
+                _RateLimitError({"Retry-After": "Tue, 14 Nov 2023 22:13:30 GMT"})
+            )
+        assert delay == pytest.approx(10.0)
+
+    def test_ratelimit_reset_epoch(self) -> None:
+        """Epoch X-RateLimit-Reset is converted to a relative delay."""
+        with patch("axon_agent.core.client.time.time", return_value=1_700_000_000.0):
+            delay = _extract_retry_after(
+                _RateLimitError({"X-RateLimit-Reset": "1700000012"})
+            )
+        assert delay == pytest.approx(12.0)
+
+    def test_retry_after_in_message(self) -> None:
+        """Retry-After embedded in the error text is honored."""
+        assert _extract_retry_after(Exception("429 rate limited, Retry-After: 4")) == 4.0
+
+    def test_no_hint_returns_none(self) -> None:
+        """Errors without any hint return None."""
+        assert _extract_retry_after(Exception("HTTP 429: Too Many Requests")) is None
+
+    async def test_retry_after_overrides_exponential_backoff(self) -> None:
+        """The sleep honors Retry-After instead of calculate_backoff."""
+        call_count = 0
+
+        async def _mock_await_with_timeout(coro: Any, timeout: float) -> str:
+            nonlocal call_count
+            coro.close()
+            call_count += 1
+            if call_count < 2:
+                raise _RateLimitError({"Retry-After": "8"})
+            return "ok"
+
+        with (
+            patch("axon_agent.core.client._await_with_timeout", side_effect=_mock_await_with_timeout),
+            patch("axon_agent.core.client.asyncio.sleep", new_callable=AsyncMock) as mock_sleep,
+            patch("axon_agent.core.client.calculate_backoff") as mock_backoff,
+        ):
+            result = await call_mcp_tool_with_retry(
+                "mcp__task__GetIssue", AsyncMock(), timeout=5.0, max_retries=3,
+            )
+
+        assert result == "ok"
+        mock_backoff.assert_not_called()
+        slept = mock_sleep.call_args_list[0].args[0]
+        # Jitter only ever extends the server-mandated wait
+        assert 8.0 <= slept <= 8.0 * 1.2
+
+
+# ---------------------------------------------------------------------------
+# Token bucket Tests
+# ---------------------------------------------------------------------------
+
+class TestTokenBucket:
+    """Test client-side admission shaping per MCP server."""
+
+    async def test_burst_within_capacity_does_not_wait(self) -> None:
+        """Calls up to capacity are admitted immediately."""
+        bucket = TokenBucket(base_rate=1.0, capacity=3.0)
+        with patch("axon_agent.core.client.asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+            for _ in range(3):
+                assert await bucket.acquire() == 0.0
+        mock_sleep.assert_not_called()
+
+    async def test_waits_when_empty(self) -> None:
+        """Once drained, each caller waits for its reserved token."""
+        with patch("axon_agent.core.client.time.monotonic", return_value=50.0):
+            bucket = TokenBucket(base_rate=2.0, capacity=1.0)
+            with patch(
+                "axon_agent.core.client.asyncio.sleep", new_callable=AsyncMock,
+            ) as mock_sleep:
+                await bucket.acquire()
+                first = await bucket.acquire()
+                second = await bucket.acquire()
+
+        assert first == pytest.approx(0.5)
+        assert second == pytest.approx(1.0)
+        assert [c.args[0] for c in mock_sleep.call_args_list] == [first, second]
+
+    def test_penalize_halves_rate_and_reward_recovers(self) -> None:
+        """429 halves the rate down to a floor; successes restore it additively."""
+        bucket = TokenBucket(base_rate=2.0, capacity=5.0)
+        bucket.penalize()
+        assert bucket.rate == pytest.approx(1.0)
+        for _ in range(10):
+            bucket.penalize()
+        assert bucket.rate == pytest.approx(0.25)
+        for _ in range(100):
+            bucket.reward()
+        assert bucket.rate == pytest.approx(2.0)
+
+    def test_buckets_only_for_configured_servers(self) -> None:
+        """Servers without a configured limit are not shaped."""
+        assert get_token_bucket("mcp__task__GetIssue") is get_token_bucket(
+            "mcp__task__ListIssues"
+        )
+        assert get_token_bucket("mcp__telegram__SendMessage") is not None
+        assert get_token_bucket("mcp__playwright__browser_click") is None
+
+    async def test_rate_limit_penalizes_bucket(self) -> None:
+        """A 429 during the call lowers the server's admission rate."""
+        call_count = 0
+
+        async def _mock_await_with_timeout(coro: Any, timeout: float) -> str:
+            nonlocal call_count
+            coro.close()
+            call_count += 1
+            if call_count < 2:
+                raise Exception("HTTP 429: Too Many Requests")
+            return "ok"
+
+        bucket = get_token_bucket("mcp__telegram__SendMessage")
+        assert bucket is not None
+        with (
+            patch("axon_agent.core.client._await_with_timeout", side_effect=_mock_await_with_timeout),
+            patch("axon_agent.core.client.asyncio.sleep", new_callable=AsyncMock),
+            patch.object(bucket, "reward"),
+        ):
+            await call_mcp_tool_with_retry(
+                "mcp__telegram__SendMessage", AsyncMock(), timeout=5.0,
+            )
+
+        assert bucket.rate == pytest.approx(bucket.base_rate / 2)
+
+
+# ---------------------------------------------------------------------------
+# Response cache Tests
+# ---------------------------------------------------------------------------
+
+class TestResponseCache:
+    """Test fresh hits and stale fallback for read-only MCP tools."""
+
+    async def test_fresh_hit_skips_call(self) -> None:
+        """A repeat read within the fresh TTL is served from cache."""
+        mock_fn = AsyncMock(return_value={"id": "ENG-1"})
+
+        first = await call_mcp_tool_with_retry("mcp__task__Task_GetIssue", mock_fn, "ENG-1")
+        second = await call_mcp_tool_with_retry("mcp__task__Task_GetIssue", mock_fn, "ENG-1")
+
+        assert first == second == {"id": "ENG-1"}
+        assert mock_fn.await_count == 1
+
+    async def test_different_args_not_shared(self) -> None:
+        """Cache entries are keyed by call arguments."""
+        mock_fn = AsyncMock(side_effect=lambda issue_id: {"id": issue_id})
+
+        await call_mcp_tool_with_retry("mcp__task__Task_GetIssue", mock_fn, issue_id="ENG-1")
+        result = await call_mcp_tool_with_retry(
+            "mcp__task__Task_GetIssue", mock_fn, issue_id="ENG-2",
+        )
+
+        assert result == {"id": "ENG-2"}
+        assert mock_fn.await_count == 2
+
+    async def test_write_tools_not_cached_and_invalidate(self) -> None:
+        """Writes are never cached and drop cached reads of the same server."""
+        read_fn = AsyncMock(return_value={"state": "Todo"})
+        write_fn = AsyncMock(return_value={"ok": True})
+
+        await call_mcp_tool_with_retry("mcp__task__Task_GetIssue", read_fn, "ENG-1")
+        await call_mcp_tool_with_retry("mcp__task__Task_UpdateIssue", write_fn, "ENG-1")
+        await call_mcp_tool_with_retry("mcp__task__Task_UpdateIssue", write_fn, "ENG-1")
+        await call_mcp_tool_with_retry("mcp__task__Task_GetIssue", read_fn, "ENG-1")
+
+        assert write_fn.await_count == 2
+        assert read_fn.await_count == 2
+
+    async def test_stale_served_after_exhausted_retries(self) -> None:
+        """When retries are exhausted a stale cached read is returned instead of raising."""
+        await call_mcp_tool_with_retry(
+            "mcp__task__Task_ListIssues", AsyncMock(return_value=["ENG-1"]),
+        )
+
+        async def _mock_await_with_timeout(coro: Any, timeout: float) -> None:
+            coro.close()
+            raise asyncio.TimeoutError()
+
+        with (
+            patch("axon_agent.core.client.RESPONSE_CACHE_FRESH_TTL_SECONDS", -1.0),
+            patch("axon_agent.core.client._await_with_timeout", side_effect=_mock_await_with_timeout),
+            patch("axon_agent.core.client.asyncio.sleep", new_callable=AsyncMock),
+        ):
+            result = await call_mcp_tool_with_retry(
+                "mcp__task__Task_ListIssues", AsyncMock(), timeout=5.0, max_retries=2,
+            )
+
+        assert result == ["ENG-1"]
+
+    async def test_stale_served_when_circuit_open(self) -> None:
+        """An open circuit serves a stale cached read instead of failing fast."""
+        await call_mcp_tool_with_retry(
+            "mcp__task__Task_ListIssues", AsyncMock(return_value=["ENG-1"]),
+        )
+        breaker = get_circuit_breaker("mcp__task__Task_ListIssues")
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+
+        mock_fn = AsyncMock()
+        with patch("axon_agent.core.client.RESPONSE_CACHE_FRESH_TTL_SECONDS", -1.0):
+            result = await call_mcp_tool_with_retry("mcp__task__Task_ListIssues", mock_fn)
+
+        assert result == ["ENG-1"]
+        mock_fn.assert_not_called()
+
+    async def test_stale_expired_raises(self) -> None:
+        """Entries older than the stale TTL are not served."""
+        await call_mcp_tool_with_retry(
+            "mcp__task__Task_ListIssues", AsyncMock(return_value=["ENG-1"]),
+        )
+        breaker = get_circuit_breaker("mcp__task__Task_ListIssues")
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+
+        with (
+            patch("axon_agent.core.client.RESPONSE_CACHE_FRESH_TTL_SECONDS", -1.0),
+            patch("axon_agent.core.client.RESPONSE_CACHE_STALE_TTL_SECONDS", -1.0),
+        ):
+            with pytest.raises(MCPCircuitOpenError):
+                await call_mcp_tool_with_retry("mcp__task__Task_ListIssues", AsyncMock())
+
+
+class TestDeadlineBudget:
+    """Test the overall deadline budget across retries."""
+
+    async def test_expired_deadline_skips_call(self) -> None:
+        """A deadline already in the past degrades without calling the tool."""
+        call_fn = AsyncMock(return_value="ok")
+
+        with pytest.raises(MCPTimeoutError):
+            await call_mcp_tool_with_retry(
+                "mcp__task__Task_CreateIssue", call_fn, deadline=time.monotonic() - 1,
+            )
+
+        call_fn.assert_not_called()
+
+    async def test_deadline_caps_per_call_timeout(self) -> None:
+        """The attempt timeout shrinks to the remaining budget."""
+        with patch(
+            "axon_agent.core.client._await_with_timeout",
+            AsyncMock(side_effect=asyncio.TimeoutError),
+        ) as mock_wait:
+            with pytest.raises(MCPTimeoutError):
+                await call_mcp_tool_with_retry(
+                    "mcp__task__Task_CreateIssue",
+                    AsyncMock(),
+                    timeout=30.0,
+                    deadline=time.monotonic() + 0.5,
+                )
+
+        assert mock_wait.call_args.kwargs["timeout"] <= 0.5
+
+    async def test_no_retry_when_backoff_exceeds_deadline(self) -> None:
+        """A retry that cannot finish before the deadline is not attempted."""
+        with (
+            patch(
+                "axon_agent.core.client._await_with_timeout",
+                AsyncMock(side_effect=asyncio.TimeoutError),
+            ) as mock_wait,
+            patch("axon_agent.core.client.asyncio.sleep", new_callable=AsyncMock) as mock_sleep,
+        ):
+            with pytest.raises(MCPTimeoutError):
+                await call_mcp_tool_with_retry(
+                    "mcp__task__Task_CreateIssue",
+                    AsyncMock(),
+                    deadline=time.monotonic() + 0.5,
+                )
+
+        assert mock_wait.call_count == 1
+        mock_sleep.assert_not_called()
+
+
 # ---------------------------------------------------------------------------
 # Constants Tests
 # ---------------------------------------------------------------------------
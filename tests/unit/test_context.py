@@ -0,0 +1,769 @@
+"""
+Tests for the context manager module
+====================================
+
+Verifies:
+1. FileCache persists parsed ASTs on disk keyed by source hash (opt-in, private dirs only, LRU-pruned)
+2. Single-pass definition index (functions, classes, methods, structure, docstrings)
+3. extract_function/extract_class are index lookups
+4. Token estimation memo for pluggable tokenizers
+5. FileCache is a bounded LRU
+6. Git diff truncation
+7. Screenshot base64 scrubbing
+8. Tool output truncation dispatch
+9. FileCache refreshes entries modified on disk
+10. Issue context token accounting
+11. Batched budget updates on ContextManager
+12. ContextBudget keeps a running total and renders its usage bar
+13. History summarization action scan
+14. Parallel preloading of file indexes
+15. Non-Python file summaries
+"""
+
+import ast
+import os
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from axon_agent.core.context import (
+    CHARS_PER_TOKEN,
+    GIT_DIFF_MAX_CHARS,
+    TOOL_OUTPUT_MAX_CHARS,
+    ContextBudget,
+    ContextManager,
+    FileCache,
+    _quick_docstring,
+    _TokenEstimator,
+    build_file_index,
+    extract_class,
+    estimate_tokens,
+    extract_function,
+    get_file_summary,
+    truncate_git_diff,
+    truncate_screenshot_output,
+    truncate_tool_output,
+)
+
+
+SAMPLE_SOURCE = '''"""Sample module."""
+
+MAX_ITEMS = 3
+
+
+class Greeter:
+    """Says hello."""
+
+    def greet(self, name):
+        """Return a greeting."""
+        return f"hello {name}"
+
+
+def helper():
+    return 1
+'''
+
+
+class TestFileCacheAstDiskCache:
+    """Test the persistent on-disk AST cache."""
+
+    def test_second_cache_reuses_pickled_tree(self, tmp_path: Path) -> None:
+        """A fresh FileCache loads the tree from disk instead of parsing."""
+        source = tmp_path / "sample.py"
+        source.write_text(SAMPLE_SOURCE)
+        cache_dir = tmp_path / "ast-cache"
+
+        first = FileCache(ast_cache_dir=cache_dir).get_ast(source)
+        with patch("axon_agent.core.context.ast.parse") as mock_parse:
+            second = FileCache(ast_cache_dir=cache_dir).get_ast(source)
+
+        mock_parse.assert_not_called()
+        assert ast.dump(first) == ast.dump(second)
+        assert len(list(cache_dir.glob("*.pkl"))) == 1
+
+    def test_changed_source_reparsed(self, tmp_path: Path) -> None:
+        """Editing the file produces a new cache entry."""
+        source = tmp_path / "sample.py"
+        cache_dir = tmp_path / "ast-cache"
+        source.write_text(SAMPLE_SOURCE)
+        FileCache(ast_cache_dir=cache_dir).get_ast(source)
+
+        source.write_text(SAMPLE_SOURCE + "\nEXTRA = 1\n")
+        tree = FileCache(ast_cache_dir=cache_dir).get_ast(source)
+
+        assert any(
+            isinstance(n, ast.Assign) and n.targets[0].id == "EXTRA" for n in tree.body
+        )
+        assert len(list(cache_dir.glob("*.pkl"))) == 2
+
+    def test_corrupt_entry_falls_back_to_parse(
+        self, tmp_path: Path, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        """An unreadable pickle is logged at debug level, ignored and overwritten."""
+        source = tmp_path / "sample.py"
+        source.write_text(SAMPLE_SOURCE)
+        cache_dir = tmp_path / "ast-cache"
+        FileCache(ast_cache_dir=cache_dir).get_ast(source)
+        for entry in cache_dir.glob("*.pkl"):
+            entry.write_bytes(b"not a pickle")
+
+        with caplog.at_level("DEBUG", logger="context"):
+            tree = FileCache(ast_cache_dir=cache_dir).get_ast(source)
+
+        assert isinstance(tree, ast.Module)
+        assert "Ignoring unreadable AST cache entry" in caplog.text
+
+    def test_disabled_disk_cache(self, tmp_path: Path) -> None:
+        """With no cache dir the tree is parsed in memory only."""
+        source = tmp_path / "sample.py"
+        source.write_text(SAMPLE_SOURCE)
+
+        assert FileCache(ast_cache_dir=None).get_ast(source) is not None
+        assert not (tmp_path / "ast-cache").exists()
+
+    def test_disk_cache_is_opt_in(self) -> None:
+        """A default FileCache keeps trees in memory only; ContextManager opts in."""
+        cache_dir = Path("/nonexistent/ast-cache")
+        with patch("axon_agent.core.context.AST_CACHE_DIR", cache_dir):
+            manager = ContextManager()
+        with patch("axon_agent.core.context.AST_CACHE_DIR", None):
+            default = ContextManager()
+
+        assert FileCache()._ast_cache_dir is None
+        assert manager.cache._ast_cache_dir == cache_dir
+        assert default.cache._ast_cache_dir is None
+
+    def test_prune_removes_least_recently_used(self, tmp_path: Path) -> None:
+        """Pruning deletes the oldest entries until the directory fits the limit."""
+        cache_dir = tmp_path / "ast-cache"
+        cache_dir.mkdir(mode=0o700)
+        for age, name in enumerate(["new", "mid", "old"]):
+            entry = cache_dir / f"{name}.pkl"
+            entry.write_bytes(b"x" * 100)
+            os.utime(entry, ns=(0, (10 - age) * 10**9))
+
+        removed = FileCache(ast_cache_dir=cache_dir).prune_disk_cache(200)
+
+        assert removed == 1
+        assert sorted(p.stem for p in cache_dir.glob("*.pkl")) == ["mid", "new"]
+
+    def test_disk_hit_refreshes_recency(self, tmp_path: Path) -> None:
+        """Loading a tree from disk marks it recently used."""
+        source = tmp_path / "sample.py"
+        source.write_text(SAMPLE_SOURCE)
+        cache_dir = tmp_path / "ast-cache"
+        FileCache(ast_cache_dir=cache_dir).get_ast(source)
+        (entry,) = cache_dir.glob("*.pkl")
+        os.utime(entry, ns=(0, 0))
+
+        FileCache(ast_cache_dir=cache_dir).get_ast(source)
+
+        assert entry.stat().st_mtime_ns > 0
+
+    def test_created_dir_is_private(self, tmp_path: Path) -> None:
+        """The cache directory is created readable by the owner only."""
+        source = tmp_path / "sample.py"
+        source.write_text(SAMPLE_SOURCE)
+        cache_dir = tmp_path / "ast-cache"
+
+        FileCache(ast_cache_dir=cache_dir).get_ast(source)
+
+        assert cache_dir.stat().st_mode & 0o077 == 0
+
+    def test_shared_dir_not_used(self, tmp_path: Path) -> None:
+        """A group/world-writable cache directory is ignored, not unpickled from."""
+        source = tmp_path / "sample.py"
+        source.write_text(SAMPLE_SOURCE)
+        cache_dir = tmp_path / "ast-cache"
+        cache_dir.mkdir()
+        os.chmod(cache_dir, 0o777)
+
+        cache = FileCache(ast_cache_dir=cache_dir)
+
+        assert cache._ast_cache_dir is None
+        assert cache.get_ast(source) is not None
+        assert list(cache_dir.iterdir()) == []
+
+
+class TestFileIndex:
+    """Test the single-pass definition index."""
+
+    def test_index_spans_and_structure(self, tmp_path: Path) -> None:
+        """One pass records functions, classes, methods and module structure."""
+        source = tmp_path / "sample.py"
+        source.write_text(SAMPLE_SOURCE)
+
+        index = FileCache(ast_cache_dir=None).get_index(source)
+        lines = SAMPLE_SOURCE.splitlines()
+
+        start, end = index.functions["helper"]
+        assert lines[start:end] == ["def helper():", "    return 1"]
+        assert index.methods["greet"][0] == "Greeter"
+        assert lines[index.classes["Greeter"][0]] == "class Greeter:"
+        assert index.structure["constants"] == ["MAX_ITEMS"]
+        assert [c["name"] for c in index.structure["classes"]] == ["Greeter"]
+        assert index.structure["classes"][0]["methods"][0]["docstring"] == "Return a greeting."
+
+    def test_nested_definitions_indexed(self) -> None:
+        """Definitions inside functions and conditionals are found too."""
+        tree = ast.parse(
+            "if True:\n"
+            "    def outer():\n"
+            "        def inner():\n"
+            "            pass\n"
+            "        class Local:\n"
+            "            def method(self):\n"
+            "                pass\n"
+        )
+
+        index = build_file_index(tree)
+
+        assert set(index.functions) == {"outer", "inner"}
+        assert index.methods["method"][0] == "Local"
+        assert index.structure["functions"] == []
+
+    def test_structure_cached_with_index(self, tmp_path: Path) -> None:
+        """get_structure reuses the cached index instead of rebuilding it."""
+        source = tmp_path / "sample.py"
+        source.write_text(SAMPLE_SOURCE)
+        cache = FileCache(ast_cache_dir=None)
+
+        assert cache.get_structure(source) is cache.get_index(source).structure
+
+
+class TestQuickDocstring:
+    """Test the docstring fast path used by the definition index."""
+
+    def test_matches_ast_get_docstring(self) -> None:
+        """One-line, multi-line, missing and non-str docstrings agree with ast."""
+        sources = [
+            'def f():\n    """  One line\twith tab  """\n',
+            'class C:\n    """Summary.\n\n        Indented detail.\n    """\n',
+            "def f():\n    return 1\n",
+            "def f():\n    b'bytes'\n",
+        ]
+        for source in sources:
+            node = ast.parse(source).body[0]
+            assert _quick_docstring(node) == ast.get_docstring(node), source
+
+
+class TestExtractDefinitions:
+    """Test extracting single definitions via the index."""
+
+    def test_extract_function(self, tmp_path: Path) -> None:
+        """Top-level functions are returned verbatim."""
+        source = tmp_path / "sample.py"
+        source.write_text(SAMPLE_SOURCE)
+
+        cache = FileCache(ast_cache_dir=None)
+
+        assert extract_function(source, "helper", cache) == "def helper():\n    return 1"
+
+    def test_extract_method_with_class_header(self, tmp_path: Path) -> None:
+        """Methods come with their class header, by plain or qualified name."""
+        source = tmp_path / "sample.py"
+        source.write_text(SAMPLE_SOURCE)
+        cache = FileCache(ast_cache_dir=None)
+
+        plain = extract_function(source, "greet", cache)
+        qualified = extract_function(source, "Greeter.greet", cache)
+
+        assert plain == qualified
+        assert plain.startswith("class Greeter:\n    ...\n    def greet(self, name):")
+        assert extract_function(source, "Other.greet", cache) is None
+
+    def test_extract_class(self, tmp_path: Path) -> None:
+        """Classes are returned from header to last line."""
+        source = tmp_path / "sample.py"
+        source.write_text(SAMPLE_SOURCE)
+
+        cache = FileCache(ast_cache_dir=None)
+
+        result = extract_class(source, "Greeter", cache)
+
+        assert result.startswith("class Greeter:")
+        assert result.endswith('return f"hello {name}"')
+        assert extract_class(source, "Missing", cache) is None
+
+    def test_lookup_does_not_walk_tree(self, tmp_path: Path) -> None:
+        """Repeated extractions reuse the index rather than walking the AST."""
+        source = tmp_path / "sample.py"
+        source.write_text(SAMPLE_SOURCE)
+        cache = FileCache(ast_cache_dir=None)
+        cache.get_index(source)
+
+        with patch("axon_agent.core.context.ast.walk") as mock_walk:
+            extract_function(source, "helper", cache)
+            extract_class(source, "Greeter", cache)
+
+        mock_walk.assert_not_called()
+
+
+class TestTokenEstimator:
+    """Test token estimation and its memo for real tokenizers."""
+
+    def test_default_heuristic(self) -> None:
+        """Without a tokenizer the estimate is chars / CHARS_PER_TOKEN."""
+        assert estimate_tokens("") == 0
+        assert estimate_tokens("x" * 40) == 40 // CHARS_PER_TOKEN
+
+    def test_tokenizer_memoized(self) -> None:
+        """Repeated texts hit the memo instead of the tokenizer."""
+        count = MagicMock(side_effect=lambda text: len(text.split()))
+        estimator = _TokenEstimator(count)
+
+        assert estimator("a b c") == 3
+        assert estimator("a b c") == 3
+        assert estimator("a b") == 2
+        assert count.call_count == 2
+
+    def test_memo_bounded(self) -> None:
+        """The oldest entry is evicted once the memo is full."""
+        count = MagicMock(side_effect=len)
+        estimator = _TokenEstimator(count, maxsize=2)
+
+        estimator("one")
+        estimator("two")
+        estimator("three")
+        estimator("one")
+
+        assert count.call_count == 4
+
+
+class TestFileCacheLru:
+    """Test the bounded in-memory FileCache."""
+
+    def _write(self, tmp_path: Path, name: str, text: str) -> Path:
+        path = tmp_path / name
+        path.write_text(text)
+        return path
+
+    def test_evicts_least_recently_used(self, tmp_path: Path) -> None:
+        """Past max_entries the oldest untouched file is dropped from every cache."""
+        a, b, c = (self._write(tmp_path, f"{n}.py", SAMPLE_SOURCE) for n in "abc")
+        cache = FileCache(ast_cache_dir=None, max_entries=2)
+
+        cache.get_index(a)
+        cache.get_index(b)
+        cache.get_index(a)  # a is now most recent
+        cache.get_content(c)
+
+        assert set(cache._content_cache) == {str(a), str(c)}
+        assert str(b) not in cache._ast_cache
+        assert str(b) not in cache._index_cache
+
+    def test_content_size_cap(self, tmp_path: Path) -> None:
+        """Total cached text stays under max_content_chars."""
+        cache = FileCache(ast_cache_dir=None, max_content_chars=15)
+        for name in ("one.txt", "two.txt", "three.txt"):
+            cache.get_content(self._write(tmp_path, name, "x" * 10))
+
+        assert list(cache._content_cache) == [str(tmp_path / "three.txt")]
+        assert cache._content_chars == 10
+
+    def test_evicted_file_reloaded(self, tmp_path: Path) -> None:
+        """An evicted file is read again on the next access."""
+        a = self._write(tmp_path, "a.txt", "first")
+        b = self._write(tmp_path, "b.txt", "second")
+        cache = FileCache(ast_cache_dir=None, max_entries=1)
+
+        cache.get_content(a)
+        cache.get_content(b)
+        a.write_text("changed")
+
+        assert cache.get_content(a) == "changed"
+
+    def test_python_keys_tracked_with_entries(self, tmp_path: Path) -> None:
+        """Python sources are classified on insert and dropped on eviction."""
+        source = self._write(tmp_path, "mod.py", "X = 1\n")
+        notes = self._write(tmp_path, "notes.txt", "X = 1\n")
+        cache = FileCache(ast_cache_dir=None, max_entries=1)
+
+        assert cache.get_ast(source) is not None
+        assert cache.get_ast(notes) is None
+        assert cache._py_files == set()
+
+
+class TestTruncateGitDiff:
+    """Test git diff truncation."""
+
+    def test_short_diff_untouched(self) -> None:
+        """Diffs within the limit are returned unchanged."""
+        diff = "diff --git a/x b/x\n+1\n"
+        assert truncate_git_diff(diff) == (diff, False)
+
+    def test_keeps_whole_lines_and_reports_files(self) -> None:
+        """Output stops on a line boundary and summarises remaining files."""
+        file_diff = "diff --git a/f b/f\n" + "+line of added code\n" * 40
+        diff = file_diff * 10
+
+        result, truncated = truncate_git_diff(diff)
+
+        head, _, summary = result.rpartition("\n\n")
+        assert truncated
+        assert diff.startswith(head + "\n")
+        assert len(head) <= GIT_DIFF_MAX_CHARS - 200
+        assert summary.startswith("[...truncated, showing 4/10 files")
+
+    def test_single_oversized_line(self) -> None:
+        """A first line over the budget yields only the summary."""
+        diff = "x" * (GIT_DIFF_MAX_CHARS + 1) + "\ndiff --git a/f b/f\n"
+
+        result, truncated = truncate_git_diff(diff)
+
+        assert truncated
+        assert result.startswith("\n[...truncated, showing 0/1 files")
+
+
+class TestTruncateScreenshotOutput:
+    """Test base64 image scrubbing."""
+
+    def test_replaces_every_data_url(self) -> None:
+        """All embedded images are replaced and reported as truncated."""
+        output = "saved shot.png data:image/png;base64,AAAA== and data:image/jpeg;base64,BBBB"
+
+        cleaned, truncated = truncate_screenshot_output(output)
+
+        assert truncated
+        assert "base64," not in cleaned
+        assert cleaned.count("[base64 image data removed") == 2
+        assert cleaned.startswith("saved shot.png ")
+
+    def test_no_image_untouched(self) -> None:
+        """Plain text is returned as-is."""
+        assert truncate_screenshot_output("mentions base64 only") == ("mentions base64 only", False)
+
+
+class TestTruncateToolOutput:
+    """Test tool output dispatch and truncation."""
+
+    def test_diff_marker_case_insensitive(self) -> None:
+        """Bash output mentioning DIFF in any case goes to the diff truncator."""
+        with patch(
+            "axon_agent.core.context.truncate_git_diff", return_value=("cut", True)
+        ) as mock_diff:
+            output = "DIFF --GIT" + "+" * GIT_DIFF_MAX_CHARS
+            assert truncate_tool_output(output, "Bash") == ("cut", True)
+
+        mock_diff.assert_called_once()
+
+    def test_image_marker_case_insensitive(self) -> None:
+        """Outputs mentioning Base64 or DATA:IMAGE are scrubbed."""
+        with patch(
+            "axon_agent.core.context.truncate_screenshot_output", return_value=("x", False)
+        ) as mock_scrub:
+            truncate_tool_output("BASE64 payload" + "x" * TOOL_OUTPUT_MAX_CHARS, "Read")
+            truncate_tool_output("Data:Image/png" + "x" * TOOL_OUTPUT_MAX_CHARS, "Read")
+
+        assert mock_scrub.call_count == 2
+
+    def test_short_output_skips_dispatch(self) -> None:
+        """Outputs under the limits are returned without marker searches."""
+        with (
+            patch("axon_agent.core.context._DIFF_MARKER_RE") as mock_diff,
+            patch("axon_agent.core.context._IMAGE_MARKER_RE") as mock_image,
+        ):
+            assert truncate_tool_output("diff base64", "Bash") == ("diff base64", False)
+
+        mock_diff.search.assert_not_called()
+        mock_image.search.assert_not_called()
+
+    def test_short_output_image_still_scrubbed(self) -> None:
+        """Embedded image data is removed even from short outputs."""
+        output = "saved shot.png data:image/png;base64,iVBORw0KGgo="
+
+        result, truncated = truncate_tool_output(output, "Read")
+
+        assert truncated
+        assert "iVBOR" not in result
+        assert result.startswith("saved shot.png")
+
+    def test_long_output_head_and_tail(self) -> None:
+        """Plain long output keeps the head and tail around a marker."""
+        output = "a" * TOOL_OUTPUT_MAX_CHARS + "b" * TOOL_OUTPUT_MAX_CHARS
+
+        result, truncated = truncate_tool_output(output, "Read")
+
+        assert truncated
+        assert result.startswith("a" * 100)
+        assert result.endswith("b" * 100)
+        assert "[...truncated" in result
+
+
+class TestFileCacheFreshness:
+    """Test mtime/size based invalidation of FileCache entries."""
+
+    def test_modified_file_reread_and_reparsed(self, tmp_path: Path) -> None:
+        """Changing a file refreshes its content and index without invalidate()."""
+        source = tmp_path / "sample.py"
+        source.write_text(SAMPLE_SOURCE)
+        cache = FileCache(ast_cache_dir=None)
+        assert "added" not in cache.get_index(source).functions
+
+        source.write_text(SAMPLE_SOURCE + "\n\ndef added():\n    pass\n")
+
+        assert cache.get_content(source).endswith("pass\n")
+        assert "added" in cache.get_index(source).functions
+
+    def test_unchanged_file_not_reread(self, tmp_path: Path) -> None:
+        """A matching fingerprint serves the cached content."""
+        source = tmp_path / "notes.txt"
+        source.write_text("hello")
+        cache = FileCache(ast_cache_dir=None)
+        cache.get_content(source)
+
+        with patch.object(Path, "read_bytes") as mock_read:
+            assert cache.get_content(source) == "hello"
+
+        mock_read.assert_not_called()
+
+    def test_content_decoded_as_utf8(self, tmp_path: Path) -> None:
+        """Files are read as UTF-8 and invalid bytes are replaced."""
+        source = tmp_path / "notes.txt"
+        source.write_bytes("привет".encode() + b"\xff")
+        cache = FileCache(ast_cache_dir=None)
+
+        assert cache.get_content(source) == "привет\ufffd"
+
+    def test_deleted_file_dropped(self, tmp_path: Path) -> None:
+        """A file removed from disk is evicted and reported missing."""
+        source = tmp_path / "notes.txt"
+        source.write_text("hello")
+        cache = FileCache(ast_cache_dir=None)
+        cache.get_content(source)
+
+        source.unlink()
+
+        assert cache.get_content(source) is None
+        assert cache._content_chars == 0
+
+
+class TestIssueContextTokens:
+    """Test issue context token accounting."""
+
+    def test_dict_issue_estimated_from_values(self) -> None:
+        """Dict issues are sized from their values, not str(issue)."""
+        manager = ContextManager()
+        issue = {"id": "ENG-1", "title": "t" * 40, "description": "d" * 400, "priority": 2}
+
+        manager.set_issue_context(issue)
+
+        expected = sum(
+            estimate_tokens(v if isinstance(v, str) else repr(v)) for v in issue.values()
+        )
+        assert manager.budget.breakdown["issue"] == expected
+
+    def test_string_issue(self) -> None:
+        """Plain text issues use the text length."""
+        manager = ContextManager()
+        manager.set_issue_context("x" * 400)
+
+        assert manager.budget.breakdown["issue"] == estimate_tokens("x" * 400)
+
+
+class TestBatchedBudgetUpdates:
+    """Test queued token deltas on ContextManager."""
+
+    def test_deltas_applied_on_budget_read(self) -> None:
+        """History and tool output tokens are visible through budget."""
+        manager = ContextManager()
+        with patch("builtins.print"):
+            manager.add_to_history("user", "x" * 40)
+            manager.add_to_history("assistant", "y" * 80)
+            manager.track_tool_output("Read", "z" * 400)
+
+        assert manager.budget.breakdown["history"] == 30
+        assert manager.budget.breakdown["tool_outputs"] == 100
+        assert manager.get_stats()["total_used"] == 130
+
+    def test_one_budget_update_per_category(self) -> None:
+        """Queued deltas are folded into a single add() per category."""
+        manager = ContextManager()
+        for _ in range(10):
+            manager.add_to_history("user", "x" * 40)
+
+        with patch.object(ContextBudget, "add", autospec=True) as mock_add:
+            manager.budget
+
+        mock_add.assert_called_once_with(manager._budget, "history", 100)
+
+    def test_set_overrides_queued_delta(self) -> None:
+        """A later set() wins over deltas queued before it."""
+        manager = ContextManager()
+        manager.add_to_history("user", "x" * 400)
+        manager.budget.set("history", 7)
+
+        assert manager.budget.breakdown["history"] == 7
+
+    def test_reset_discards_queued_deltas(self) -> None:
+        """reset() starts from an empty budget."""
+        manager = ContextManager()
+        manager.add_to_history("user", "x" * 400)
+        manager.reset()
+
+        assert manager.budget.total_used == 0
+
+
+class TestContextBudgetTotal:
+    """Test the incrementally maintained ContextBudget total."""
+
+    def test_total_tracks_add_and_set(self) -> None:
+        """add() and set() keep total_used equal to the breakdown sum."""
+        budget = ContextBudget(max_tokens=1000)
+        budget.add("files", 300)
+        budget.add("history", 200)
+        budget.set("history", 50)
+        budget.add("unknown", 999)
+
+        assert budget.total_used == 350 == sum(budget.breakdown.values())
+        assert budget.remaining == 650
+
+    def test_total_from_initial_breakdown(self) -> None:
+        """A budget constructed with a breakdown starts from its sum."""
+        budget = ContextBudget(max_tokens=100, breakdown={"files": 80, "history": 5})
+
+        assert budget.total_used == 85
+        assert budget.is_warning
+
+    def test_display_bar_padded_to_width(self) -> None:
+        """The usage bar is always 30 cells between the brackets."""
+        budget = ContextBudget(max_tokens=100, breakdown={"files": 50})
+
+        bar = budget.format_display().splitlines()[1]
+
+        assert bar == "[" + "=" * 15 + " " * 15 + "]"
+
+    def test_derived_values_follow_updates(self) -> None:
+        """Memoised ratio and mode refresh after add(), set() and max_tokens changes."""
+        budget = ContextBudget(max_tokens=100)
+        assert budget.mode == "normal"
+
+        budget.add("files", 75)
+        assert (budget.usage_ratio, budget.mode) == (0.75, "compact")
+
+        budget.set("files", 90)
+        assert budget.is_critical and budget.mode == "critical"
+
+        budget.max_tokens = 1000
+        assert budget.usage_percent == 9.0
+        assert budget.mode == "normal"
+
+    def test_derived_values_memoised(self) -> None:
+        """Repeated reads between updates reuse the cached derivation."""
+        budget = ContextBudget(max_tokens=100, breakdown={"files": 10})
+        first = budget._derive()
+
+        assert budget._derive() is first
+        budget.add("files", 1)
+        assert budget._derive() is not first
+
+
+class TestSummarizeHistory:
+    """Test summarizing older conversation history."""
+
+    def test_one_action_per_message_by_priority(self) -> None:
+        """Each old message contributes its highest-priority action only."""
+        manager = ContextManager()
+        manager._history = [
+            {"role": "user", "content": "Implement it, then TEST and Commit"},
+            {"role": "user", "content": "run the tests"},
+            {"role": "user", "content": "hello"},
+            {"role": "user", "content": "recent"},
+        ]
+
+        summary = manager.summarize_history(keep_recent=1)[0]["content"]
+
+        assert summary == "[Previous 3 messages summarized: commit, test]"
+
+    def test_actions_in_first_seen_order(self) -> None:
+        """Actions are listed once each, in the order they first appear."""
+        manager = ContextManager()
+        manager._history = [
+            {"role": "user", "content": "implement"},
+            {"role": "user", "content": "test"},
+            {"role": "user", "content": "implement again"},
+            {"role": "user", "content": "recent"},
+        ]
+
+        summary = manager.summarize_history(keep_recent=1)[0]["content"]
+
+        assert summary == "[Previous 3 messages summarized: implement, test]"
+
+    def test_no_actions_is_general_discussion(self) -> None:
+        """Old messages without key actions are summarized generically."""
+        manager = ContextManager()
+        manager._history = [{"role": "user", "content": "hi"}] * 3
+
+        summary = manager.summarize_history(keep_recent=1)[0]["content"]
+
+        assert summary == "[Previous 2 messages summarized: general discussion]"
+
+
+class TestPreloadSummaries:
+    """Test indexing many files up front in worker processes."""
+
+    def _write_sources(self, tmp_path: Path, count: int) -> list[Path]:
+        paths = []
+        for i in range(count):
+            path = tmp_path / f"mod{i}.py"
+            path.write_text(f"def func{i}():\n    return {i}\n")
+            paths.append(path)
+        return paths
+
+    def test_pool_results_served_without_parsing(self, tmp_path: Path) -> None:
+        """Indexes built by workers are used directly by the parent cache."""
+        paths = self._write_sources(tmp_path, 3)
+        manager = ContextManager()
+        manager.cache = FileCache(ast_cache_dir=None)
+
+        assert manager.cache.preload(paths + [tmp_path / "notes.txt"], max_workers=2) == 3
+
+        with patch("axon_agent.core.context.ast.parse") as mock_parse:
+            summary = get_file_summary(paths[1], manager.cache)
+
+        mock_parse.assert_not_called()
+        assert "func1" in summary
+
+    def test_preloaded_index_refreshed_on_change(self, tmp_path: Path) -> None:
+        """A file edited after preloading is re-indexed on the next access."""
+        paths = self._write_sources(tmp_path, 2)
+        cache = FileCache(ast_cache_dir=None)
+        cache.preload(paths, max_workers=2)
+
+        paths[0].write_text("def renamed():\n    pass\n")
+
+        assert set(cache.get_index(paths[0]).functions) == {"renamed"}
+
+    def test_single_file_indexed_in_process(self, tmp_path: Path) -> None:
+        """Small batches skip the process pool."""
+        paths = self._write_sources(tmp_path, 1)
+        manager = ContextManager()
+        manager.cache = FileCache(ast_cache_dir=None)
+
+        with patch("axon_agent.core.context.ProcessPoolExecutor") as mock_pool:
+            assert manager.preload_summaries(paths) == 1
+
+        mock_pool.assert_not_called()
+        assert "func0" in manager.cache.get_index(paths[0]).functions
+
+
+class TestNonPythonSummary:
+    """Test summaries of files that are not Python source."""
+
+    def test_head_and_remaining_count(self, tmp_path: Path) -> None:
+        """The first 10 lines are shown with a count of the rest."""
+        path = tmp_path / "notes.md"
+        path.write_text("\n".join(f"line {i}" for i in range(25)))
+
+        summary = get_file_summary(path, FileCache(ast_cache_dir=None))
+
+        assert summary.splitlines()[1:11] == [f"line {i}" for i in range(10)]
+        assert summary.endswith("... (15 more lines)")
+
+    def test_short_file_without_count(self, tmp_path: Path) -> None:
+        """Files of up to 10 lines are shown whole."""
+        path = tmp_path / "notes.md"
+        path.write_text("a\nb\n")
+
+        assert get_file_summary(path, FileCache(ast_cache_dir=None)) == "# notes.md\na\nb"
@@ -0,0 +1,67 @@
+"""
+Tests for the event loop monitor
+================================
+
+Verifies:
+1. Synchronous stalls are reported with their duration and offending stack
+2. A responsive loop produces no reports
+3. A failing reporter is logged and does not stop the watcher
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from axon_agent.monitoring.loop_monitor import event_loop_monitor
+
+
+def _blocking_sleep() -> None:
+    time.sleep(0.3)
+
+
+class TestEventLoopMonitor:
+    """Test stall detection on the running loop."""
+
+    async def test_reports_blocking_call(self) -> None:
+        """A blocking call on the loop thread is reported with its stack."""
+        reports: list[tuple[float, str]] = []
+
+        with event_loop_monitor(50.0, lambda ms, stack: reports.append((ms, stack)), interval=0.02):
+            await asyncio.sleep(0.05)
+            _blocking_sleep()
+            await asyncio.sleep(0.1)
+
+        assert reports
+        duration_ms, stack = reports[0]
+        assert duration_ms >= 50
+        assert "_blocking_sleep" in stack
+
+    async def test_responsive_loop_not_reported(self) -> None:
+        """Awaiting without blocking never triggers the callback."""
+        reports: list[tuple[float, str]] = []
+
+        with event_loop_monitor(200.0, lambda ms, stack: reports.append((ms, stack)), interval=0.02):
+            for _ in range(10):
+                await asyncio.sleep(0.01)
+
+        assert reports == []
+
+    async def test_failing_reporter_keeps_watching(self, caplog: pytest.LogCaptureFixture) -> None:
+        """An exception from the callback is logged at debug level and later stalls are still reported."""
+        calls: list[float] = []
+
+        def report(ms: float, stack: str) -> None:
+            calls.append(ms)
+            raise RuntimeError("reporter down")
+
+        with caplog.at_level("DEBUG", logger="loop_monitor"):
+            with event_loop_monitor(50.0, report, interval=0.02):
+                await asyncio.sleep(0.05)
+                _blocking_sleep()
+                await asyncio.sleep(0.1)
+                _blocking_sleep()
+                await asyncio.sleep(0.1)
+
+        assert len(calls) >= 2
+        assert "Blocking-call reporter failed" in caplog.text
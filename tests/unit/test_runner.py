@@ -0,0 +1,357 @@
+"""
+Tests for the autonomous agent runner (ENG-52)
+==============================================
+
+Verifies:
+1. Pause waits wake on file removal events and fall back to polling
+2. Telegram credentials are read once per process
+3. Pause checks stat the marker file off the event loop
+4. Task prompts are rebuilt only when their input files change
+5. Burst pause checks are served from a short-lived cache
+6. One SDK client is reused across iterations when /clear is available
+7. A context-limit stop replaces the client rather than reusing it
+"""
+
+import asyncio
+import contextlib
+import os
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from axon_agent.core.runner import (
+    _get_telegram_creds,
+    _maybe_rebuild_prompt,
+    _pause_cache,
+    _prompt_cache,
+    _ReusableClient,
+    _wait_for_file_removal,
+    is_agent_paused,
+    is_agent_paused_async,
+    run_autonomous_agent,
+    wait_while_paused,
+)
+from axon_agent.core.session import SESSION_CONTEXT_LIMIT, SESSION_CONTINUE, SessionResult
+
+
+class _FakeWatcher:
+    """In-memory stand-in for an asyncinotify.Inotify instance."""
+
+    def __init__(self) -> None:
+        self.events: asyncio.Queue = asyncio.Queue()
+        self.closed = False
+
+    def __enter__(self) -> "_FakeWatcher":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.closed = True
+
+    def __aiter__(self) -> "_FakeWatcher":
+        return self
+
+    async def __anext__(self) -> SimpleNamespace:
+        return await self.events.get()
+
+
+class TestWaitForFileRemoval:
+    """Test waiting for the PAUSED marker to disappear."""
+
+    async def test_wakes_on_delete_event(self, tmp_path: Path) -> None:
+        """A matching delete event ends the wait without a recheck timeout."""
+        paused = tmp_path / "PAUSED"
+        paused.touch()
+        watcher = _FakeWatcher()
+
+        async def _resume() -> None:
+            await asyncio.sleep(0.01)
+            watcher.events.put_nowait(SimpleNamespace(name=Path("other")))
+            paused.unlink()
+            watcher.events.put_nowait(SimpleNamespace(name=Path("PAUSED")))
+
+        with patch("axon_agent.core.runner._open_removal_watcher", return_value=watcher):
+            await asyncio.wait_for(
+                asyncio.gather(_wait_for_file_removal(paused, 60), _resume()), timeout=5
+            )
+
+        assert watcher.closed
+
+    async def test_polls_without_watcher(self, tmp_path: Path) -> None:
+        """Without inotify the file is rechecked every interval."""
+        paused = tmp_path / "PAUSED"
+        paused.touch()
+
+        async def _resume() -> None:
+            await asyncio.sleep(0.02)
+            paused.unlink()
+
+        with patch("axon_agent.core.runner._open_removal_watcher", return_value=None):
+            await asyncio.wait_for(
+                asyncio.gather(_wait_for_file_removal(paused, 0.01), _resume()), timeout=5
+            )
+
+        assert not paused.exists()
+
+    async def test_not_paused_returns_immediately(self, tmp_path: Path) -> None:
+        """No PAUSED file means no wait at all."""
+        with patch("axon_agent.core.runner._wait_for_file_removal") as mock_wait:
+            assert await wait_while_paused(tmp_path) is False
+
+        mock_wait.assert_not_called()
+
+
+class TestResumeNotification:
+    """Test the Telegram notification sent on resume."""
+
+    async def test_credentials_loaded_once(self, tmp_path: Path) -> None:
+        """Repeated resumes reuse the cached token and chat id."""
+        _get_telegram_creds.cache_clear()
+        http_client = MagicMock(post=AsyncMock())
+        with (
+            patch("axon_agent.core.runner.is_agent_paused", return_value=True),
+            patch("axon_agent.core.runner._wait_for_file_removal", AsyncMock()),
+            patch("axon_agent.core.runner.get_mcp_http_client", return_value=http_client),
+            patch("axon_agent.core.runner.load_dotenv") as mock_dotenv,
+            patch.dict("os.environ", {"TELEGRAM_BOT_TOKEN": "t", "TELEGRAM_CHAT_ID": "c"}),
+        ):
+            assert await wait_while_paused(tmp_path) is True
+            assert await wait_while_paused(tmp_path) is True
+        _get_telegram_creds.cache_clear()
+
+        mock_dotenv.assert_called_once_with(tmp_path / ".env")
+        assert http_client.post.await_count == 2
+        assert http_client.post.call_args.kwargs["json"]["chat_id"] == "c"
+
+
+class TestAsyncPauseCheck:
+    """Test the non-blocking pause check."""
+
+    async def test_reports_marker_presence(self, tmp_path: Path) -> None:
+        """The async check mirrors the PAUSED marker on disk."""
+        _pause_cache.clear()
+        assert await is_agent_paused_async(tmp_path) is False
+
+        (tmp_path / ".agent").mkdir()
+        (tmp_path / ".agent" / "PAUSED").touch()
+        _pause_cache.clear()
+
+        assert await is_agent_paused_async(tmp_path) is True
+        _pause_cache.clear()
+
+
+class TestPauseCache:
+    """Test the short-lived cache in front of the PAUSED stat."""
+
+    def test_burst_checks_reuse_result(self, tmp_path: Path) -> None:
+        """Checks within the TTL do not touch the filesystem."""
+        _pause_cache.clear()
+        assert is_agent_paused(tmp_path) is False
+
+        with patch("axon_agent.core.runner.Path.exists") as mock_exists:
+            assert is_agent_paused(tmp_path) is False
+        _pause_cache.clear()
+
+        mock_exists.assert_not_called()
+
+    def test_expired_entry_rechecked(self, tmp_path: Path) -> None:
+        """After the TTL the marker is stat'ed again."""
+        _pause_cache.clear()
+        assert is_agent_paused(tmp_path) is False
+        (tmp_path / ".agent").mkdir()
+        (tmp_path / ".agent" / "PAUSED").touch()
+
+        with patch("axon_agent.core.runner.PAUSE_CACHE_TTL_SECONDS", 0.0):
+            assert is_agent_paused(tmp_path) is True
+        _pause_cache.clear()
+
+    async def test_resume_invalidates_cache(self, tmp_path: Path) -> None:
+        """Once the marker is gone the next check does not report a stale pause."""
+        _pause_cache.clear()
+        (tmp_path / ".agent").mkdir()
+        (tmp_path / ".agent" / "PAUSED").touch()
+
+        with (
+            patch("axon_agent.core.runner._wait_for_file_removal", AsyncMock()),
+            patch("axon_agent.core.runner._get_telegram_creds", return_value=("", "")),
+        ):
+            assert await wait_while_paused(tmp_path) is True
+        (tmp_path / ".agent" / "PAUSED").unlink()
+
+        assert is_agent_paused(tmp_path) is False
+        _pause_cache.clear()
+
+
+class TestPromptCache:
+    """Test memoization of the per-iteration task prompts."""
+
+    def _project(self, tmp_path: Path) -> Path:
+        agent_dir = tmp_path / ".agent"
+        agent_dir.mkdir()
+        (agent_dir / "PROJECT_MAP.md").write_text("map")
+        (agent_dir / "MEMORY.md").write_text("memory v1")
+        return tmp_path
+
+    def test_unchanged_inputs_reuse_prompt(self, tmp_path: Path) -> None:
+        """A second build with the same files does not call the builder."""
+        project_dir = self._project(tmp_path)
+        _prompt_cache.clear()
+        builder = MagicMock(return_value="prompt")
+
+        with patch.dict("axon_agent.core.runner._PROMPT_BUILDERS", {"execute": builder}):
+            assert _maybe_rebuild_prompt("execute", "ENG", project_dir) == "prompt"
+            assert _maybe_rebuild_prompt("execute", "ENG", project_dir) == "prompt"
+        _prompt_cache.clear()
+
+        builder.assert_called_once_with("ENG", project_dir)
+
+    def test_memory_change_rebuilds(self, tmp_path: Path) -> None:
+        """Editing MEMORY.md invalidates the cached prompt."""
+        project_dir = self._project(tmp_path)
+        _prompt_cache.clear()
+
+        first = _maybe_rebuild_prompt("execute", "ENG", project_dir)
+        (project_dir / ".agent" / "MEMORY.md").write_text("memory v2 (longer)")
+        second = _maybe_rebuild_prompt("execute", "ENG", project_dir)
+        _prompt_cache.clear()
+
+        assert "memory v1" in first
+        assert "memory v2" in second
+
+    def test_stale_project_map_not_cached(self, tmp_path: Path) -> None:
+        """A stale project map always goes through the builder to be refreshed."""
+        project_dir = self._project(tmp_path)
+        old = time.time() - 2 * 3600
+        os.utime(project_dir / ".agent" / "PROJECT_MAP.md", (old, old))
+        _prompt_cache.clear()
+        builder = MagicMock(return_value="prompt")
+
+        with patch.dict("axon_agent.core.runner._PROMPT_BUILDERS", {"continuation": builder}):
+            _maybe_rebuild_prompt("continuation", "ENG", project_dir)
+            _maybe_rebuild_prompt("continuation", "ENG", project_dir)
+        _prompt_cache.clear()
+
+        assert builder.call_count == 2
+
+
+def _sdk_client(commands: list[object]) -> MagicMock:
+    """Build a connected SDK client stub advertising the given commands."""
+
+    async def _receive():
+        return
+        yield
+
+    client = MagicMock()
+    client.connect = AsyncMock()
+    client.disconnect = AsyncMock()
+    client.query = AsyncMock()
+    client.get_server_info = AsyncMock(return_value={"commands": commands})
+    client.receive_response = _receive
+    return client
+
+
+class TestReusableClient:
+    """Test sharing one SDK client between agent iterations."""
+
+    async def test_reused_after_clear(self, tmp_path: Path) -> None:
+        """With /clear available the same client is reset instead of recreated."""
+        client = _sdk_client([{"name": "clear"}, {"name": "compact"}])
+        create = AsyncMock(return_value=client)
+        clients = _ReusableClient(tmp_path, "haiku")
+
+        with patch("axon_agent.core.runner.create_client_async", create):
+            assert await clients.acquire() is client
+            assert await clients.acquire() is client
+
+        create.assert_awaited_once_with(tmp_path, "haiku")
+        client.connect.assert_awaited_once()
+        client.query.assert_awaited_once_with("/clear")
+
+    async def test_fresh_client_without_clear(self, tmp_path: Path) -> None:
+        """Without /clear every iteration gets a new client, checked only once."""
+        first, second, third = (_sdk_client(["compact"]) for _ in range(3))
+        create = AsyncMock(side_effect=[first, second, third])
+        clients = _ReusableClient(tmp_path, "haiku")
+
+        with patch("builtins.print"), patch("axon_agent.core.runner.create_client_async", create):
+            await clients.acquire()
+            await clients.acquire()
+            assert await clients.acquire() is third
+
+        first.disconnect.assert_awaited_once()
+        second.disconnect.assert_awaited_once()
+        second.get_server_info.assert_not_awaited()
+        first.query.assert_not_awaited()
+
+    async def test_hanging_reset_falls_back(self, tmp_path: Path) -> None:
+        """A /clear that never finishes is abandoned for a new client."""
+        async def _never_answers(prompt: str) -> None:
+            await asyncio.sleep(3600)
+
+        stuck = _sdk_client(["/clear"])
+        stuck.query = AsyncMock(side_effect=_never_answers)
+        fresh = _sdk_client(["/clear"])
+        create = AsyncMock(side_effect=[stuck, fresh])
+        clients = _ReusableClient(tmp_path, "haiku")
+
+        with (
+            patch("builtins.print"),
+            patch("axon_agent.core.runner.create_client_async", create),
+            patch("axon_agent.core.runner.CLIENT_RESET_TIMEOUT_SECONDS", 0.01),
+        ):
+            await clients.acquire()
+            assert await clients.acquire() is fresh
+
+        stuck.disconnect.assert_awaited_once()
+
+    async def test_discard_disconnects(self, tmp_path: Path) -> None:
+        """Discarding closes the client; the next acquire creates a new one."""
+        first, second = _sdk_client(["clear"]), _sdk_client(["clear"])
+        create = AsyncMock(side_effect=[first, second])
+        clients = _ReusableClient(tmp_path, "haiku")
+
+        with patch("axon_agent.core.runner.create_client_async", create):
+            await clients.acquire()
+            await clients.discard()
+            await clients.discard()
+            assert await clients.acquire() is second
+
+        first.disconnect.assert_awaited_once()
+
+    async def test_context_limit_replaces_client(self, tmp_path: Path) -> None:
+        """A context-limit stop closes the client instead of clearing its unfinished turn."""
+        first, second = _sdk_client(["clear"]), _sdk_client(["clear"])
+        create = AsyncMock(side_effect=[first, second])
+        session = AsyncMock(side_effect=[
+            SessionResult(status=SESSION_CONTEXT_LIMIT, response="limit"),
+            SessionResult(status=SESSION_CONTINUE, response="ok"),
+        ])
+        recovery = MagicMock()
+        recovery.check_recovery = AsyncMock(return_value=(False, None))
+        ctx_manager = MagicMock(is_compact_mode=False)
+
+        with (
+            patch("builtins.print"),
+            patch("axon_agent.core.runner.create_client_async", create),
+            patch("axon_agent.core.runner.run_agent_session", session),
+            patch("axon_agent.core.runner.ensure_project_map", return_value=""),
+            patch("axon_agent.core.runner.set_default_project_dir"),
+            patch("axon_agent.core.runner.get_session_state_manager"),
+            patch("axon_agent.core.runner.get_session_recovery", return_value=recovery),
+            patch("axon_agent.core.runner.get_context_manager", return_value=ctx_manager),
+            patch("axon_agent.core.runner._maybe_rebuild_prompt", return_value="prompt"),
+            patch("axon_agent.core.runner.wait_while_paused", AsyncMock()),
+            patch("axon_agent.core.runner.print_session_header"),
+            patch("axon_agent.core.runner.event_loop_monitor",
+                  lambda **_: contextlib.nullcontext()),
+            patch("axon_agent.core.runner.close_mcp_http_client", AsyncMock()),
+            patch("axon_agent.core.runner.warmup_playwright", AsyncMock()),
+            patch("axon_agent.core.runner.AUTO_CONTINUE_DELAY_SECONDS", 0),
+            patch("axon_agent.core.runner.VERBOSE_OUTPUT", False),
+        ):
+            await run_autonomous_agent(tmp_path, "haiku", "ENG", max_iterations=2)
+
+        assert create.await_count == 2
+        assert session.await_args_list[1].args[0] is second
+        first.disconnect.assert_awaited_once()
+        first.query.assert_not_awaited()
@@ -0,0 +1,321 @@
+"""
+Tests for a single agent session (ENG-29)
+=========================================
+
+Verifies:
+1. Streamed text blocks are joined into the response and signals detected
+2. Response tokens are estimated once per assistant message
+3. Error tracebacks are written off the event loop
+4. Tool inputs and results are stringified with a length bound
+5. Streamed console output is written in batches, in order
+6. Error guidance is chosen by keyword priority in one scan
+7. Only a bounded tail of the response is kept; signals are found anywhere
+8. Quiet mode skips streamed text and context statistics output
+9. Messages and blocks are dispatched on their exact SDK type
+"""
+
+from collections.abc import AsyncIterator
+from pathlib import Path
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from claude_agent_sdk import (
+    AssistantMessage,
+    TextBlock,
+    ToolResultBlock,
+    ToolUseBlock,
+    UserMessage,
+)
+
+from axon_agent.core.context import ContextManager, estimate_tokens
+from axon_agent.core.session import (
+    COMPLETION_SIGNAL,
+    SESSION_COMPLETE,
+    SESSION_CONTINUE,
+    SESSION_ERROR,
+    _bounded_str,
+    _error_guidance,
+    _ResponseTail,
+    _StdoutBatcher,
+    print_traceback_async,
+    run_agent_session,
+)
+
+
+def _make_client(messages: list[Any]) -> MagicMock:
+    """Build a client whose receive_response streams the given messages."""
+
+    async def _receive() -> AsyncIterator[Any]:
+        for msg in messages:
+            yield msg
+
+    client = MagicMock()
+    client.query = AsyncMock()
+    client.receive_response = _receive
+    return client
+
+
+def _text(*chunks: str) -> AssistantMessage:
+    return AssistantMessage(content=[TextBlock(text=c) for c in chunks], model="test")
+
+
+class TestResponseAccumulation:
+    """Test collecting assistant text across streamed messages."""
+
+    async def test_chunks_joined_in_order(self, tmp_path: Path) -> None:
+        """Text from every block ends up in the response, in stream order."""
+        client = _make_client([_text("Hello, ", "wor"), _text("ld")])
+
+        with patch("builtins.print"):
+            result = await run_agent_session(client, "hi", tmp_path, ContextManager())
+
+        assert result.status == SESSION_CONTINUE
+        assert result.response == "Hello, world"
+
+    async def test_signal_split_across_blocks(self, tmp_path: Path) -> None:
+        """A completion signal spanning two blocks is still detected."""
+        half = len(COMPLETION_SIGNAL) // 2
+        client = _make_client([
+            _text("done ", COMPLETION_SIGNAL[:half]),
+            _text(COMPLETION_SIGNAL[half:] + " all"),
+        ])
+
+        with patch("builtins.print"):
+            result = await run_agent_session(client, "hi", tmp_path, ContextManager())
+
+        assert result.status == SESSION_COMPLETE
+
+
+class TestResponseTokenTracking:
+    """Test history token accounting for assistant text."""
+
+    async def test_one_estimate_per_message(self, tmp_path: Path) -> None:
+        """All text blocks of a message are estimated together."""
+        client = _make_client([_text("a" * 6, "b" * 6), _text("c" * 8)])
+        manager = ContextManager()
+
+        with (
+            patch("builtins.print"),
+            patch(
+                "axon_agent.core.session.estimate_tokens", wraps=estimate_tokens
+            ) as mock_estimate,
+        ):
+            await run_agent_session(client, "hi", tmp_path, manager)
+
+        assert [c.args[0] for c in mock_estimate.call_args_list] == ["a" * 6 + "b" * 6, "c" * 8]
+        assert manager.budget.breakdown["history"] == 5
+
+
+class TestTracebackOffload:
+    """Test printing tracebacks without blocking the loop."""
+
+    async def test_traceback_written_to_stderr(
+        self, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        """The active exception is formatted on the loop and written in a thread."""
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            await print_traceback_async()
+
+        assert "ValueError: boom" in capsys.readouterr().err
+
+    async def test_session_error_traceback_offloaded(self, tmp_path: Path) -> None:
+        """Session errors print their traceback through the async helper."""
+        client = MagicMock(query=AsyncMock(side_effect=RuntimeError("boom")))
+
+        with (
+            patch("builtins.print"),
+            patch("axon_agent.core.session.asyncio.to_thread", AsyncMock()) as mock_thread,
+        ):
+            result = await run_agent_session(client, "hi", tmp_path, ContextManager())
+
+        assert result.status == SESSION_ERROR
+        assert "RuntimeError: boom" in mock_thread.await_args.args[1]
+
+
+class TestBoundedStr:
+    """Test the length-bounded string form of tool payloads."""
+
+    def test_small_objects_match_str(self) -> None:
+        """Short payloads render exactly like str(), dict order included."""
+        for obj in [
+            "plain",
+            None,
+            {"z": 1, "a": [1, "two", (3,)]},
+            [{"type": "text", "text": "it's \"quoted\""}],
+        ]:
+            assert _bounded_str(obj) == (str(obj), False)
+
+    def test_large_nested_string_is_prefix(self) -> None:
+        """A huge string inside a content list is cut without full expansion."""
+        content = [{"type": "image", "data": "A" * 1_000_000}]
+
+        text, truncated = _bounded_str(content, limit=100)
+
+        assert truncated is True
+        assert text == str(content)[:100]
+
+    def test_quote_style_follows_whole_string(self) -> None:
+        """Quotes are chosen from the full string, like repr()."""
+        content = ["x" * 50 + "'" + '"']
+
+        assert _bounded_str(content, limit=10)[0] == str(content)[:10]
+
+    async def test_long_tool_input_display_truncated(
+        self, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        """The console shows a bounded input prefix followed by an ellipsis."""
+        block = ToolUseBlock(id="t1", name="Write", input={"content": "x" * 10_000})
+        client = _make_client([AssistantMessage(content=[block], model="test")])
+
+        await run_agent_session(client, "hi", tmp_path, ContextManager())
+
+        printed = [line for line in capsys.readouterr().out.splitlines() if "Input:" in line]
+        assert printed == [f"   Input: {str(block.input)[:200]}..."]
+
+
+class TestBatchedStdout:
+    """Test batching of streamed console output."""
+
+    async def test_chunks_written_in_one_batch(self) -> None:
+        """Chunks queued within the debounce window share a single write."""
+        with patch("axon_agent.core.session.sys.stdout") as mock_stdout:
+            async with _StdoutBatcher(debounce=0.05) as out:
+                out.write("a")
+                out.write("b")
+                out.write("c")
+
+        mock_stdout.write.assert_called_once_with("abc")
+        mock_stdout.flush.assert_called_once()
+
+    async def test_stream_order_preserved(
+        self, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        """Text and tool lines come out in stream order before the summary."""
+        tool = ToolUseBlock(id="t1", name="Bash", input={"command": "ls"})
+        client = _make_client([
+            _text("Hello, "),
+            AssistantMessage(content=[tool], model="test"),
+            _text("world"),
+        ])
+
+        await run_agent_session(client, "hi", tmp_path, ContextManager())
+
+        out = capsys.readouterr().out
+        assert "Hello, \n[Tool: Bash]\n   Input: {'command': 'ls'}\nworld" in out
+        assert out.index("world") < out.index("Tool calls: 1")
+
+
+class TestErrorGuidance:
+    """Test the keyword table behind session error hints."""
+
+    def test_unknown_error_has_no_guidance(self) -> None:
+        """Messages without a known keyword fall through to the default."""
+        assert _error_guidance("something odd happened") is None
+
+    def test_priority_not_position(self) -> None:
+        """An earlier branch wins even when its keyword appears later."""
+        guidance = _error_guidance("Rate limited: invalid TOKEN")
+
+        assert guidance is not None
+        assert "аутентификации" in guidance[0]
+
+    def test_overlapping_keywords_found(self) -> None:
+        """Keywords sharing characters are all detected."""
+        guidance = _error_guidance("ratelimitask")
+
+        assert guidance is not None
+        assert "лимита запросов" in guidance[0]
+
+    async def test_session_prints_guidance(self, tmp_path: Path) -> None:
+        """The session error handler prints the matched hint."""
+        client = MagicMock(query=AsyncMock(side_effect=RuntimeError("Telegram send failed")))
+
+        with (
+            patch("builtins.print") as mock_print,
+            patch("axon_agent.core.session.print_traceback_async", AsyncMock()),
+        ):
+            result = await run_agent_session(client, "hi", tmp_path, ContextManager())
+
+        printed = [c.args[0] for c in mock_print.call_args_list if c.args]
+        assert result.status == SESSION_ERROR
+        assert "\nПохоже на ошибку Telegram MCP Server." in printed
+
+
+class TestResponseTail:
+    """Test the bounded response capture."""
+
+    def test_keeps_only_last_chars(self) -> None:
+        """Older text is dropped once the capture limit is exceeded."""
+        tail = _ResponseTail((COMPLETION_SIGNAL,), max_chars=10)
+        for chunk in ("aaaa", "bbbb", "cccc", "dd"):
+            tail.feed(chunk)
+
+        assert tail.text() == "bbbbccccdd"
+
+    def test_signal_split_across_feeds(self) -> None:
+        """A signal cut between two fragments is still found."""
+        tail = _ResponseTail((COMPLETION_SIGNAL,), max_chars=10)
+        tail.feed("x" + COMPLETION_SIGNAL[:3])
+        tail.feed(COMPLETION_SIGNAL[3:] + "y")
+
+        assert tail.found == {COMPLETION_SIGNAL}
+
+    async def test_early_signal_survives_long_output(self, tmp_path: Path) -> None:
+        """A signal followed by more text than the capture keeps still completes."""
+        client = _make_client([_text(COMPLETION_SIGNAL + " summary"), _text("z" * 200)])
+
+        with (
+            patch("builtins.print"),
+            patch("axon_agent.core.session.RESPONSE_CAPTURE_MAX_CHARS", 100),
+        ):
+            result = await run_agent_session(client, "hi", tmp_path, ContextManager())
+
+        assert result.status == SESSION_COMPLETE
+        assert result.response == "z" * 100
+
+
+class TestQuietMode:
+    """Test the AXON_VERBOSE=0 console mode."""
+
+    async def test_text_and_stats_suppressed(
+        self, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        """Text is still collected but neither it nor the stats are printed."""
+        client = _make_client([_text("secret thoughts")])
+
+        with patch("axon_agent.core.session.VERBOSE_OUTPUT", False):
+            result = await run_agent_session(client, "hi", tmp_path, ContextManager())
+
+        out = capsys.readouterr().out
+        assert result.response == "secret thoughts"
+        assert "secret thoughts" not in out
+        assert "Context:" not in out
+
+
+class TestMessageDispatch:
+    """Test routing of streamed SDK messages by type."""
+
+    async def test_tool_round_trip(
+        self, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        """Tool use, tool result and text each take their own branch."""
+        client = _make_client([
+            AssistantMessage(
+                content=[TextBlock(text="run "), ToolUseBlock(id="t1", name="Bash", input={})],
+                model="test",
+            ),
+            UserMessage(content=[ToolResultBlock(tool_use_id="t1", content="ok")]),
+            UserMessage(content="plain user text"),
+        ])
+        manager = ContextManager()
+
+        result = await run_agent_session(client, "hi", tmp_path, manager)
+
+        out = capsys.readouterr().out
+        assert result.response == "run "
+        assert "[Tool: Bash]" in out
+        assert "   [Done]" in out
+        assert "Tool calls: 1" in out
@@ -11,6 +11,9 @@ Verifies:
 6. Stale recovery detection (>24 hours) (ENG-69)
 7. Recovery context formatting for prompt injection (ENG-69)
 8. get_recovery_info structured output (ENG-69)
+9. Incremental persistence through an append-only event log
+10. Snapshots stay readable JSON when encoded with orjson
+11. Backoff delays and retry strategies come from precomputed tables
 """
 
 import asyncio
@@ -23,6 +26,8 @@ from unittest.mock import AsyncMock, MagicMock, patch
 import pytest
 
 from axon_agent.core.state import (
+    _BACKOFF_TABLE,
+    _PHASE_RETRY_STRATEGY,
     MAX_PHASE_RETRIES,
     STALE_RECOVERY_HOURS,
     ErrorType,
@@ -204,7 +209,7 @@ class TestSessionStateManager:
         assert loaded.issue_id == "ENG-35"
 
     def test_phase_transition_saves_state(self, temp_project):
-        """Each phase transition writes to JSON file with completed_phases and phase_history (ENG-66)."""
+        """Each phase transition is persisted with completed_phases and phase_history (ENG-66)."""
         manager = SessionStateManager(temp_project)
         manager.start_session("ENG-35")
 
@@ -219,20 +224,20 @@ class TestSessionStateManager:
         for phase in phases:
             manager.transition_to(phase)
 
-            # Verify state file updated
+            # Verify persisted state (snapshot + event log) updated
             state_file = temp_project / ".agent" / "session_state.json"
             assert state_file.exists()
 
-            with open(state_file) as f:
-                data = json.load(f)
+            loaded = SessionStateManager(temp_project).load_state()
+            assert loaded is not None
+            data = loaded.to_dict()
             assert data["phase"] == phase.phase_name
-            assert "last_updated" in data
-            assert "completed_phases" in data
-            assert "phase_history" in data
+            assert data["last_updated"] == manager.current_state.last_updated
+            assert data["completed_phases"] == manager.current_state.completed_phases
+            assert data["phase_history"] == manager.current_state.phase_history
 
         # After all transitions, completed_phases should have earlier phases
-        with open(temp_project / ".agent" / "session_state.json") as f:
-            final_data = json.load(f)
+        final_data = SessionStateManager(temp_project).load_state().to_dict()
         assert "orient" in final_data["completed_phases"]
         assert "status" in final_data["completed_phases"]
         assert "verify" in final_data["completed_phases"]
@@ -1412,3 +1417,160 @@ class TestGetRecoveryContext:
 
         assert "Last error" not in context
         assert "Total errors" not in context
+
+
+class TestSessionEventLog:
+    """Test delta persistence via .agent/session_events.jsonl."""
+
+    @pytest.fixture
+    def temp_project(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            project_dir = Path(tmpdir)
+            (project_dir / ".agent").mkdir()
+            yield project_dir
+
+    def test_updates_append_instead_of_rewriting(self, temp_project):
+        """After the initial snapshot, updates only append event lines."""
+        manager = SessionStateManager(temp_project)
+        manager.start_session("ENG-35")
+        snapshot = manager.state_file.read_bytes()
+
+        manager.transition_to(SessionPhase.STATUS_CHECK)
+        manager.record_error(Exception("boom"), ErrorType.MCP_TIMEOUT)
+        manager.mark_degraded("telegram")
+
+        assert manager.state_file.read_bytes() == snapshot
+        assert len(manager.events_file.read_text().splitlines()) == 3
+
+    def test_replay_restores_full_state(self, temp_project):
+        """Snapshot plus replayed events equals the in-memory state."""
+        manager = SessionStateManager(temp_project)
+        manager.start_session("ENG-35")
+        manager.transition_to(SessionPhase.STATUS_CHECK)
+        manager.transition_to(SessionPhase.IMPLEMENTATION)
+        manager.record_error(Exception("boom"), ErrorType.MCP_TIMEOUT)
+        manager.mark_degraded("telegram")
+        manager.reset_phase_attempts(SessionPhase.IMPLEMENTATION)
+
+        loaded = SessionStateManager(temp_project).load_state()
+
+        assert loaded.to_dict() == manager.current_state.to_dict()
+
+    def test_torn_last_line_ignored(self, temp_project):
+        """A partially written final event does not break loading."""
+        manager = SessionStateManager(temp_project)
+        manager.start_session("ENG-35")
+        manager.transition_to(SessionPhase.STATUS_CHECK)
+        with open(manager.events_file, "a") as f:
+            f.write('{"generation": "x", "set": {"pha')
+
+        loaded = SessionStateManager(temp_project).load_state()
+
+        assert loaded.phase == SessionPhase.STATUS_CHECK
+
+    def test_stale_generation_not_replayed(self, temp_project):
+        """Events left over from an older snapshot are skipped."""
+        manager = SessionStateManager(temp_project)
+        manager.start_session("ENG-35")
+        manager.transition_to(SessionPhase.STATUS_CHECK)
+        stale_events = manager.events_file.read_bytes()
+
+        manager.save_state()  # New generation; log discarded
+        manager.events_file.write_bytes(stale_events)
+
+        loaded = SessionStateManager(temp_project).load_state()
+
+        assert loaded.phase_history == manager.current_state.phase_history
+
+    def test_log_compacted_past_threshold(self, temp_project):
+        """A large log is folded back into the snapshot."""
+        manager = SessionStateManager(temp_project)
+        manager.start_session("ENG-35")
+
+        with patch("axon_agent.core.state.EVENT_LOG_COMPACT_BYTES", 200):
+            for i in range(5):
+                manager.record_error(Exception(f"error {i}"))
+
+        assert not manager.events_file.exists() or manager.events_file.stat().st_size <= 200
+        data = json.loads(manager.state_file.read_text())
+        assert len(data["error_log"]) >= 1
+        assert SessionStateManager(temp_project).load_state().error_log == manager.current_state.error_log
+
+    def test_resumed_state_extends_loaded_log(self, temp_project):
+        """A manager that resumes a loaded state keeps appending to its log."""
+        first = SessionStateManager(temp_project)
+        first.start_session("ENG-35")
+        first.transition_to(SessionPhase.STATUS_CHECK)
+
+        second = SessionStateManager(temp_project)
+        second._current_state = second.load_state()
+        second.transition_to(SessionPhase.VERIFICATION)
+
+        loaded = SessionStateManager(temp_project).load_state()
+        assert [h["phase"] for h in loaded.phase_history] == ["orient", "status", "verify"]
+
+    def test_clear_removes_event_log(self, temp_project):
+        """clear_state deletes both the snapshot and the event log."""
+        manager = SessionStateManager(temp_project)
+        manager.start_session("ENG-35")
+        manager.transition_to(SessionPhase.STATUS_CHECK)
+
+        manager.clear_state()
+
+        assert not manager.state_file.exists()
+        assert not manager.events_file.exists()
+
+
+class TestSnapshotEncoding:
+    """Test the on-disk encoding of state snapshots."""
+
+    @pytest.fixture
+    def temp_project(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            yield Path(tmpdir)
+
+    def test_snapshot_is_indented_utf8_json(self, temp_project):
+        """Non-ASCII errors are stored as UTF-8 in an indented document."""
+        manager = SessionStateManager(temp_project)
+        manager.start_session("ENG-35")
+        manager.current_state.last_error = "Таймаут MCP"
+        manager.save_state()
+
+        raw = manager.state_file.read_bytes()
+
+        assert "Таймаут MCP".encode("utf-8") in raw
+        assert b'\n  "phase": "orient"' in raw
+        assert json.loads(raw)["last_error"] == "Таймаут MCP"
+
+    def test_corrupt_snapshot_returns_none(self, temp_project):
+        """Undecodable snapshots are reported as missing state."""
+        manager = SessionStateManager(temp_project)
+        (temp_project / ".agent").mkdir()
+        manager.state_file.write_bytes(b'{"phase": ')
+
+        assert manager.load_state() is None
+
+
+class TestPrecomputedRetryTables:
+    """Test the backoff and retry strategy lookup tables (ENG-67)."""
+
+    def test_backoff_table_matches_policy(self):
+        """Every precomputed delay equals the computed backoff policy."""
+        for (error_type, attempt), delay in _BACKOFF_TABLE.items():
+            assert delay == GracefulDegradation._compute_backoff_delay(attempt, error_type)
+
+    def test_backoff_table_covers_retry_range(self):
+        """All attempts the retry loops reach are served from the table."""
+        for error_type in ErrorType:
+            for attempt in range(MAX_PHASE_RETRIES + 2):
+                assert (error_type, attempt) in _BACKOFF_TABLE
+
+    def test_attempt_past_table_computed(self):
+        """Attempts beyond the table still follow the policy."""
+        attempt = max(attempt for _, attempt in _BACKOFF_TABLE) + 1
+
+        assert GracefulDegradation.get_backoff_delay(attempt, ErrorType.NETWORK_ERROR) == 3.0 * attempt
+
+    def test_every_phase_has_strategy(self):
+        """No phase falls through to the default strategy."""
+        assert set(_PHASE_RETRY_STRATEGY) == set(SessionPhase)
@@ -22,11 +22,66 @@ Verifies:
 17. Weekly summary: no errors section (ENG-88)
 18. Weekly summary: XSS protection (ENG-88)
 19. Weekly summary: date formatting DD.MM.YYYY (ENG-88)
+20. Dataclass and command formatters: buffered output keeps the line layout
+21. HTML escaping is a single pass; quotes are kept inside code blocks
+22. Weekly sparkline levels use integer scaling
+23. Dataclass report dates are formatted without strftime
+24. Module progress bar uses exact integer fill and rounding
+25. Module progress bar results are memoized
+26. Error alert stack traces are split once and ignore a trailing newline
+27. Daily digest renders through one pre-built template per section mask
+28. Token counts are formatted through a small cache
+29. Weekly daily completions default to a shared tuple; empty input is safe
+30. Long titles and messages are truncated with an ellipsis
+31. Long reports are split into whole Telegram messages at paragraph breaks
+32. Error alerts escape only the part of huge messages and traces they show
+33. Unset report times come from one caller-supplied clock reading
+34. Session summary status labels come from a table, unknown ones are titled
+35. Report and status dataclasses use __slots__
+36. Status report opens with the fixed title and task header
+37. Status reports are memoized on the StatusData field values
+38. /next and /log markers come from module-level lookup tables
+39. /budget context bar is picked from pre-built bars and stays 10 cells wide
+40. /log lines carry a task reference only when one is set
+41. /next queue-size lines are cached per queue size
+42. Status report renders through one pre-built template per section mask
+43. Status session state labels come from a table, unknown ones are titled
+44. Status celebration line needs finished tasks and no remaining work
 """
 
+import dataclasses
 import re
-
-from axon_agent.integrations.telegram import TelegramReports
+from datetime import datetime
+
+import pytest
+
+from axon_agent.integrations.telegram import (
+    _DIGEST_SECTIONS,
+    _DIGEST_TEMPLATES,
+    _STATUS_SECTIONS,
+    _STATUS_TEMPLATES,
+    DailyDigestData,
+    ErrorAlertData,
+    SessionSummaryData,
+    StatusData,
+    TelegramReports,
+    WeeklySummaryData,
+    _fmt_thousands,
+    _queue_suffix,
+    _truncate,
+    chunk_message,
+    escape_html,
+    format_action_log,
+    format_budget_status,
+    format_daily_digest,
+    format_error_alert,
+    format_next_task,
+    format_progress_bar,
+    format_session_summary,
+    format_status,
+    format_status_simple,
+    format_weekly_summary,
+)
 
 # Telegram-supported HTML tags (subset used by reports)
 ALLOWED_TAGS = {"b", "i", "code", "pre", "a"}
@@ -1351,3 +1406,434 @@ class TestWeeklySummaryDateFormatting:
         }
         result = self.reports.generate_weekly_summary(data)
         assert "01.04.2026" in result
+
+
+class TestBufferedFormatters:
+    """Test the StringIO-built dataclass and command formatters."""
+
+    def test_digest_line_layout(self) -> None:
+        """The header is followed by a blank line; the closing blank line stays."""
+        result = format_daily_digest(DailyDigestData(completed_today=1, highlights=["ENG-1"]))
+
+        assert result.split("\n")[1] == ""
+        assert result.endswith("ENG-1\n")
+
+    def test_alert_keeps_blank_separators(self) -> None:
+        """Section separators survive as empty lines."""
+        result = format_error_alert(ErrorAlertData(error_type="git", error_message="boom"))
+
+        assert "\n\n" in result
+        assert not result.endswith("\n")
+
+    def test_command_replies_have_no_trailing_newline(self) -> None:
+        """/next, /log and /budget replies end on their last line."""
+        replies = (
+            format_next_task("ENG-1", "Title", "high", description="Details", total_todo=3),
+            format_action_log([{"type": "commit", "title": "feat: x", "task_id": "ENG-1"}]),
+            format_budget_status({"usage_percent": 50, "mode": "compact"}, None),
+        )
+
+        for reply in replies:
+            assert "\n\n" in reply
+            assert not reply.endswith("\n")
+        assert replies[1].endswith("feat: x [ENG-1]")
+        assert replies[2].endswith('<code>{"limit_usd": 100}</code>')
+
+
+class TestEscapeHtml:
+    """Test the translate-based HTML escaping."""
+
+    def test_escapes_special_characters(self) -> None:
+        """Ampersands are not escaped twice."""
+        assert escape_html('<a href="x">&amp;</a>') == (
+            "&lt;a href=&quot;x&quot;&gt;&amp;amp;&lt;/a&gt;"
+        )
+
+    def test_error_alert_code_keeps_quotes(self) -> None:
+        """Error text and trace lines escape ``&`` but leave quotes alone."""
+        data = ErrorAlertData(
+            error_message='bad "x" & <y>', stack_trace='File "a.py" & <module>'
+        )
+
+        result = format_error_alert(data)
+
+        assert '<code>bad "x" &amp; &lt;y&gt;</code>' in result
+        assert '<code>File "a.py" &amp; &lt;module&gt;</code>' in result
+
+
+class TestWeeklySparkline:
+    """Test the per-day sparkline of the dataclass weekly summary."""
+
+    def test_levels_scale_to_busiest_day(self) -> None:
+        """Zero maps to the lowest block, the maximum to the highest."""
+        data = WeeklySummaryData(daily_completions=[0, 1, 2, 4, 8, 3, 7])
+
+        result = format_weekly_summary(data)
+
+        assert "<code>\u2581\u2582\u2583\u2585\u2588\u2584\u2588</code>" in result
+
+    def test_default_is_shared_tuple(self) -> None:
+        """Instances share one immutable default instead of a new list each."""
+        assert WeeklySummaryData().daily_completions is WeeklySummaryData().daily_completions
+        assert WeeklySummaryData().daily_completions == (0,) * 7
+
+    def test_empty_breakdown_has_no_sparkline(self) -> None:
+        """An empty breakdown skips the section instead of failing on max()."""
+        result = format_weekly_summary(WeeklySummaryData(daily_completions=[]))
+
+        assert "<code>" not in result
+
+    def test_idle_week_has_no_sparkline(self) -> None:
+        """A week without completions skips the section."""
+        result = format_weekly_summary(WeeklySummaryData(daily_completions=[0] * 7))
+
+        assert "<code>" not in result
+
+
+class TestReportDates:
+    """Test the fixed-format dates of the dataclass reports."""
+
+    def test_shared_now_fills_unset_times(self) -> None:
+        """Reports without their own date use the supplied ``now``."""
+        now = datetime(2026, 5, 6, 7, 8, 9)
+
+        assert "2026-05-06" in format_daily_digest(DailyDigestData(), now=now)
+        assert "07:08:09" in format_error_alert(ErrorAlertData(), now=now)
+        assert "<i>Apr 29 - May 06, 2026</i>" in format_weekly_summary(
+            WeeklySummaryData(), now=now
+        )
+
+    def test_explicit_date_wins_over_now(self) -> None:
+        """A date set on the data is kept; defaults no longer read the clock."""
+        data = DailyDigestData(date=datetime(2026, 1, 2))
+
+        assert DailyDigestData().date is None
+        assert "2026-01-02" in format_daily_digest(data, now=datetime(2030, 1, 1))
+
+    def test_header_dates(self) -> None:
+        """Digest, alert and weekly headers match the strftime formats."""
+        start, end = datetime(2026, 2, 3, 9, 5, 7), datetime(2026, 12, 9)
+
+        assert "2026-02-03" in format_daily_digest(DailyDigestData(date=start))
+        assert "09:05:07" in format_error_alert(ErrorAlertData(timestamp=start))
+        assert "<i>Feb 03 - Dec 09, 2026</i>" in format_weekly_summary(
+            WeeklySummaryData(week_start=start, week_end=end)
+        )
+
+
+class TestModuleProgressBar:
+    """Test the module-level progress bar."""
+
+    def test_exact_thirds(self) -> None:
+        """A third of a 12-wide bar is exactly four cells."""
+        assert format_progress_bar(1, 3, width=12) == "\u2588" * 4 + "\u2591" * 8 + " 33%"
+
+    def test_percentage_rounds_to_nearest(self) -> None:
+        """Percentages round to the nearest integer, the bar rounds down."""
+        assert format_progress_bar(2, 3) == "\u2588" * 6 + "\u2591" * 4 + " 67%"
+
+    def test_out_of_range_clamped(self) -> None:
+        """Negative and overflowing progress stay within the bar."""
+        assert format_progress_bar(-5, 10) == "\u2591" * 10 + " 0%"
+        assert format_progress_bar(15, 10) == "\u2588" * 10 + " 100%"
+
+    def test_repeated_bar_served_from_cache(self) -> None:
+        """Identical arguments hit the memoized result."""
+        format_progress_bar.cache_clear()
+
+        first = format_progress_bar(3, 7, width=12)
+        second = format_progress_bar(3, 7, width=12)
+
+        assert first is second
+        assert format_progress_bar.cache_info().hits == 1
+        format_progress_bar.cache_clear()
+
+
+class TestErrorAlertStackTrace:
+    """Test stack trace truncation in the dataclass error alert."""
+
+    def test_long_trace_truncated(self) -> None:
+        """Only the first five lines are shown, followed by a marker."""
+        trace = "\n".join(f"line {i}" for i in range(1000))
+
+        result = format_error_alert(ErrorAlertData(stack_trace=trace))
+
+        assert "<code>line 4</code>" in result
+        assert "line 5" not in result
+        assert "<i>...\u043e\u0431\u0440\u0435\u0437\u0430\u043d\u043e</i>" in result
+
+    def test_huge_message_and_line_bounded(self) -> None:
+        """Megabyte inputs still render the usual 300- and 80-character prefixes."""
+        data = ErrorAlertData(error_message="&" * 1_000_000, stack_trace="<" * 1_000_000)
+
+        result = format_error_alert(data)
+
+        assert f"<code>{'&amp;' * 60}</code>" in result
+        assert f"<code>{'&lt;' * 20}</code>" in result
+        assert "\u043e\u0431\u0440\u0435\u0437\u0430\u043d\u043e" not in result
+
+    def test_trailing_newline_not_truncated(self) -> None:
+        """A five-line trace ending in a newline is shown whole."""
+        trace = "".join(f"line {i}\n" for i in range(5))
+
+        result = format_error_alert(ErrorAlertData(error_message="boom", stack_trace=trace))
+
+        assert "<code></code>" not in result
+        assert "\u043e\u0431\u0440\u0435\u0437\u0430\u043d\u043e" not in result
+
+
+class TestDigestTemplates:
+    """Test the pre-built templates behind the dataclass daily digest."""
+
+    def test_one_template_per_section_combination(self) -> None:
+        """Every mask has a template; the bare one holds only always-on sections."""
+        always = "".join(part for flag, part in _DIGEST_SECTIONS if flag == 0)
+
+        assert len(_DIGEST_TEMPLATES) == 128
+        assert _DIGEST_TEMPLATES[0] == always[:-1]
+
+    def test_absent_sections_skipped(self) -> None:
+        """Only sections with data appear in the report."""
+        result = format_daily_digest(DailyDigestData(commits_today=2))
+
+        assert "<b>Git:</b>" in result
+        assert "\u0421\u0435\u0441\u0441\u0438\u0438:" not in result
+        assert "\u0418\u0442\u043e\u0433\u0438:" not in result
+
+    def test_percent_in_values_not_interpreted(self) -> None:
+        """Substituted text containing %-directives is printed verbatim."""
+        result = format_daily_digest(DailyDigestData(highlights=["100%(done)s"]))
+
+        assert "  \u2022 100%(done)s" in result
+
+
+class TestTokenFormatting:
+    """Test the cached thousands-separator helper."""
+
+    def test_summary_reuses_cached_count(self) -> None:
+        """A repeated token total is a cache hit with the usual formatting."""
+        _fmt_thousands.cache_clear()
+        data = SessionSummaryData(total_tokens=1_234_567)
+
+        format_session_summary(data)
+        result = format_session_summary(data)
+
+        assert "1,234,567" in result
+        assert _fmt_thousands.cache_info().hits == 1
+        _fmt_thousands.cache_clear()
+
+
+class TestTruncate:
+    """Test the shared ellipsis truncation helper."""
+
+    def test_short_text_returned_unchanged(self) -> None:
+        """Text within the limit is the same object, not a copy."""
+        title = "x" * 50
+
+        assert _truncate(title, 50) is title
+
+    def test_long_text_cut(self) -> None:
+        """Longer text keeps the limit and gains an ellipsis."""
+        assert _truncate("abcdef", 3) == "abc..."
+
+    def test_summary_commit_truncated(self) -> None:
+        """Session summary commits are cut at 60 characters."""
+        result = format_session_summary(SessionSummaryData(commits=["c" * 61]))
+
+        assert f"{'c' * 60}...\n" in result
+
+
+class TestChunkMessage:
+    """Test splitting reports into Telegram-sized messages."""
+
+    def test_short_report_single_chunk(self) -> None:
+        """A report within the limit is sent as one message."""
+        assert chunk_message("a\n\nb", max_length=10) == ["a\n\nb"]
+
+    def test_splits_at_paragraph_boundary(self) -> None:
+        """Chunks end at the last blank line that fits."""
+        report = "aaaa\nbbbb\n\ncccc\n\ndddd"
+
+        assert chunk_message(report, max_length=12) == ["aaaa\nbbbb", "cccc\n\ndddd"]
+
+    def test_falls_back_to_line_then_hard_cut(self) -> None:
+        """Without blank lines chunks end at a newline, else at the limit."""
+        assert chunk_message("aaa\nbbb\nccc", max_length=8) == ["aaa\nbbb", "ccc"]
+        assert chunk_message("x" * 10, max_length=4) == ["xxxx", "xxxx", "xx"]
+
+
+class TestSessionStatusLabel:
+    """Test the status line of the dataclass session summary."""
+
+    def test_known_and_unknown_statuses(self) -> None:
+        """Known statuses use the table; others fall back to str.title()."""
+        done = format_session_summary(SessionSummaryData(status="completed"))
+        odd = format_session_summary(SessionSummaryData(status="rolled back"))
+
+        assert "\u2705 Completed\n" in done
+        assert "\u2139\ufe0f Rolled Back\n" in odd
+
+
+class TestReportDataSlots:
+    """Test the memory layout of the report dataclasses."""
+
+    def test_no_instance_dict(self) -> None:
+        """Instances keep fields in slots, without a per-instance __dict__."""
+        for cls in (DailyDigestData, SessionSummaryData, ErrorAlertData, WeeklySummaryData, StatusData):
+            assert not hasattr(cls(), "__dict__"), cls.__name__
+
+
+class TestFormatStatus:
+    """Test the /status report layout."""
+
+    def test_fixed_header(self) -> None:
+        """Title, blank line and task header open every report."""
+        result = format_status(StatusData(todo_count=1, done_count=2, total_tasks=3))
+        lines = result.split("\n")
+
+        assert lines[:3] == ["<b>\u0421\u0442\u0430\u0442\u0443\u0441</b>", "", "<b>\u0417\u0430\u0434\u0430\u0447\u0438:</b>"]
+        assert lines[3].endswith(": 1")
+
+    def test_duration_label(self) -> None:
+        """Elapsed time renders hours only when at least one hour passed."""
+        long = format_status(StatusData(session_number=1, elapsed_minutes=125))
+        short = format_status(StatusData(session_number=1, elapsed_minutes=5))
+
+        assert "  \u0414\u043b\u0438\u0442\u0435\u043b\u044c\u043d\u043e\u0441\u0442\u044c: 2\u0447 5\u043c" in long
+        assert "  \u0414\u043b\u0438\u0442\u0435\u043b\u044c\u043d\u043e\u0441\u0442\u044c: 5\u043c" in short
+
+    def test_memoized_by_fields(self) -> None:
+        """Equal status data, from either entry point, reuses the cached string."""
+        data = StatusData(todo_count=4, in_progress_count=1, done_count=7, total_tasks=12)
+
+        first = format_status(data)
+
+        assert format_status(StatusData(todo_count=4, in_progress_count=1, done_count=7, total_tasks=12)) is first
+        assert format_status_simple(4, 1, 7) is first
+
+    def test_status_data_is_frozen(self) -> None:
+        """StatusData is immutable and hashable."""
+        data = StatusData(todo_count=1)
+
+        assert hash(data) == hash(StatusData(todo_count=1))
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            data.todo_count = 2  # type: ignore[misc]
+
+
+class TestCommandMarkers:
+    """Test the priority and action-type marker tables."""
+
+    def test_priority_marker(self) -> None:
+        """Priorities are matched case-insensitively; unknown ones get no marker."""
+        assert "<code>ENG-1</code> !!!Fix" in format_next_task("ENG-1", "Fix", "URGENT")
+        assert "<code>ENG-1</code> Fix" in format_next_task("ENG-1", "Fix", "someday")
+
+    def test_unknown_action_type_uses_default(self) -> None:
+        """Unknown action types render like known ones."""
+        known = format_action_log([{"type": "commit", "title": "x"}])
+        unknown = format_action_log([{"type": "deploy", "title": "x"}])
+
+        assert known == unknown
+
+    def test_action_log_lines(self) -> None:
+        """Each action is one line; empty task ids add no reference."""
+        result = format_action_log([
+            {"type": "commit", "title": "a" * 80, "task_id": "ENG-7"},
+            {"title": "second", "task_id": ""},
+            {},
+        ])
+        lines = result.split("\n")
+
+        assert len(lines) == 5
+        assert lines[2] == f"   {'a' * 60} [ENG-7]"
+        assert lines[3] == "   second"
+        assert lines[4] == "   Unknown action"
+
+
+class TestBudgetBar:
+    """Test the /budget context usage bar."""
+
+    def test_bar_fill(self) -> None:
+        """Usage fills whole cells, rounding down."""
+        result = format_budget_status({"usage_percent": 47}, None)
+
+        assert "<code>[||||      ]</code> 47%" in result
+
+    def test_out_of_range_usage_is_pinned(self) -> None:
+        """Usage above 100% or below 0% keeps the bar 10 cells wide."""
+        over = format_budget_status({"usage_percent": 150}, None)
+        under = format_budget_status({"usage_percent": -5}, None)
+
+        assert "<code>[||||||||||]</code> 150%" in over
+        assert "<code>[          ]</code> -5%" in under
+
+
+class TestQueueSuffix:
+    """Test the /next queue-size line."""
+
+    def test_queue_line(self) -> None:
+        """Several queued tasks show the count; one or none shows the last-task note."""
+        _queue_suffix.cache_clear()
+
+        assert format_next_task("ENG-1", "Fix", "low", total_todo=5).endswith(
+            "\n\n5 \u0437\u0430\u0434\u0430\u0447 \u043e\u0441\u0442\u0430\u043b\u043e\u0441\u044c \u0432 \u043e\u0447\u0435\u0440\u0435\u0434\u0438"
+        )
+        assert format_next_task("ENG-1", "Fix", "low", total_todo=1) == format_next_task("ENG-1", "Fix", "low")
+        assert _queue_suffix(5) is _queue_suffix(5)
+        assert _queue_suffix.cache_info().hits >= 1
+        _queue_suffix.cache_clear()
+
+
+class TestStatusTemplates:
+    """Test the pre-built templates behind the /status report."""
+
+    def test_one_template_per_section_combination(self) -> None:
+        """Every mask has a template; the bare one holds only the task counts."""
+        always = "".join(part for flag, part in _STATUS_SECTIONS if flag == 0)
+
+        assert len(_STATUS_TEMPLATES) == 128
+        assert _STATUS_TEMPLATES[0] == always[:-1]
+
+    def test_session_without_duration(self) -> None:
+        """A session with no elapsed time ends its section after the state line."""
+        result = format_status(StatusData(session_number=3, session_status="active"))
+
+        assert result.endswith("  #3  Active\n")
+        assert "\u0414\u043b\u0438\u0442\u0435\u043b\u044c\u043d\u043e\u0441\u0442\u044c" not in result
+
+    def test_percent_in_values_not_interpreted(self) -> None:
+        """Task ids and titles containing %-directives are printed verbatim."""
+        result = format_status(StatusData(current_task_id="ENG-%(todo)s", current_task_title="100%"))
+
+        assert "<code>ENG-%(todo)s</code> 100%" in result
+
+
+class TestSessionStateLabel:
+    """Test the session line of the /status report."""
+
+    def test_known_and_unknown_states(self) -> None:
+        """Known states use the table; others fall back to str.title()."""
+        paused = format_status(StatusData(session_number=2, session_status="paused"))
+        odd = format_status(StatusData(session_number=2, session_status="winding down"))
+
+        assert "  #2  Paused\n" in paused
+        assert "  #2  Winding Down\n" in odd
+
+
+class TestStatusCelebration:
+    """Test the all-tasks-done line of the /status report."""
+
+    DONE_LINE = "\u0412\u0441\u0435 \u0437\u0430\u0434\u0430\u0447\u0438 \u0432\u044b\u043f\u043e\u043b\u043d\u0435\u043d\u044b!"
+
+    def test_shown_when_all_done(self) -> None:
+        """Finished tasks with nothing left end the report with the line."""
+        assert format_status(StatusData(done_count=3)).endswith(self.DONE_LINE)
+
+    def test_hidden_otherwise(self) -> None:
+        """Remaining or no finished work leaves the line out."""
+        for data in (
+            StatusData(todo_count=1, done_count=3),
+            StatusData(in_progress_count=1, done_count=3),
+            StatusData(),
+        ):
+            assert self.DONE_LINE not in format_status(data)
@@ -200,7 +200,7 @@ class TestExecuteTask:
         mock_client.__aenter__ = AsyncMock(return_value=mock_client)
         mock_client.__aexit__ = AsyncMock(return_value=False)
 
-        with patch("axon_agent.core.client.create_client", return_value=mock_client):
+        with patch("axon_agent.core.client.create_client_async", AsyncMock(return_value=mock_client)):
             with patch("axon_agent.core.session.run_agent_session", AsyncMock(return_value=mock_result)):
                 buf = StringIO()
                 with patch.object(sys, "stdout", buf):
@@ -215,7 +215,7 @@ class TestExecuteTask:
         mock_client.__aenter__ = AsyncMock(side_effect=RuntimeError("SDK boom"))
         mock_client.__aexit__ = AsyncMock(return_value=False)
 
-        with patch("axon_agent.core.client.create_client", return_value=mock_client):
+        with patch("axon_agent.core.client.create_client_async", AsyncMock(return_value=mock_client)):
             buf = StringIO()
             with patch.object(sys, "stdout", buf):
                 result = await _execute_task(sample_issue, team_config, worker_id=0)